@@ -33,7 +33,7 @@ with st.sidebar:
 st.markdown('<h1 style="text-align: center; font-size: 33px; font-weight: 600; color: #1f2937;">TalentLens AI - Recruitment Assistant</h1>', unsafe_allow_html=True)
 st.markdown("---")
 
-col1, col2, col3 = st.columns(3)
+col1, col2, col3, col4 = st.columns(4)
 
 with col1:
     st.markdown('<div style="text-align: center;"><span class="ai-badge">AI</span></div>', unsafe_allow_html=True)
@@ -67,3 +67,14 @@ with col3:
     with btn_col2:
         if st.button("View Analytics", key="behavioral_btn"):
             st.switch_page("pages/3_Behavioral_Assessment.py")
+
+with col4:
+    st.markdown('<div style="text-align: center;"><span class="ai-badge">AI</span></div>', unsafe_allow_html=True)
+    st.markdown('<div class="card-icon">🧭</div>', unsafe_allow_html=True)
+    st.markdown('<div class="card-title">Job Matching</div>', unsafe_allow_html=True)
+    st.text(' ')
+    st.markdown('<div class="card-description">Score every candidate against several openings and find each one\'s best-fit job</div>', unsafe_allow_html=True)
+    btn_col1, btn_col2, btn_col3 = st.columns([0.5, 2, 0.2])
+    with btn_col2:
+        if st.button("Match Jobs", key="matching_btn"):
+            st.switch_page("pages/4_Job_Matching.py")
@@ -0,0 +1,187 @@
+"""Headless batch screening: score a directory or zip of resumes against one job description.
+
+Results are appended to a JSONL file as each resume completes. The file doubles as the checkpoint:
+on restart (after a crash or Ctrl-C) resumes that already have a result are skipped, matched by their
+content hash, so nothing is paid for twice. Failed calls are retried.
+
+With --max-shortlist or a token/cost budget, each chunk is analyzed best pre-score first and screening
+stops once the target is reached; the remaining resumes are recorded as 'Not evaluated' (and retried by
+a later run with budget left). Priority applies within a chunk, so raise --chunk-size to rank over more of the pool.
+
+Usage:
+    python batch_screen.py --jd data/Job_Description_Data_Engineer.txt --resumes sample_resumes --out results.jsonl
+    python batch_screen.py --jd jd.pdf --resumes applicants.zip --out results.jsonl --concurrency 64 --packed
+    python batch_screen.py --jd jd.pdf --resumes applicants.zip --out top.jsonl --max-shortlist 10 --chunk-size 2000
+"""
+import os
+import sys
+import json
+import time
+import zipfile
+import argparse
+from pathlib import Path
+from typing import Dict, Iterator, Tuple
+
+from utils.apollo_api import ApolloAPIClient
+from utils.resume_parser import extract_text_from_file, extract_texts, clean_resume_text, file_digest
+from utils.prescreen import prescreen_resumes
+from utils.dedup import dedupe_resumes, resolve_batch_duplicates, remember_results
+from utils.scheduling import ScreeningBudget, prioritize, not_evaluated_result, NOT_EVALUATED
+
+RESUME_SUFFIXES = ('.pdf', '.txt', '.text')
+
+def iter_resume_files(source: Path) -> Iterator[Tuple[str, bytes]]:
+    """(name, bytes) for every resume in a directory tree or zip archive"""
+    if source.is_dir():
+        for path in sorted(source.rglob('*')):
+            if path.is_file() and path.suffix.lower() in RESUME_SUFFIXES:
+                yield str(path.relative_to(source)), path.read_bytes()
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and info.filename.lower().endswith(RESUME_SUFFIXES):
+                    yield info.filename, archive.read(info)
+    else:
+        raise SystemExit(f"Not a directory or zip archive: {source}")
+
+def read_resume_files(source: Path, names: list) -> Dict[str, bytes]:
+    """Bytes of the named resumes from a directory tree or zip archive, read again per chunk so the
+    whole corpus is never held in memory"""
+    if source.is_dir():
+        return {name: (source / name).read_bytes() for name in names}
+    with zipfile.ZipFile(source) as archive:
+        return {name: archive.read(name) for name in names}
+
+def load_checkpoint(out_path: Path) -> Dict[str, dict]:
+    """Last recorded result per resume_sha256; a torn final line from a crash is ignored"""
+    done = {}
+    if out_path.exists():
+        with open(out_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get('resume_sha256'):
+                    done[record['resume_sha256']] = record
+    return done
+
+def chunks(items: list, size: int) -> Iterator[list]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--jd', required=True, type=Path, help='job description (.pdf or .txt)')
+    parser.add_argument('--resumes', required=True, type=Path, help='directory or .zip of resumes')
+    parser.add_argument('--out', required=True, type=Path, help='JSONL output, also used as the checkpoint')
+    parser.add_argument('--concurrency', type=int, default=None, help="requests in flight (default API_CONFIG['max_concurrency'])")
+    parser.add_argument('--chunk-size', type=int, default=200, help='resumes extracted and dispatched per round')
+    parser.add_argument('--packed', action='store_true', help='score several resumes per request')
+    parser.add_argument('--two-stage', action='store_true',
+                        help='cache a JD-independent profile per resume and match it per JD (cheaper for repeat openings)')
+    parser.add_argument('--prescreen-threshold', type=float, default=None, help='skip resumes below this local pre-score')
+    parser.add_argument('--no-cache', action='store_true', help='bypass the analysis cache')
+    parser.add_argument('--dedup-threshold', type=float, default=None, help='similarity above which near-duplicate resumes reuse an analysis')
+    parser.add_argument('--no-dedup', action='store_true', help='analyze near-duplicate resumes separately')
+    parser.add_argument('--max-shortlist', type=int, default=None, help='stop once this many resumes are shortlisted')
+    parser.add_argument('--token-budget', type=int, default=None, help='stop once the analyses have used this many tokens')
+    parser.add_argument('--cost-budget', type=float, default=None, help='stop once the estimated spend reaches this many USD')
+    args = parser.parse_args()
+
+    job_description = clean_resume_text(extract_text_from_file(args.jd.read_bytes(), args.jd.name))
+    if not job_description:
+        raise SystemExit(f"Could not read job description: {args.jd}")
+
+    done = load_checkpoint(args.out)
+    todo = []
+    skipped = 0
+    for name, file_bytes in iter_resume_files(args.resumes):
+        digest = file_digest(file_bytes)
+        # Failed and not evaluated resumes are retried; analyses, pre-screen rejects and unreadable files are final
+        if digest in done and done[digest].get('error') not in ('Failed', NOT_EVALUATED):
+            skipped += 1
+            continue
+        todo.append((name, digest))
+
+    budget = None
+    if args.max_shortlist or args.token_budget or args.cost_budget:
+        budget = ScreeningBudget(args.max_shortlist, args.token_budget, args.cost_budget)
+        # Shortlisted candidates from an earlier run count towards the target
+        for record in done.values():
+            budget.observe(record)
+        if budget.exhausted():
+            # Already recorded as not evaluated; writing them again on every rerun would only grow the checkpoint
+            screened = len(todo)
+            todo = [(name, digest) for name, digest in todo
+                    if digest not in done or done[digest].get('error') != NOT_EVALUATED]
+            skipped += screened - len(todo)
+    print(f"{len(todo)} resumes to screen, {skipped} already in {args.out}", file=sys.stderr)
+
+    client = ApolloAPIClient(use_cache=not args.no_cache)
+    duplicate_index = None if args.no_dedup else client.duplicate_index(job_description, args.dedup_threshold)
+    completed = 0
+    start = time.time()
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.out, 'a', encoding='utf-8') as out:
+        def write(result: dict):
+            nonlocal completed
+            result['resume_sha256'] = digests[result['resume_filename']]
+            out.write(json.dumps(result) + '\n')
+            out.flush()
+            completed += 1
+            if completed % 25 == 0:
+                os.fsync(out.fileno())
+                rate = completed / (time.time() - start)
+                print(f"  {completed}/{len(todo)} screened ({rate:.1f}/s)", file=sys.stderr)
+
+        try:
+            for chunk in chunks(todo, args.chunk_size):
+                digests = dict(chunk)
+                if budget is not None and budget.exhausted():
+                    for name, _ in chunk:
+                        write(not_evaluated_result(name, budget.exhausted()))
+                    continue
+                texts = extract_texts(read_resume_files(args.resumes, [name for name, _ in chunk]))
+                resume_files = {name: clean_resume_text(text) for name, text in texts.items() if text}
+                for name in texts:
+                    if name not in resume_files:
+                        write(dict(client.failed_result(name), error='Unreadable file'))
+
+                prescores = None
+                if args.prescreen_threshold is not None:
+                    resume_files, rejected, prescores = prescreen_resumes(resume_files, job_description, args.prescreen_threshold)
+                    for result in rejected:
+                        write(result)
+                if budget is not None:
+                    resume_files = prioritize(resume_files, job_description, prescores)
+
+                batch_duplicates = {}
+                if duplicate_index is not None:
+                    resume_files, reused, batch_duplicates = dedupe_resumes(resume_files, duplicate_index)
+                    for result in reused:
+                        write(result)
+                        if budget is not None:
+                            budget.observe(result)
+
+                if resume_files:
+                    results = client.analyze_resumes_parallel(resume_files, job_description, batch_size=args.concurrency,
+                                                              on_result=lambda result, *_: write(result), packed=args.packed,
+                                                              budget=budget, two_stage=args.two_stage)
+                    if duplicate_index is not None:
+                        remember_results(results, resume_files, duplicate_index)
+                        for result in resolve_batch_duplicates(results, batch_duplicates):
+                            write(result)
+                os.fsync(out.fileno())
+        except KeyboardInterrupt:
+            out.flush()
+            os.fsync(out.fileno())
+            print(f"\nInterrupted after {completed} resumes; rerun the same command to resume.", file=sys.stderr)
+            sys.exit(130)
+
+    if budget is not None and budget.exhausted():
+        print(f"Stopped early: {budget.exhausted()}", file=sys.stderr)
+    print(f"Done: {completed} resumes in {time.time() - start:.1f}s -> {args.out}", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Throughput of the old 2-thread batch vs the asyncio client (single and packed) against a local mock gateway
+
+Usage: python -m benchmarks.bench_async --resumes 200 --latency 0.5 --concurrency 2 16 64
+"""
+import time
+import argparse
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from utils.apollo_api import ApolloAPIClient, API_CONFIG
+from utils.apollo_async import AsyncApolloAPIClient
+from benchmarks.mock_gateway import MockGateway
+
+ROOT = Path(__file__).parent.parent
+
+def load_corpus(count: int) -> dict:
+    samples = [(p.name, p.read_text(encoding='utf-8')) for p in sorted((ROOT / 'sample_resumes').glob('*.txt'))]
+    corpus = {}
+    for i in range(count):
+        name, text = samples[i % len(samples)]
+        # Make every copy unique so nothing is deduplicated along the way
+        corpus[f"{i:05d}_{name}"] = f"{text}\nRef: {i}"
+    return corpus
+
+def run_thread_pool(config: dict, corpus: dict, job_description: str, workers: int) -> float:
+    client = ApolloAPIClient(use_cache=False)
+    client.config = config
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(client.analyze_resume, text, job_description) for text in corpus.values()]
+        for future in as_completed(futures):
+            future.result()
+    return time.perf_counter() - start
+
+def run_async(config: dict, corpus: dict, job_description: str, concurrency: int, packed: bool = False) -> float:
+    client = ApolloAPIClient(use_cache=False)
+    client.config = config
+    start = time.perf_counter()
+    AsyncApolloAPIClient(concurrency=concurrency, client=client).analyze_resumes_parallel(corpus, job_description,
+                                                                                          packed=packed)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--resumes', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.5, help='mean mock completion latency in seconds')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[2, 16, 64])
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.resumes)
+    job_description = (ROOT / 'data' / 'Job_Description_Data_Engineer.txt').read_text(encoding='utf-8')
+
+    with MockGateway(latency=args.latency) as gateway:
+        config = gateway.config(API_CONFIG)
+        baseline = run_thread_pool(config, corpus, job_description, workers=2)
+        print(f"{'mode':<20}{'in flight':>10}{'seconds':>10}{'resumes/s':>12}{'speedup':>10}")
+        print(f"{'thread pool':<20}{2:>10}{baseline:>10.2f}{len(corpus) / baseline:>12.1f}{1.0:>10.1f}")
+        for concurrency in args.concurrency:
+            elapsed = run_async(config, corpus, job_description, concurrency)
+            print(f"{'asyncio':<20}{concurrency:>10}{elapsed:>10.2f}{len(corpus) / elapsed:>12.1f}{baseline / elapsed:>10.1f}")
+        for concurrency in args.concurrency:
+            elapsed = run_async(config, corpus, job_description, concurrency, packed=True)
+            print(f"{'asyncio packed':<20}{concurrency:>10}{elapsed:>10.2f}{len(corpus) / elapsed:>12.1f}{baseline / elapsed:>10.1f}")
+        print(f"token requests: {gateway.token_requests}, completions: {gateway.chat_requests}")
+
+if __name__ == '__main__':
+    main()
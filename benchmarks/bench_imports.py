@@ -0,0 +1,95 @@
+"""Cold-start cost of each Streamlit page: import time and first (bare-mode) script run in a fresh interpreter
+
+Usage: python -m benchmarks.bench_imports
+       python -m benchmarks.bench_imports --pages pages/1_Resume_Screener.py --repeat 5 --top 10
+       python -m benchmarks.bench_imports --json imports.json
+"""
+import sys
+import json
+import argparse
+import subprocess
+from pathlib import Path
+from statistics import median
+
+ROOT = Path(__file__).parent.parent
+
+# Libraries that should only load on the code paths that use them
+HEAVY_MODULES = ['pandas', 'numpy', 'plotly', 'pymupdf', 'fitz', 'pdfplumber', 'pyarrow', 'openpyxl', 'aiohttp']
+
+# Runs in the child interpreter: streamlit first (paid by every page), then the page script itself
+CHILD = """
+import sys, json, time, runpy, logging
+start = time.perf_counter()
+import streamlit
+streamlit_time = time.perf_counter() - start
+before = set(sys.modules)
+logging.disable(logging.WARNING)
+start = time.perf_counter()
+runpy.run_path(sys.argv[1], run_name='__main__')
+page_time = time.perf_counter() - start
+print(json.dumps({'streamlit': streamlit_time, 'page': page_time,
+                  'loaded': sorted({m.split('.')[0] for m in set(sys.modules) - before})}))
+"""
+
+def parse_importtime(stderr: str) -> dict:
+    """Cumulative import time (seconds) of each top-level package imported after streamlit"""
+    costs = {}
+    after_streamlit = False
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not cumulative.strip().isdigit():
+            continue
+        package = name.strip()
+        if not after_streamlit:
+            after_streamlit = name == ' streamlit'
+            continue
+        if '.' not in package:
+            costs[package] = max(costs.get(package, 0.0), int(cumulative) / 1e6)
+    return costs
+
+def profile_page(page: str) -> dict:
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', CHILD, page], cwd=str(ROOT),
+                          capture_output=True, text=True, timeout=300)
+    lines = [line for line in proc.stdout.splitlines() if line.startswith('{')]
+    if proc.returncode != 0 or not lines:
+        raise RuntimeError(f"{page} failed to run:\n{proc.stderr[-2000:]}")
+    run = json.loads(lines[-1])
+    run['imports'] = parse_importtime(proc.stderr)
+    return run
+
+def summarize(page: str, runs: list, top: int) -> dict:
+    imports = runs[0]['imports']
+    return {
+        'page': page,
+        'runs': len(runs),
+        'streamlit_ms': round(median(r['streamlit'] for r in runs) * 1000, 1),
+        'page_ms': round(median(r['page'] for r in runs) * 1000, 1),
+        'heavy': [m for m in HEAVY_MODULES if m in runs[0]['loaded']],
+        'top_imports': [{'module': m, 'ms': round(s * 1000, 1)}
+                        for m, s in sorted(imports.items(), key=lambda item: -item[1])[:top]]
+    }
+
+def main():
+    default_pages = ['Home.py'] + sorted(str(p.relative_to(ROOT)) for p in (ROOT / 'pages').glob('[!_]*.py'))
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', nargs='+', default=default_pages, help='scripts relative to the repo root')
+    parser.add_argument('--repeat', type=int, default=3, help='fresh interpreters per page (the median is reported)')
+    parser.add_argument('--top', type=int, default=5, help='slowest top-level imports to list per page')
+    parser.add_argument('--json', help='write the results to this file')
+    args = parser.parse_args()
+
+    print(f"{'page':<36}{'streamlit':>10}{'page':>9}  heavy modules / slowest imports (ms)")
+    rows = []
+    for page in args.pages:
+        row = summarize(page, [profile_page(page) for _ in range(args.repeat)], args.top)
+        slowest = ', '.join(f"{i['module']} {i['ms']:.0f}" for i in row['top_imports'])
+        print(f"{page:<36}{row['streamlit_ms']:>10.0f}{row['page_ms']:>9.0f}  [{' '.join(row['heavy'])}] {slowest}")
+        rows.append(row)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(rows, indent=2), encoding='utf-8')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""Screening pipeline benchmark: analyze_resumes_parallel and generate_interview_questions against a mock
+gateway that injects latency tails, token expiry, throttling, 5xx bursts and malformed replies
+
+Usage: python -m benchmarks.bench_pipeline --resumes 100 --concurrency 4 16 32 --scenarios clean mixed
+       python -m benchmarks.bench_pipeline --json results.json
+       python -m benchmarks.bench_pipeline --baseline results.json   # exits 1 on a regression
+"""
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.apollo_api import ApolloAPIClient, API_CONFIG
+from utils.llm_metrics import LLMMetrics
+from benchmarks.bench_async import load_corpus
+from benchmarks.mock_gateway import MockGateway, LATENCY_DISTRIBUTIONS
+
+ROOT = Path(__file__).parent.parent
+
+# Gateway behaviours to measure under; latency and seed come from the command line
+SCENARIOS = {
+    'clean': {},
+    'tail': {'latency_dist': 'lognormal'},
+    'expiry': {'token_ttl': 1.0},
+    'throttle': {'throttle_rate': 0.1, 'retry_after': 0.5},
+    'errors': {'error_rate': 0.02, 'error_burst': 5},
+    'malformed': {'malformed_rate': 0.05},
+    'mixed': {'latency_dist': 'lognormal', 'token_ttl': 5.0, 'throttle_rate': 0.05, 'retry_after': 0.5,
+              'error_rate': 0.01, 'error_burst': 3, 'malformed_rate': 0.02}
+}
+
+# Regression thresholds for --baseline: relative for throughput and p95, absolute for failure rate
+BENCH_CONFIG = {
+    'tolerance': 0.2,
+    'failure_slack': 0.02
+}
+
+def run_scenario(scenario: str, corpus: dict, job_description: str, concurrency: int, args) -> dict:
+    faults = dict(SCENARIOS[scenario])
+    faults.setdefault('latency_dist', args.latency_dist)
+    # A fresh gateway (and port) per run, so the shared token manager and rate controller start cold
+    with MockGateway(latency=args.latency, seed=args.seed, **faults) as gateway:
+        config = dict(gateway.config(API_CONFIG), max_concurrency=concurrency)
+        if args.backoff_base is not None:
+            config['backoff_base'] = args.backoff_base
+        analysis_metrics = LLMMetrics()
+        client = ApolloAPIClient(use_cache=False, metrics=analysis_metrics)
+        client.config = config
+        start = time.perf_counter()
+        results = client.analyze_resumes_parallel(corpus, job_description, batch_size=concurrency, packed=args.packed)
+        analysis_time = time.perf_counter() - start
+
+        candidates = [r for r in results if 'error' not in r][:args.guides]
+        guide_metrics = LLMMetrics()
+        guide_client = ApolloAPIClient(use_cache=False, metrics=guide_metrics)
+        guide_client.config = config
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            guides = list(executor.map(lambda c: guide_client.generate_interview_questions(c, job_description,
+                                                                                           use_cache=False), candidates))
+        guide_time = time.perf_counter() - start
+
+    analysis = analysis_metrics.snapshot()
+    guide = guide_metrics.snapshot()
+    return {
+        'scenario': scenario,
+        'concurrency': concurrency,
+        'resumes': len(corpus),
+        'seconds': round(analysis_time, 3),
+        'resumes_per_sec': round(len(corpus) / analysis_time, 2),
+        'failure_rate': round(sum('error' in r for r in results) / max(1, len(results)), 4),
+        # Request latency of the final attempt; call_p95 adds queueing for a slot, backoff and retries
+        'p50': analysis['latency_seconds']['p50'],
+        'p95': analysis['latency_seconds']['p95'],
+        'p99': analysis['latency_seconds']['p99'],
+        'call_p95': analysis['total_seconds']['p95'],
+        'calls': analysis['calls'],
+        'retries': analysis['retries'],
+        'repaired': analysis['parse']['repaired'],
+        'guides': len(candidates),
+        'guides_per_sec': round(len(candidates) / guide_time, 2) if candidates else None,
+        'guide_failure_rate': round(sum(g is None for g in guides) / len(guides), 4) if guides else None,
+        'guide_p95': guide['total_seconds']['p95'],
+        'faults': dict(gateway.faults),
+        'token_requests': gateway.token_requests
+    }
+
+def print_row(row: dict):
+    faults = ' '.join(f"{k}:{v}" for k, v in row['faults'].items() if v)
+    guides = f"{row['guides_per_sec']:>9.1f}{row['guide_p95'] or 0:>9.2f}" if row['guides'] else f"{'-':>9}{'-':>9}"
+    print(f"{row['scenario']:<11}{row['concurrency']:>5}{row['resumes_per_sec']:>10.1f}{row['p50'] or 0:>8.2f}"
+          f"{row['p95'] or 0:>8.2f}{row['p99'] or 0:>8.2f}{row['call_p95'] or 0:>9.2f}{row['failure_rate']:>8.1%}"
+          f"{row['retries']:>8}{row['repaired']:>9}{guides}  {faults}")
+
+def find_regressions(rows: list, baseline: list, tolerance: float) -> list:
+    previous = {(r['scenario'], r['concurrency']): r for r in baseline}
+    regressions = []
+    for row in rows:
+        before = previous.get((row['scenario'], row['concurrency']))
+        if before is None:
+            continue
+        label = f"{row['scenario']}@{row['concurrency']}"
+        if row['resumes_per_sec'] < before['resumes_per_sec'] * (1 - tolerance):
+            regressions.append(f"{label}: {row['resumes_per_sec']} resumes/s, was {before['resumes_per_sec']}")
+        if before['p95'] and row['p95'] and row['p95'] > before['p95'] * (1 + tolerance):
+            regressions.append(f"{label}: p95 {row['p95']}s, was {before['p95']}s")
+        if row['failure_rate'] > before['failure_rate'] + BENCH_CONFIG['failure_slack']:
+            regressions.append(f"{label}: failure rate {row['failure_rate']:.1%}, was {before['failure_rate']:.1%}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--resumes', type=int, default=100, help='corpus size, sample_resumes/ repeated with unique suffixes')
+    parser.add_argument('--guides', type=int, default=20, help='interview guides to generate per run')
+    parser.add_argument('--latency', type=float, default=0.3, help='mean mock completion latency in seconds')
+    parser.add_argument('--latency-dist', choices=LATENCY_DISTRIBUTIONS, default='normal')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[4, 16, 32])
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--packed', action='store_true', help='several resumes per request')
+    parser.add_argument('--backoff-base', type=float, default=None, help='override API_CONFIG backoff_base (seconds)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--baseline', help='results file of an earlier run to compare against')
+    parser.add_argument('--tolerance', type=float, default=BENCH_CONFIG['tolerance'])
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.resumes)
+    job_description = (ROOT / 'data' / 'Job_Description_Data_Engineer.txt').read_text(encoding='utf-8')
+
+    print(f"{'scenario':<11}{'conc':>5}{'resume/s':>10}{'p50':>8}{'p95':>8}{'p99':>8}{'call p95':>9}{'failed':>8}{'retries':>8}"
+          f"{'repaired':>9}{'guide/s':>9}{'g.p95':>9}  faults")
+    rows = []
+    for scenario in args.scenarios:
+        for concurrency in args.concurrency:
+            row = run_scenario(scenario, corpus, job_description, concurrency, args)
+            print_row(row)
+            rows.append(row)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(rows, indent=2), encoding='utf-8')
+    if args.baseline:
+        regressions = find_regressions(rows, json.loads(Path(args.baseline).read_text(encoding='utf-8')), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,258 @@
+"""Local stand-in for the Apollo gateway (OAuth token + chat/completions) used by the benchmarks.
+
+Besides latency it can inject the gateway's failure modes: tokens that expire early (401), throttling
+(429 with Retry-After), bursts of 5xx, malformed completions and non-JSON (HTML) 200 responses.
+"""
+import re
+import json
+import math
+import zlib
+import time
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SAMPLE_ANALYSIS = {
+    'candidate_name': 'Mock Candidate',
+    'email': 'mock@example.com',
+    'phone': '+00 0000 0000',
+    'years_experience': 6,
+    'technical_fit_score': 78,
+    'technical_fit_justification': 'Mock justification',
+    'behavioral_scores': {
+        key: {'score': 4, 'justification': 'Mock evidence'}
+        for key in ['communicate_with_candor', 'decide_and_act_with_speed', 'innovate_and_drive_change',
+                    'deliver_to_win', 'collaborate_with_a_purpose']
+    },
+    'overall_recommendation': 'SHORTLIST',
+    'recommendation_justification': 'Mock summary',
+    'key_strengths': ['Python', 'Spark', 'AWS'],
+    'key_concerns': ['None'],
+    'missing_requirements': [],
+    'skills': ['Python (6 years)', 'Spark', 'AWS', 'SQL'],
+    'experience_summary': 'Mock data engineer, 6 years of batch and streaming pipelines'
+}
+
+# Fields answered by the two-stage profile and match prompts
+PROFILE_KEYS = ['candidate_name', 'email', 'phone', 'years_experience', 'skills', 'experience_summary',
+                'behavioral_scores', 'key_strengths']
+MATCH_KEYS = ['technical_fit_score', 'technical_fit_justification', 'overall_recommendation',
+              'recommendation_justification', 'key_concerns', 'missing_requirements']
+FULL_ANALYSIS_CHARS = len(json.dumps(SAMPLE_ANALYSIS, indent=2))
+
+SAMPLE_INTERVIEW = {
+    'technical_questions': [
+        {'question': f'Mock technical question {i}', 'why_ask': 'Mock reason', 'good_answer': 'Mock answer'}
+        for i in range(1, 6)
+    ],
+    'behavioral_questions': [
+        {'behavior': f'Mock behavior {i}', 'question': f'Mock behavioral question {i}', 'why_ask': 'Mock reason',
+         'good_answer': 'Mock answer'}
+        for i in range(1, 6)
+    ],
+    'case_study': {
+        'scenario': 'Mock scenario',
+        'what_to_assess': ['Mock skill'],
+        'evaluation_criteria': ['Mock criterion']
+    }
+}
+
+class MockGatewayHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body: dict, headers: dict = None):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_sse(self, content: str, duration: float, usage: dict = None):
+        """Stream content as OpenAI-style chat.completion.chunk events over chunked transfer encoding"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        pieces = [content[i:i + 24] for i in range(0, len(content), 24)]
+        events = [{'choices': [{'index': 0, 'delta': {'content': piece}}]} for piece in pieces]
+        if usage:
+            events.append({'choices': [], 'usage': usage})
+        for event in [f"data: {json.dumps(e)}\n\n" for e in events] + ['data: [DONE]\n\n']:
+            data = event.encode('utf-8')
+            self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b'\r\n')
+            self.wfile.flush()
+            time.sleep(duration / (len(pieces) + 1))
+        self.wfile.write(b'0\r\n\r\n')
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+        gateway = self.server.gateway
+        if self.path.endswith('/oauth/token'):
+            self._send_json(200, {'access_token': gateway.issue_token(), 'expires_in': 3600})
+            return
+
+        payload = json.loads(body)
+        prompt = payload['messages'][-1]['content']
+        token = self.headers.get('Authorization', '').replace('Bearer ', '', 1)
+        fault, delay = gateway.admit(token, len(prompt))
+        if fault == 401:
+            self._send_json(401, {'error': 'invalid_token'})
+            return
+        if fault == 429:
+            self._send_json(429, {'error': 'rate_limited'}, {'Retry-After': f"{gateway.retry_after:g}"})
+            return
+        if fault == 503:
+            time.sleep(delay * 0.1)
+            self._send_json(503, {'error': 'upstream_unavailable'})
+            return
+        if fault == 'html':
+            data = b'<html><body><h1>Gateway error</h1></body></html>'
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+        # Packed requests name their resumes "=== RESUME R1 ===" and expect one object per id
+        resume_ids = re.findall(r'^=== RESUME (\S+) ===$', prompt, flags=re.MULTILINE)
+        if resume_ids:
+            content = json.dumps([dict(SAMPLE_ANALYSIS, resume_id=resume_id) for resume_id in resume_ids])
+        elif prompt.startswith('Generate interview questions'):
+            content = json.dumps(SAMPLE_INTERVIEW, indent=2)
+        elif prompt.startswith(('Profile this resume', 'Match the candidate profile')):
+            keys = PROFILE_KEYS if prompt.startswith('Profile') else MATCH_KEYS
+            reply = {key: SAMPLE_ANALYSIS[key] for key in keys}
+            if 'experience_summary' in reply:
+                # One profile per resume, as a real model would give, so match requests stay distinct
+                reply['experience_summary'] += f" (resume {zlib.crc32(prompt.encode('utf-8')):08x})"
+            content = json.dumps(reply, indent=2)
+            # Shorter completions finish sooner
+            delay *= len(content) / FULL_ANALYSIS_CHARS
+        else:
+            content = json.dumps(SAMPLE_ANALYSIS, indent=2)
+        usage = {'prompt_tokens': len(prompt) // 4, 'completion_tokens': len(content) // 4,
+                 'total_tokens': (len(prompt) + len(content)) // 4}
+        if fault == 'malformed':
+            # Cut off mid-object, like a completion that hit max_tokens or a proxy that dropped the tail
+            content = content[:len(content) // 2]
+        delay *= max(1, len(resume_ids)) ** 0.5
+        if payload.get('stream'):
+            # First token after a fifth of the latency, the rest spread over the remainder
+            time.sleep(delay * 0.2)
+            self._send_sse(content, delay * 0.8, usage)
+            return
+        time.sleep(delay)
+        self._send_json(200, {
+            'choices': [{'message': {'role': 'assistant', 'content': content}}],
+            'usage': usage
+        })
+
+LATENCY_DISTRIBUTIONS = ['normal', 'lognormal', 'exponential', 'fixed']
+
+class MockGateway:
+    """Mock gateway server; latency is the mean (median for lognormal) completion time in seconds.
+
+    token_ttl: seconds after which an issued token is rejected with 401, although it was issued for an hour
+    throttle_rate: share of completions answered 429 with a Retry-After of retry_after seconds
+    error_rate, error_burst: share of completions that start a run of error_burst consecutive 503s
+    malformed_rate: share of completions whose JSON is cut off halfway
+    html_rate: share of completions answered 200 with an HTML page instead of JSON, as from a proxy or login wall
+    """
+
+    def __init__(self, latency: float = 0.5, host: str = '127.0.0.1', port: int = 0, latency_dist: str = 'normal',
+                 token_ttl: float = None, throttle_rate: float = 0.0, retry_after: float = 1.0, error_rate: float = 0.0,
+                 error_burst: int = 1, malformed_rate: float = 0.0, html_rate: float = 0.0, seed: int = None):
+        if latency_dist not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"latency_dist must be one of {LATENCY_DISTRIBUTIONS}")
+        self.latency = latency
+        self.latency_dist = latency_dist
+        self.token_ttl = token_ttl
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.error_rate = error_rate
+        self.error_burst = error_burst
+        self.malformed_rate = malformed_rate
+        self.html_rate = html_rate
+        self.token_requests = 0
+        self.chat_requests = 0
+        self.prompt_chars = 0
+        self.faults = {'401': 0, '429': 0, '5xx': 0, 'malformed': 0, 'html': 0}
+        self._tokens = {}
+        self._burst_left = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        ThreadingHTTPServer.request_queue_size = 512
+        self.server = ThreadingHTTPServer((host, port), MockGatewayHandler)
+        self.server.daemon_threads = True
+        self.server.gateway = self
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def sample_latency(self) -> float:
+        if self.latency_dist == 'lognormal':
+            # Median at latency with a long right tail (p99 about 3x the median)
+            return self._random.lognormvariate(math.log(self.latency), 0.5) if self.latency > 0 else 0.0
+        if self.latency_dist == 'exponential':
+            return self._random.expovariate(1 / self.latency) if self.latency > 0 else 0.0
+        if self.latency_dist == 'fixed':
+            return self.latency
+        return max(0.0, self._random.gauss(self.latency, self.latency * 0.1))
+
+    def issue_token(self) -> str:
+        with self._lock:
+            self.token_requests += 1
+            token = f"mock-token-{self.token_requests}"
+            self._tokens[token] = time.time()
+            return token
+
+    def admit(self, token: str, prompt_chars: int):
+        """Fault to inject for one completion request (401, 429, 503, 'malformed', 'html' or None) and its latency"""
+        with self._lock:
+            self.chat_requests += 1
+            self.prompt_chars += prompt_chars
+            delay = self.sample_latency()
+            issued = self._tokens.get(token)
+            if issued is None or (self.token_ttl is not None and time.time() - issued > self.token_ttl):
+                fault = 401
+            elif self._burst_left > 0:
+                self._burst_left -= 1
+                fault = 503
+            elif self._random.random() < self.error_rate:
+                self._burst_left = self.error_burst - 1
+                fault = 503
+            elif self._random.random() < self.throttle_rate:
+                fault = 429
+            elif self._random.random() < self.malformed_rate:
+                fault = 'malformed'
+            elif self._random.random() < self.html_rate:
+                fault = 'html'
+            else:
+                fault = None
+            if fault is not None:
+                self.faults['5xx' if fault == 503 else str(fault)] += 1
+            return fault, delay
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def config(self, base_config: dict) -> dict:
+        """Copy of an API_CONFIG pointed at this server"""
+        return dict(base_config,
+                    token_url=f"{self.base_url}/api/oauth/token",
+                    api_url=f"{self.base_url}/apollo/llm-api/")
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
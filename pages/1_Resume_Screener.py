@@ -1,11 +1,21 @@
 import streamlit as st
-import pandas as pd
 import sys
+import json
+import time
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent.parent))
 from utils.apollo_api import ApolloAPIClient
-from utils.resume_parser import extract_text_from_file, clean_resume_text
+from utils.resume_parser import extract_texts, clean_resume_text, file_digest
+from utils.prescreen import PRESCREEN_CONFIG
+from utils.dedup import DEDUP_CONFIG
+from utils.interview_guides import get_guide_prefetcher
+from utils.results_store import ResultsStore, RECOMMENDATIONS
+from utils.export import EXPORT_FORMATS, available_formats, export_path, export_results
+from utils.llm_metrics import LLMMetrics
+from utils.scheduling import NOT_EVALUATED
+from utils.screening import screen_resumes, SCREENING_OPTIONS
+from utils.job_queue import get_job_queue, ensure_workers, JOB_CONFIG, ACTIVE_STATUSES
 
 st.set_page_config(page_title="Resume Screener", page_icon="🔍", layout="wide")
 
@@ -35,10 +45,194 @@ if 'job_desc' not in st.session_state:
     st.session_state.job_desc = ""
 if 'resume_files' not in st.session_state:
     st.session_state.resume_files = {}
-if 'analysis_results' not in st.session_state:
-    st.session_state.analysis_results = []
+if 'results_store' not in st.session_state:
+    st.session_state.results_store = ResultsStore()
 if 'analysis_complete' not in st.session_state:
     st.session_state.analysis_complete = False
+if 'upload_index' not in st.session_state:
+    st.session_state.upload_index = {}
+if 'job_id' not in st.session_state:
+    st.session_state.job_id = None
+    # A refreshed tab gets a new session; the job link in the URL reattaches it to its screening job
+    job_id = st.query_params.get('job')
+    if job_id and get_job_queue().get(job_id):
+        st.session_state.job_id = job_id
+        st.session_state.job_seq = 0
+        st.session_state.results_store = ResultsStore()
+        st.session_state.job_desc = get_job_queue().job_description(job_id)
+        st.session_state.stage = 2
+        st.session_state.analysis_complete = False
+
+def ingest_uploads(uploaded_files, uploader: str) -> dict:
+    """Cleaned text per uploaded filename, extracting only files that are new or whose content changed.
+
+    Every widget interaction reruns the script, so unchanged uploads are matched by name and Streamlit's
+    file_id (or, failing that, SHA-256 of the bytes) and reused from st.session_state.upload_index[uploader].
+    """
+    index = st.session_state.upload_index.get(uploader, {})
+    current = {}
+    changed = {}
+    for upload in uploaded_files:
+        entry = index.get(upload.name)
+        file_id = getattr(upload, 'file_id', None)
+        if entry and file_id and entry['file_id'] == file_id:
+            current[upload.name] = entry
+            continue
+        file_bytes = upload.getvalue()
+        digest = file_digest(file_bytes)
+        if entry and entry['digest'] == digest:
+            current[upload.name] = dict(entry, file_id=file_id)
+            continue
+        changed[upload.name] = file_bytes
+        current[upload.name] = {'file_id': file_id, 'digest': digest, 'text': ''}
+    if changed:
+        for name, text in extract_texts(changed).items():
+            current[name]['text'] = clean_resume_text(text)
+    st.session_state.upload_index[uploader] = current
+    return {name: current[name]['text'] for name in current}
+
+def screening_options() -> dict:
+    return {key: st.session_state.get(key, default) for key, default in SCREENING_OPTIONS.items()}
+
+def render_in_flight(placeholder, in_flight: dict):
+    rows = [{
+        'File': filename,
+        'Candidate': fields.get('candidate_name', '…'),
+        'Tech Fit': fields.get('technical_fit_score', '…'),
+        'Recommendation': fields.get('overall_recommendation', '…'),
+        'Fields': len(fields)
+    } for filename, fields in in_flight.items()]
+    if rows:
+        import pandas as pd
+        placeholder.dataframe(pd.DataFrame(rows), height=200, use_container_width=True)
+    else:
+        placeholder.empty()
+
+def finish_analysis(store: ResultsStore, summary: dict, stats: dict):
+    # Interview guides for the shortlist start generating now, while the recruiter reviews results
+    get_guide_prefetcher().prefetch([store.record(cid) for cid in store.ids_where('SHORTLIST')],
+                                    st.session_state.job_desc)
+    st.session_state.results_store = store
+    st.session_state.run_stats = stats
+    st.session_state.analysis_summary = summary
+    st.session_state.analysis_complete = True
+    st.session_state.stage = 3
+
+def run_inline_analysis():
+    """Screen in this script run, rendering each result as it completes (the session must stay open)"""
+    st.markdown('<div class="status-box status-info">🔄 Analyzing...</div>', unsafe_allow_html=True)
+    run_metrics = LLMMetrics()
+    api_client = ApolloAPIClient(use_cache=st.session_state.get('use_cache', True), metrics=run_metrics)
+    progress_bar = st.progress(0)
+    status_text = st.empty()
+    counters = st.empty()
+    live_table = st.empty()
+    in_flight_table = st.empty()
+    
+    options = screening_options()
+    store = ResultsStore()
+    counts = {'SHORTLIST': 0, 'MAYBE': 0, 'REJECT': 0, 'Failed': 0}
+    if options['max_shortlist'] or options['token_budget']:
+        counts[NOT_EVALUATED] = 0
+    last_render = [0.0]
+    in_flight = {}
+    last_partial_render = [0.0]
+    
+    def on_partial(filename, fields):
+        in_flight[filename] = fields
+        if time.time() - last_partial_render[0] > 0.5:
+            render_in_flight(in_flight_table, in_flight)
+            last_partial_render[0] = time.time()
+    
+    def on_row(result):
+        if in_flight.pop(result['resume_filename'], None) is not None and not in_flight:
+            render_in_flight(in_flight_table, in_flight)
+        store.add(result)
+        key = result.get('error') or result.get('overall_recommendation')
+        if key in counts:
+            counts[key] += 1
+    
+    def on_progress(done, total, summary):
+        if not done:
+            status_text.text(f"Processing {summary['queued']} resumes ({summary['prescreened']} pre-screened out, "
+                             f"{summary['duplicates']} near-duplicates), Please wait...")
+            return
+        progress_bar.progress(done / total)
+        status_text.text(f"Analyzed {done}/{total} resumes...")
+        counters.markdown(" | ".join(f"**{k}:** {v}" for k, v in counts.items()))
+        # Redrawing the table is the costly part, so cap it at a few times per second
+        if done == total or time.time() - last_render[0] > 0.5:
+            live_table.dataframe(store.frame(), height=300, hide_index=True, use_container_width=True)
+            last_render[0] = time.time()
+    
+    summary = screen_resumes(api_client, st.session_state.job_desc, st.session_state.resume_files, options,
+                             on_row=on_row, on_progress=on_progress, on_partial=on_partial)
+    progress_bar.progress(1.0)
+    finish_analysis(store, summary, {'snapshot': run_metrics.snapshot(), 'prometheus': run_metrics.prometheus()})
+    st.rerun()
+
+def run_background_analysis():
+    """Submit the screening as a job to the local worker pool, then watch it: the page stays responsive and
+    the job survives refreshes, page switches and closed tabs"""
+    queue = get_job_queue()
+    if not st.session_state.job_id:
+        st.session_state.job_id = queue.submit(st.session_state.job_desc, st.session_state.resume_files,
+                                               screening_options())
+        st.session_state.job_seq = 0
+        st.session_state.results_store = ResultsStore()
+        st.query_params['job'] = st.session_state.job_id
+    watch_job(st.session_state.job_id)
+
+@st.fragment(run_every=JOB_CONFIG['poll_interval'])
+def watch_job(job_id: str):
+    """Polls the job without rerunning the whole page: each run picks up new result rows"""
+    queue = get_job_queue()
+    ensure_workers(queue)
+    job = queue.get(job_id)
+    if job is None:
+        st.error("Screening job not found; it may have expired.")
+        st.session_state.job_id = None
+        return
+    
+    store = st.session_state.results_store
+    rows, st.session_state.job_seq = queue.results(job_id, st.session_state.job_seq)
+    store.update(rows)
+    
+    if job['status'] in ACTIVE_STATUSES:
+        if job['status'] == 'queued':
+            waiting = f"{job['position']} job(s) ahead" if job['position'] else "starting a worker"
+            st.markdown(f'<div class="status-box status-info">⏳ Queued ({waiting})...</div>', unsafe_allow_html=True)
+        else:
+            st.markdown('<div class="status-box status-info">🔄 Analyzing in the background; you can refresh or leave '
+                        'this page and reopen this link later.</div>', unsafe_allow_html=True)
+        if job['subscribers'] > 1:
+            st.caption(f"👥 The same screening was requested from {job['subscribers'] - 1} other session(s); "
+                       f"it runs once and the results are shared.")
+        st.progress(min(1.0, len(store) / max(1, job['total'])))
+        st.text(f"Analyzed {len(store)}/{job['total']} resumes...")
+        counts = store.frame()['Recommendation'].value_counts()
+        counters = {rec: int(counts.get(rec, 0)) for rec in RECOMMENDATIONS}
+        counters['Failed'] = store.errors.count('Failed')
+        st.markdown(" | ".join(f"**{k}:** {v}" for k, v in counters.items()))
+        st.dataframe(store.frame(), height=300, hide_index=True, use_container_width=True)
+        render_in_flight(st.empty(), job['partial'])
+        if st.button("⏹️ Cancel", disabled=job['cancel_requested']) and not queue.cancel(job_id):
+            # Other sessions still follow the job: only this one stops watching it
+            st.session_state.job_id = None
+            st.query_params.pop('job', None)
+            st.session_state.stage = 1
+            st.rerun()
+    elif job['status'] == 'failed':
+        st.error(f"Screening failed: {job['error']}")
+        if st.button("🔁 Retry"):
+            st.session_state.job_id = None
+            st.rerun()
+    else:
+        summary = job['summary'] or {}
+        if job['status'] == 'cancelled':
+            summary['stopped'] = f"cancelled after {len(store)} of {job['total']} resumes"
+        finish_analysis(store, summary, job['metrics'])
+        st.rerun()
 
 def main():
     with st.sidebar:
@@ -53,6 +247,27 @@ def main():
         {'✅' if st.session_state.stage > 2 else '⏳'} **Stage 2:** AI Analysis  
         {'✅' if st.session_state.stage > 3 else '📊'} **Stage 3:** Results
         """)
+        st.markdown("---")
+        st.checkbox("🧵 Run in background workers", value=False, key="background",
+                    help="Screening continues when the page is refreshed or left; results are polled from a local job queue")
+        st.checkbox("♻️ Reuse cached analyses", value=True, key="use_cache")
+        st.checkbox("📦 Pack several resumes per request", value=False, key="packed",
+                    help="Sends the job description once per group of resumes; faster and cheaper for large pools")
+        st.checkbox("🧩 Profile each resume once, match per opening", value=False, key="two_stage",
+                    help="Contact details, experience and behavioral scores are cached per resume, so screening the same "
+                         "resumes for another job only runs a short match step (not with packing)")
+        st.checkbox("📡 Show analyses as they are written", value=True, key="stream",
+                    help="Streams each reply and shows scores before the full analysis is done (not with packing)")
+        if st.checkbox("🔎 Local pre-screen", value=True, key="prescreen",
+                       help="Keyword (BM25) match against the job description; clear non-matches skip the AI call"):
+            st.slider("Pre-screen threshold", 0.0, 50.0, PRESCREEN_CONFIG['threshold'], 0.5, key="prescreen_threshold")
+        if st.checkbox("🧬 Reuse analyses of near-duplicate resumes", value=True, key="dedup",
+                       help="Re-submissions and agency copies of an already analyzed resume reuse its analysis"):
+            st.slider("Duplicate similarity", 0.5, 1.0, DEDUP_CONFIG['threshold'], 0.01, key="dedup_threshold")
+        st.number_input("🎯 Stop after N shortlisted (0 = screen all)", min_value=0, value=0, step=5, key="max_shortlist",
+                        help="Resumes are analyzed best pre-score first; once this many are shortlisted the rest are not evaluated")
+        st.number_input("🪙 Token budget (0 = unlimited)", min_value=0, value=0, step=50000, key="token_budget",
+                        help="Stops sending resumes once the analyses have used this many tokens")
     
     st.markdown("<h6 style='text-align: center;'>Resume Screener</h6>", unsafe_allow_html=True)
     st.text(' ')
@@ -66,22 +281,17 @@ def main():
         st.markdown("**📋 Job Description**")
         uploaded_jd = st.file_uploader("Upload Job Description", type=['pdf', 'txt'], key="jd")
         if uploaded_jd:
-            jd_bytes = uploaded_jd.read()
-            jd_text = extract_text_from_file(jd_bytes, uploaded_jd.name)
+            jd_text = ingest_uploads([uploaded_jd], 'jd')[uploaded_jd.name]
             if jd_text:
-                st.session_state.job_desc = clean_resume_text(jd_text)
+                st.session_state.job_desc = jd_text
                 st.success(f"✅ {uploaded_jd.name}")
     
     with col2:
         st.markdown("**📁 Candidate Resumes**")
         uploaded_resumes = st.file_uploader("Upload Resumes", type=['pdf', 'txt'], accept_multiple_files=True, key="resumes")
         if uploaded_resumes:
-            st.session_state.resume_files = {}
-            for resume in uploaded_resumes:
-                resume_bytes = resume.read()
-                resume_text = extract_text_from_file(resume_bytes, resume.name)
-                if resume_text:
-                    st.session_state.resume_files[resume.name] = clean_resume_text(resume_text)
+            texts = ingest_uploads(uploaded_resumes, 'resumes')
+            st.session_state.resume_files = {name: text for name, text in texts.items() if text}
             if st.session_state.resume_files:
                 st.success(f"✅ {len(st.session_state.resume_files)} resumes")
     
@@ -91,86 +301,44 @@ def main():
         with btn_col2:
             if st.button("🔍 Analyze", use_container_width=True, type="primary"):
                 st.session_state.stage = 2
+                st.session_state.analysis_complete = False
+                st.session_state.job_id = None
+                if 'job' in st.query_params:
+                    del st.query_params['job']
                 st.rerun()
     else:
         st.markdown('<div class="status-box status-info">ℹ️ Upload job description and resumes</div>', unsafe_allow_html=True)
     
-    # STAGE 2: AI Analysis with parallel processing
+    # STAGE 2: AI Analysis, in the background worker pool or in this script run
     if st.session_state.stage >= 2 and not st.session_state.analysis_complete:
         st.markdown("---")
         st.markdown('<div class="section-header">🤖 Stage 2: AI Analysis</div>', unsafe_allow_html=True)
-        st.markdown('<div class="status-box status-info">🔄 Analyzing...</div>', unsafe_allow_html=True)
-        
-        api_client = ApolloAPIClient()
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        
-        status_text.text(f"Processing {len(st.session_state.resume_files)} resumes, Please wait...")
-        
-        # Parallel analysis in batches of 2
-        results = api_client.analyze_resumes_parallel(
-            st.session_state.resume_files,
-            st.session_state.job_desc,
-            batch_size=2
-        )
-        
-        progress_bar.progress(1.0)
-        st.session_state.analysis_results = results
-        st.session_state.analysis_complete = True
-        st.session_state.stage = 3
-        status_text.text("✅ Complete!")
-        st.success("Analysis done!")
-        st.rerun()
+        # A job reattached from its link is watched whatever the checkbox says
+        if st.session_state.job_id or st.session_state.get('background', False):
+            run_background_analysis()
+        else:
+            run_inline_analysis()
     
     # STAGE 3: Results
     if st.session_state.stage >= 3 and st.session_state.analysis_complete:
+        # pandas is only needed once there are results to show
+        import pandas as pd
         st.markdown("---")
         st.markdown('<div class="section-header">✏️ Stage 3: Results</div>', unsafe_allow_html=True)
         
-        results = st.session_state.analysis_results
-        
-        display_data = []
-        for r in results:
-            if 'error' not in r:
-                behaviors = r.get('behavioral_scores', {})
-                behavior_scores = [
-                    behaviors.get('communicate_with_candor', {}).get('score', 0),
-                    behaviors.get('decide_and_act_with_speed', {}).get('score', 0),
-                    behaviors.get('innovate_and_drive_change', {}).get('score', 0),
-                    behaviors.get('deliver_to_win', {}).get('score', 0),
-                    behaviors.get('collaborate_with_a_purpose', {}).get('score', 0)
-                ]
-                avg_behavior = sum(behavior_scores) / len(behavior_scores) if behavior_scores else 0
-                
-                display_data.append({
-                    'Candidate': r.get('candidate_name'),
-                    'Experience': f"{r.get('years_experience', 0)} yrs",
-                    'Tech Fit': r.get('technical_fit_score', 0),
-                    'Communicate': behaviors.get('communicate_with_candor', {}).get('score', 0),
-                    'Speed': behaviors.get('decide_and_act_with_speed', {}).get('score', 0),
-                    'Innovate': behaviors.get('innovate_and_drive_change', {}).get('score', 0),
-                    'Deliver': behaviors.get('deliver_to_win', {}).get('score', 0),
-                    'Collaborate': behaviors.get('collaborate_with_a_purpose', {}).get('score', 0),
-                    'Behavior Avg': round(avg_behavior),
-                    'Recommendation': r.get('overall_recommendation'),
-                    'File': r['resume_filename']
-                })
-        
-        df = pd.DataFrame(display_data)
+        store = st.session_state.results_store
+        df = store.frame()
+        counts = df['Recommendation'].value_counts()
         
         col1, col2, col3, col4 = st.columns(4)
-        shortlisted = df[df['Recommendation'] == 'SHORTLIST']
-        maybe = df[df['Recommendation'] == 'MAYBE']
-        rejected = df[df['Recommendation'] == 'REJECT']
-        
         with col1:
             st.metric("Total", len(df))
         with col2:
-            st.metric("SHORTLIST", len(shortlisted))
+            st.metric("SHORTLIST", int(counts.get('SHORTLIST', 0)))
         with col3:
-            st.metric("MAYBE", len(maybe))
+            st.metric("MAYBE", int(counts.get('MAYBE', 0)))
         with col4:
-            st.metric("REJECT", len(rejected))
+            st.metric("REJECT", int(counts.get('REJECT', 0)))
         
         st.markdown("---")
         
@@ -180,16 +348,73 @@ def main():
                                      else 'background-color: #f8d7da' if v == 'REJECT'
                                      else '' for v in x], subset=['Recommendation']),
             height=300,
+            hide_index=True,
             use_container_width=True
         )
         
+        prescreened = [store.record(cid) for cid in store.ids_where(error='Pre-screen reject')]
+        if prescreened:
+            with st.expander(f"🔎 Pre-screened out without AI analysis ({len(prescreened)})"):
+                st.dataframe(
+                    pd.DataFrame([{'Candidate': r['candidate_name'], 'Pre-Score': r['prescreen_score'], 'File': r['resume_filename']}
+                                  for r in prescreened]),
+                    use_container_width=True
+                )
+        
+        not_evaluated = [store.record(cid) for cid in store.ids_where(error=NOT_EVALUATED)]
+        if not_evaluated:
+            with st.expander(f"⏭️ Not evaluated ({len(not_evaluated)}): {not_evaluated[0].get('not_evaluated_reason', '')}"):
+                st.dataframe(
+                    pd.DataFrame([{'Candidate': r['candidate_name'], 'Pre-Score': r.get('prescreen_score'), 'File': r['resume_filename']}
+                                  for r in not_evaluated]),
+                    use_container_width=True
+                )
+        
+        summary = st.session_state.get('analysis_summary') or {}
+        if summary:
+            stopped = f", stopped early: {summary['stopped']}" if summary.get('stopped') else ""
+            shared = f", {summary['shared']} shared with other sessions" if summary.get('shared') else ""
+            st.caption(f"✅ {summary.get('cache_hits', 0)} from cache{shared}, {summary.get('duplicates', 0)} "
+                       f"near-duplicates reused{stopped}")
+        
+        run_stats = st.session_state.get('run_stats')
+        if run_stats:
+            stats = run_stats['snapshot']
+            with st.expander(f"📈 LLM call stats ({stats['calls']} calls)"):
+                latency = stats['latency_seconds']
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    st.metric("Calls", stats['calls'], f"{stats['failed']} failed", delta_color="off")
+                with col2:
+                    st.metric("Retries", stats['retries'], f"{stats['throttled']} throttled", delta_color="off")
+                with col3:
+                    st.metric("Latency p50 / p95", f"{latency['p50'] or 0:.1f}s / {latency['p95'] or 0:.1f}s",
+                              f"p99 {latency['p99'] or 0:.1f}s", delta_color="off")
+                with col4:
+                    st.metric("Tokens (prompt / completion)", f"{stats['prompt_tokens']:,} / {stats['completion_tokens']:,}")
+                parse = stats['parse']
+                st.caption(f"Replies: {parse['parsed']} parsed, {parse['repaired']} repaired by follow-up, "
+                           f"{parse['failed']} unusable. Calls by status: "
+                           + ", ".join(f"{k} × {n}" for k, n in stats['by_status'].items()))
+                col_json, col_prom = st.columns(2)
+                with col_json:
+                    st.download_button("JSON snapshot", json.dumps(stats, indent=2), "llm_metrics.json", "application/json",
+                                       use_container_width=True)
+                with col_prom:
+                    st.download_button("Prometheus text", run_stats['prometheus'], "llm_metrics.prom", "text/plain",
+                                       use_container_width=True)
+        
         st.markdown("---")
         st.markdown("### 📋 Detailed Analysis")
         
-        selected = st.selectbox("Select candidate:", [r.get('candidate_name') for r in results if 'error' not in r])
+        names = df['Candidate']
+        repeated = set(names[names.duplicated()])
+        selected = st.selectbox("Select candidate:", list(df.index),
+                                format_func=lambda cid: f"{df.at[cid, 'Candidate']} ({df.at[cid, 'File']})"
+                                if df.at[cid, 'Candidate'] in repeated else df.at[cid, 'Candidate'])
         
         if selected:
-            candidate = next((r for r in results if r.get('candidate_name') == selected), None)
+            candidate = store.record(selected)
             
             if candidate:
                 col1, col2 = st.columns([1, 1])
@@ -201,6 +426,11 @@ def main():
                     st.markdown(f"**Experience:** {candidate.get('years_experience', 0)} years")
                     st.markdown(f"**Technical Fit:** {candidate.get('technical_fit_score')}/100")
                     st.markdown(f"**Recommendation:** **{candidate.get('overall_recommendation')}**")
+                    if candidate.get('duplicate_of'):
+                        st.caption(f"♻️ Reused analysis of near-duplicate {candidate['duplicate_of']} "
+                                   f"(similarity {candidate['duplicate_similarity']:.0%})")
+                    if candidate.get('incomplete_fields'):
+                        st.caption(f"⚠️ Not returned by the model: {', '.join(candidate['incomplete_fields'])}")
                 
                 with col2:
                     st.markdown("**Behavioral Scores:**")
@@ -246,13 +476,20 @@ def main():
         
         st.markdown("---")
         
-        if st.button("📥 Download Excel", use_container_width=True):
-            from io import BytesIO
-            output = BytesIO()
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                df.to_excel(writer, index=False)
-            output.seek(0)
-            st.download_button("📥 Download", output, "Analysis.xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+        # Exports carry every analysis field and are written to disk row by row, once per results version
+        col_fmt, col_btn = st.columns([1, 2])
+        with col_fmt:
+            export_format = st.selectbox("Export format", available_formats(), format_func=str.upper,
+                                         label_visibility="collapsed")
+        with col_btn:
+            path = export_path(store, export_format)
+            if not path.exists() and st.button("📦 Prepare export", use_container_width=True):
+                with st.spinner(f"Writing {export_format.upper()}..."):
+                    export_results(store, export_format)
+            if path.exists():
+                with open(path, 'rb') as f:
+                    st.download_button("📥 Download", f, f"Analysis.{export_format}", EXPORT_FORMATS[export_format][1],
+                                       use_container_width=True)
 
 if __name__ == "__main__":
     main()
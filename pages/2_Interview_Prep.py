@@ -3,7 +3,8 @@ import sys
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent.parent))
-from utils.apollo_api import ApolloAPIClient
+from utils.apollo_api import get_api_client
+from utils.interview_guides import get_guide_prefetcher
 
 st.set_page_config(page_title="Interview Prep", page_icon="💼", layout="wide")
 
@@ -23,9 +24,6 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-if 'interview_questions' not in st.session_state:
-    st.session_state.interview_questions = None
-
 def main():
     with st.sidebar:
         st.text(' ')
@@ -40,7 +38,7 @@ def main():
     st.markdown("<h6 style='text-align: center;'>Interview Prep</h6>", unsafe_allow_html=True)
     st.text(' ')
     
-    if 'analysis_results' not in st.session_state or not st.session_state.analysis_results:
+    if 'results_store' not in st.session_state or not len(st.session_state.results_store):
         st.warning("⚠️ Run Resume Screener first.")
         if st.button("Go to Resume Screener"):
             st.switch_page("pages/1_Resume_Screener.py")
@@ -48,37 +46,67 @@ def main():
     
     st.markdown('<div class="section-header">💼 Generate Questions</div>', unsafe_allow_html=True)
     
-    shortlisted = [r for r in st.session_state.analysis_results 
-                   if r.get('overall_recommendation') == 'SHORTLIST' and 'error' not in r]
+    store = st.session_state.results_store
+    shortlisted = store.ids_where('SHORTLIST')
     
     if not shortlisted:
-        shortlisted = [r for r in st.session_state.analysis_results if 'error' not in r]
+        shortlisted = store.ids_where()
     
-    candidate_names = [r.get('candidate_name') for r in shortlisted]
-    selected_candidate = st.selectbox("Select candidate:", candidate_names)
+    job_desc = st.session_state.get('job_desc', 'Senior Data Engineer')
+    candidates = {cid: store.record(cid) for cid in shortlisted}
     
-    if st.button("🤖 Generate Questions", type="primary"):
-        candidate_data = next((r for r in shortlisted if r.get('candidate_name') == selected_candidate), None)
-        
-        if candidate_data:
-            with st.spinner("Generating..."):
-                api_client = ApolloAPIClient()
-                questions = api_client.generate_interview_questions(
-                    candidate_data, 
-                    st.session_state.get('job_desc', 'Senior Data Engineer')
-                )
-                
-                if questions:
-                    st.session_state.interview_questions = questions
-                    st.session_state.selected_candidate = selected_candidate
-                    st.success("✅ Generated!")
-                    st.rerun()
-                else:
-                    st.error("Failed. Retry.")
+    # Guides for the shortlist are generated in the background (started when screening completes);
+    # this call only starts the ones that are missing
+    prefetcher = get_guide_prefetcher()
+    prefetcher.prefetch([c for c in candidates.values() if c.get('overall_recommendation') == 'SHORTLIST'], job_desc)
+    status = {cid: prefetcher.status(prefetcher.key(c, job_desc)) for cid, c in candidates.items()}
+    pending = [store.name(cid) for cid, s in status.items() if s == 'pending']
+    if pending:
+        col_info, col_refresh = st.columns([5, 1])
+        with col_info:
+            st.info(f"⏳ Preparing {len(pending)} guide(s) in the background: {', '.join(pending)}")
+        with col_refresh:
+            st.button("🔄 Refresh", use_container_width=True)
+    
+    icons = {'ready': '✅', 'pending': '⏳', 'failed': '⚠️'}
+    selected_id = st.selectbox("Select candidate:", shortlisted,
+                               format_func=lambda cid: f"{icons.get(status.get(cid), '➕')} {store.name(cid)}")
+    selected_candidate = store.name(selected_id) if selected_id else None
+    candidate_data = candidates.get(selected_id)
+    guide_key = prefetcher.key(candidate_data, job_desc) if candidate_data else None
+    questions = prefetcher.get(guide_key) if guide_key else None
     
-    if st.session_state.interview_questions and st.session_state.get('selected_candidate') == selected_candidate:
-        questions = st.session_state.interview_questions
+    if candidate_data and questions is None and status.get(selected_id) == 'pending':
+        st.markdown(f"⏳ The guide for {selected_candidate} is still being prepared; refresh in a moment.")
+    elif candidate_data and questions is None and st.button("🤖 Generate Questions", type="primary"):
+        preview = st.empty()
         
+        def on_partial(fields):
+            # Questions appear one by one while the guide is still being written
+            lines = [f"**Drafting guide for {selected_candidate}...**"]
+            for idx, q in enumerate(fields.get('technical_questions', []), 1):
+                lines.append(f"🔧 Q{idx}: {q.get('question', '') if isinstance(q, dict) else q}")
+            for idx, q in enumerate(fields.get('behavioral_questions', []), 1):
+                lines.append(f"🎯 Q{idx}: {q.get('question', '') if isinstance(q, dict) else q}")
+            if isinstance(fields.get('case_study'), dict):
+                lines.append(f"📝 Case study: {fields['case_study'].get('scenario', '')}")
+            preview.markdown("  \n".join(lines))
+        
+        with st.spinner("Generating..."):
+            questions = get_api_client().generate_interview_questions(
+                candidate_data, 
+                job_desc,
+                on_partial=on_partial
+            )
+            
+            if questions:
+                prefetcher.put(guide_key, questions)
+                st.success("✅ Generated!")
+                st.rerun()
+            else:
+                st.error("Failed. Retry.")
+    
+    if questions:
         st.markdown("---")
         st.markdown(f"### 📋 Interview Guide: {selected_candidate}")
         
@@ -1,6 +1,12 @@
 import streamlit as st
-import plotly.graph_objects as go
-import pandas as pd
+import numpy as np
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from utils.response_parser import BEHAVIOR_KEYS
+from utils.results_store import RECOMMENDATIONS
+from utils.behavior_matrix import behavior_average, cluster_order, score_distribution, downsample_rows, display_scores
 
 st.set_page_config(page_title="Behavioral Assessment", page_icon="🎯", layout="wide")
 
@@ -20,6 +26,43 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Above these sizes the heatmap is aggregated and per-cell text dropped
+DETAIL_ROWS = 60
+MAX_HEATMAP_ROWS = 200
+PAGE_SIZE = 50
+
+def get_score_matrix(store):
+    """Analyzed rows of the results store, with orderings computed once per store version rather than on every rerun"""
+    token = (id(store), store.version)
+    cached = st.session_state.get('behavior_matrix')
+    if cached is None or cached['token'] != token:
+        n = len(store)
+        mask = store.analyzed_mask()
+        scores = store.behavior[:n][mask]
+        cached = {
+            'token': token,
+            'ids': np.array(store.ids, dtype=object)[mask],
+            'names': np.array(store.names, dtype=object)[mask],
+            'recommendations': np.array(RECOMMENDATIONS + [None], dtype=object)[store.recommendation[:n][mask]],
+            'scores': scores,
+            'tech': store.tech[:n][mask].astype(np.int16),
+            'average': behavior_average(scores),
+            'orders': {}
+        }
+        st.session_state.behavior_matrix = cached
+    return cached
+
+def row_order(matrix, order_by):
+    if order_by not in matrix['orders']:
+        if order_by == 'Clustered profile':
+            order = cluster_order(matrix['scores'])
+        elif order_by == 'Technical fit':
+            order = np.lexsort((-matrix['average'], -matrix['tech']))
+        else:
+            order = np.lexsort((-matrix['tech'], -matrix['average']))
+        matrix['orders'][order_by] = order
+    return matrix['orders'][order_by]
+
 def main():
     with st.sidebar:
         st.text(' ')
@@ -34,18 +77,24 @@ def main():
     st.markdown("<h6 style='text-align: center;'>Behavioral Assessment</h6>", unsafe_allow_html=True)
     st.text(' ')
     
-    if 'analysis_results' not in st.session_state or not st.session_state.analysis_results:
+    if 'results_store' not in st.session_state or not len(st.session_state.results_store):
         st.warning("⚠️ Run Resume Screener first.")
         if st.button("Go to Resume Screener"):
             st.switch_page("pages/1_Resume_Screener.py")
         return
     
-    results = [r for r in st.session_state.analysis_results if 'error' not in r]
+    store = st.session_state.results_store
+    matrix = get_score_matrix(store)
+    n = len(matrix['ids'])
     
-    if not results:
+    if not n:
         st.error("No valid results.")
         return
     
+    # Charting libraries load only when there is something to chart
+    import pandas as pd
+    import plotly.graph_objects as go
+    
     st.markdown('<div class="section-header">📊 Behavioral Analysis</div>', unsafe_allow_html=True)
     
     behavior_labels = {
@@ -59,20 +108,17 @@ def main():
     # Radar Chart
     st.markdown("### 🎯 Top Candidates - Behavioral Radar Chart")
     
-    shortlisted = [r for r in results if r.get('overall_recommendation') == 'SHORTLIST'][:5]
+    shortlisted = np.flatnonzero(matrix['recommendations'] == 'SHORTLIST')[:5]
     
-    if shortlisted:
+    if len(shortlisted):
         fig = go.Figure()
         
-        for candidate in shortlisted:
-            behaviors = candidate.get('behavioral_scores', {})
-            scores = [behaviors.get(key, {}).get('score', 0) for key in behavior_labels.keys()]
-            
+        for row in shortlisted:
             fig.add_trace(go.Scatterpolar(
-                r=scores,
-                theta=list(behavior_labels.values()),
+                r=matrix['scores'][row],
+                theta=[behavior_labels[key] for key in BEHAVIOR_KEYS],
                 fill='toself',
-                name=candidate.get('candidate_name', 'Unknown')
+                name=matrix['names'][row]
             ))
         
         fig.update_layout(
@@ -87,37 +133,93 @@ def main():
     
     st.markdown("---")
     
-    # Heatmap
-    st.markdown("### 🔥 All Candidates - Behavioral Heatmap")
+    labels = [behavior_labels[key] for key in BEHAVIOR_KEYS]
     
-    heatmap_data = []
-    candidate_names = []
+    # Score distributions: cheap at any pool size
+    st.markdown(f"### 📶 Score Distribution ({n} candidates)")
+    distribution = score_distribution(matrix['scores'])
+    fig = go.Figure()
+    for score in range(1, 6):
+        fig.add_trace(go.Bar(x=labels, y=distribution[:, score], name=f"{score}/5"))
+    fig.update_layout(barmode='stack', height=400, yaxis_title="Candidates", colorway=[
+        '#d73027', '#fc8d59', '#fee08b', '#91cf60', '#1a9850'])
+    st.plotly_chart(fig, use_container_width=True)
     
-    for r in results:
-        candidate_names.append(r.get('candidate_name', 'Unknown'))
-        behaviors = r.get('behavioral_scores', {})
-        row = [behaviors.get(key, {}).get('score', 0) for key in behavior_labels.keys()]
-        heatmap_data.append(row)
+    st.markdown("---")
+    
+    # Heatmap
+    st.markdown("### 🔥 All Candidates - Behavioral Heatmap")
+    order_by = st.radio("Order by:", ['Behavior average', 'Technical fit', 'Clustered profile'], horizontal=True)
+    order = row_order(matrix, order_by)
     
-    if heatmap_data:
+    if n <= DETAIL_ROWS:
+        z = matrix['scores'][order]
         fig = go.Figure(data=go.Heatmap(
-            z=heatmap_data,
-            x=list(behavior_labels.values()),
-            y=candidate_names,
+            z=z,
+            x=labels,
+            y=[f"{i + 1}. {name}" for i, name in enumerate(matrix['names'][order])],
             colorscale='RdYlGn',
-            text=heatmap_data,
+            text=z,
             texttemplate='%{text}',
             textfont={"size": 12},
             colorbar=dict(title="Score (1-5)")
         ))
-        
-        fig.update_layout(
-            height=max(400, len(candidate_names) * 40),
-            xaxis_title="Behavioral Competencies",
-            yaxis_title="Candidates"
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        fig.update_layout(height=max(400, n * 40), yaxis=dict(autorange='reversed'))
+    else:
+        # Bands of consecutive candidates (in the chosen order) averaged into one row each
+        z, ranges = downsample_rows(matrix['scores'][order], MAX_HEATMAP_ROWS)
+        fig = go.Figure(data=go.Heatmap(
+            z=z,
+            x=labels,
+            y=[f"#{start + 1}-{end}" if end - start > 1 else f"#{start + 1}" for start, end in ranges],
+            colorscale='RdYlGn',
+            zmin=1, zmax=5,
+            hovertemplate='%{y}<br>%{x}: %{z:.2f}<extra></extra>',
+            colorbar=dict(title="Avg score")
+        ))
+        fig.update_layout(height=700, yaxis=dict(autorange='reversed', showticklabels=len(ranges) <= 60))
+        st.caption(f"{n} candidates shown as {len(ranges)} bands of about {n // len(ranges)}; "
+                   f"use the table below for individual candidates.")
+    fig.update_layout(xaxis_title="Behavioral Competencies", yaxis_title="Candidates")
+    st.plotly_chart(fig, use_container_width=True)
+    
+    st.markdown("---")
+    
+    # WebGL scatter stays responsive with tens of thousands of points
+    st.markdown("### 🧭 Technical Fit vs Behavior")
+    fig = go.Figure()
+    for rec, color in [('SHORTLIST', '#28a745'), ('MAYBE', '#ffc107'), ('REJECT', '#dc3545')]:
+        mask = matrix['recommendations'] == rec
+        fig.add_trace(go.Scattergl(
+            x=matrix['tech'][mask],
+            y=matrix['average'][mask] + np.random.default_rng(0).uniform(-0.05, 0.05, int(mask.sum())),
+            mode='markers',
+            name=rec,
+            text=matrix['names'][mask],
+            hovertemplate='%{text}<br>Tech fit %{x}<br>Behavior avg %{y:.1f}<extra></extra>',
+            marker=dict(color=color, size=6 if n <= 1000 else 3, opacity=0.7)
+        ))
+    fig.update_layout(height=450, xaxis_title="Technical Fit", yaxis_title="Behavior Average", yaxis=dict(range=[0, 5.2]))
+    st.plotly_chart(fig, use_container_width=True)
+    
+    st.markdown("---")
+    
+    # Ranked table, paginated
+    st.markdown("### 🏅 Ranked Candidates")
+    col1, col2 = st.columns(2)
+    with col1:
+        top_k = st.number_input("Top K", min_value=1, max_value=n, value=min(n, 100), step=10)
+    pages = max(1, -(-int(top_k) // PAGE_SIZE))
+    with col2:
+        page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1)
+    rows = order[:int(top_k)][(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+    table = pd.DataFrame(display_scores(matrix['scores'][rows]), columns=labels)
+    table.insert(0, 'Rank', np.arange((page - 1) * PAGE_SIZE + 1, (page - 1) * PAGE_SIZE + 1 + len(rows)))
+    table.insert(1, 'Candidate', matrix['names'][rows])
+    table['Behavior Avg'] = matrix['average'][rows].round(2)
+    table['Tech Fit'] = matrix['tech'][rows]
+    table['Recommendation'] = matrix['recommendations'][rows]
+    st.dataframe(table, hide_index=True, use_container_width=True)
 
 if __name__ == "__main__":
     main()
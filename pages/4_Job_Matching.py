@@ -0,0 +1,185 @@
+import streamlit as st
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from utils.apollo_api import ApolloAPIClient
+from utils.resume_parser import extract_texts, clean_resume_text, file_digest
+from utils.results_store import ResultsStore
+from utils.llm_metrics import LLMMetrics
+from utils.screening import screen_matrix, SCREENING_OPTIONS
+
+st.set_page_config(page_title="Job Matching", page_icon="🧭", layout="wide")
+
+st.markdown("""
+<style>
+    .main { background-color: white; }
+    .stApp { background-color: white !important; }
+    [data-testid="collapsedControl"] { display: none; }
+    [data-testid="stSidebarNav"] { display: none; }
+    .section-header { font-size: 22px; font-weight: bold; color: #08312A; margin: 30px 0 15px 0; padding: 10px 0; border-bottom: 3px solid #00E47C; }
+    .status-box { padding: 15px; border-radius: 8px; margin: 15px 0; font-size: 14px; }
+    .status-success { background-color: #d4edda; border-left: 4px solid #28a745; color: #155724; }
+    .status-info { background-color: #d1ecf1; border-left: 4px solid #17a2b8; color: #0c5460; }
+    .stButton > button {
+        background: linear-gradient(135deg, #00E47C 0%, #08312A 100%) !important;
+        color: white !important;
+        border-radius: 8px !important;
+        padding: 12px 24px !important;
+        font-weight: 600 !important;
+    }
+</style>
+""", unsafe_allow_html=True)
+
+if 'matching_uploads' not in st.session_state:
+    st.session_state.matching_uploads = {}
+
+def read_uploads(uploaded_files) -> dict:
+    """Cleaned text per uploaded filename; files already extracted in this session are reused by content hash.
+    Uploads sharing a filename are kept apart as "name (2).ext" and so on, with a warning."""
+    cache = st.session_state.matching_uploads
+    texts = {}
+    changed = {}
+    for upload in uploaded_files:
+        name = upload.name
+        copy = 2
+        while name in texts or name in changed:
+            name = f"{Path(upload.name).stem} ({copy}){Path(upload.name).suffix}"
+            copy += 1
+        if name != upload.name:
+            st.warning(f"⚠️ Two uploads are named {upload.name}; the second one is listed as {name}")
+        file_bytes = upload.getvalue()
+        digest = file_digest(file_bytes)
+        if digest in cache:
+            texts[name] = cache[digest]
+        else:
+            changed[name] = (digest, file_bytes)
+    if changed:
+        for name, text in extract_texts({name: data for name, (_, data) in changed.items()}).items():
+            texts[name] = cache[changed[name][0]] = clean_resume_text(text)
+    return {name: text for name, text in texts.items() if text}
+
+def run_matching(job_descriptions: dict, resume_files: dict):
+    st.markdown('<div class="status-box status-info">🔄 Matching...</div>', unsafe_allow_html=True)
+    run_metrics = LLMMetrics()
+    api_client = ApolloAPIClient(use_cache=st.session_state.get('use_cache', True), metrics=run_metrics)
+    progress_bar = st.progress(0)
+    status_text = st.empty()
+
+    def on_progress(done, total):
+        if not done:
+            status_text.text(f"Matching {total} resume/job pairs, Please wait...")
+            return
+        progress_bar.progress(done / total)
+        status_text.text(f"Matched {done}/{total} pairs...")
+
+    options = {key: st.session_state.get(key, default) for key, default in SCREENING_OPTIONS.items()}
+    st.session_state.matching = screen_matrix(api_client, job_descriptions, resume_files, options,
+                                              on_progress=on_progress)
+    st.session_state.matching['job_descriptions'] = job_descriptions
+    st.session_state.matching['calls'] = run_metrics.snapshot()['calls']
+    progress_bar.progress(1.0)
+    st.rerun()
+
+def open_in_screener(job: str):
+    """Hand one job's column to the Resume Screener, Interview Prep and Behavioral Assessment pages"""
+    matching = st.session_state.matching
+    store = ResultsStore()
+    store.update(matching['results'][job])
+    st.session_state.results_store = store
+    st.session_state.job_desc = matching['job_descriptions'][job]
+    st.session_state.analysis_summary = {'cache_hits': matching['summary']['cache_hits']}
+    st.session_state.run_stats = None
+    st.session_state.analysis_complete = True
+    st.session_state.stage = 3
+    st.switch_page("pages/1_Resume_Screener.py")
+
+def main():
+    with st.sidebar:
+        st.text(' ')
+        st.image("BI-Logo.png", width=125)
+        st.text(' ')
+        if st.button("🏠 Home", use_container_width=True):
+            st.switch_page("Home.py")
+        st.markdown("---")
+        if st.button("🔍 Resume Screener", use_container_width=True):
+            st.switch_page("pages/1_Resume_Screener.py")
+        st.markdown("---")
+        st.checkbox("♻️ Reuse cached analyses", value=True, key="use_cache")
+        if st.checkbox("🔎 Local pre-screen", value=True, key="prescreen",
+                       help="Keyword (BM25) match per job description; clear non-matches skip the AI call for that job"):
+            st.slider("Pre-screen threshold", 0.0, 50.0, SCREENING_OPTIONS['prescreen_threshold'], 0.5,
+                      key="prescreen_threshold")
+
+    st.markdown("<h6 style='text-align: center;'>Job Matching</h6>", unsafe_allow_html=True)
+    st.text(' ')
+
+    st.markdown('<div class="section-header">📄 Upload Files</div>', unsafe_allow_html=True)
+
+    col1, col2 = st.columns([1, 1])
+
+    with col1:
+        st.markdown("**📋 Job Descriptions**")
+        uploaded_jds = st.file_uploader("Upload Job Descriptions", type=['pdf', 'txt'], accept_multiple_files=True,
+                                        key="match_jds")
+        # Keyed by filename: senior_dev.txt and senior dev.pdf are two different jobs
+        job_descriptions = read_uploads(uploaded_jds or [])
+        if job_descriptions:
+            st.success(f"✅ {len(job_descriptions)} job descriptions")
+
+    with col2:
+        st.markdown("**📁 Candidate Resumes**")
+        uploaded_resumes = st.file_uploader("Upload Resumes", type=['pdf', 'txt'], accept_multiple_files=True,
+                                            key="match_resumes")
+        resume_files = read_uploads(uploaded_resumes) if uploaded_resumes else st.session_state.get('resume_files', {})
+        if resume_files:
+            source = "" if uploaded_resumes else " (from Resume Screener)"
+            st.success(f"✅ {len(resume_files)} resumes{source}")
+
+    if job_descriptions and resume_files:
+        st.markdown(f'<div class="status-box status-success">✅ Ready | Jobs: {len(job_descriptions)} | '
+                    f'Resumes: {len(resume_files)}</div>', unsafe_allow_html=True)
+        col_btn1, btn_col2, col_btn3 = st.columns([2, 1, 2])
+        with btn_col2:
+            run = st.button("🧭 Match", use_container_width=True, type="primary")
+        if run:
+            run_matching(job_descriptions, resume_files)
+    else:
+        st.markdown('<div class="status-box status-info">ℹ️ Upload job descriptions and resumes</div>',
+                    unsafe_allow_html=True)
+
+    matching = st.session_state.get('matching')
+    if not matching:
+        return
+
+    import pandas as pd
+    st.markdown('<div class="section-header">📊 Candidates x Jobs</div>', unsafe_allow_html=True)
+
+    matrix = matching['matrix']
+    summary = matching['summary']
+    cols = st.columns(len(matrix['jobs']))
+    for col, (j, job) in zip(cols, enumerate(matrix['jobs'])):
+        with col:
+            st.metric(job, f"{int((matrix['recommendations'][:, j] == 'SHORTLIST').sum())} shortlisted",
+                      f"{matrix['best_job'].count(job)} best fit", delta_color="off")
+
+    frame = pd.DataFrame(matrix['scores'], columns=matrix['jobs'])
+    frame.insert(0, 'Candidate', matrix['names'])
+    frame['Best Fit'] = matrix['best_job']
+    frame['File'] = matrix['filenames']
+    order = sorted(range(len(frame)), key=lambda i: -(matrix['best_score'][i] or -1))
+    st.dataframe(frame.iloc[order], hide_index=True,
+                 use_container_width=True,
+                 column_config={job: st.column_config.NumberColumn(job, format="%d") for job in matrix['jobs']})
+    st.caption(f"✅ {summary['pairs']} pairs analyzed with {matching['calls']} AI calls, "
+               f"{summary['prescreened']} pre-screened out, {summary['cache_hits']} cached profiles and matches reused")
+
+    col_job, col_open = st.columns([3, 1])
+    with col_job:
+        job = st.selectbox("Job", matrix['jobs'], label_visibility="collapsed")
+    with col_open:
+        if st.button("🔍 Open in Resume Screener", use_container_width=True):
+            open_in_screener(job)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Background workers for Resume Screener jobs.
+
+Each worker process claims queued jobs from the SQLite job queue (utils/job_queue.py), runs the same
+screening pipeline as the page (utils/screening.py) and writes every result row back as it completes,
+so a job keeps running when the browser tab is refreshed or closed. If a worker dies, its job is picked
+up by another worker after JOB_CONFIG['lease_seconds'] and only the resumes without a result are redone.
+
+The Resume Screener starts a pool on demand; to run one yourself (e.g. under a process supervisor):
+    python screening_worker.py --workers 4
+"""
+import time
+import uuid
+import argparse
+import threading
+import multiprocessing
+
+from utils.apollo_api import ApolloAPIClient, API_CONFIG
+from utils.llm_metrics import LLMMetrics, log_event
+from utils.job_queue import JobQueue, JobCancelled, JOB_CONFIG
+from utils.screening import screen_resumes, results_summary
+
+def run_job(queue: JobQueue, job: dict, worker_id: str, concurrency: int):
+    job_id = job['id']
+    resume_files = queue.inputs(job_id)
+    metrics = LLMMetrics()
+    client = ApolloAPIClient(use_cache=job['options'].get('use_cache', True), metrics=metrics)
+    in_flight = {}
+    stopped = threading.Event()
+    finished = threading.Event()
+
+    def heartbeat():
+        # Progress and in-flight fields for the page, and proof of life for the lease
+        while not finished.wait(JOB_CONFIG['poll_interval']):
+            queue.register_worker(worker_id, job_id)
+            if not queue.heartbeat(job_id, worker_id, dict(in_flight)):
+                stopped.set()
+
+    def check():
+        if stopped.is_set():
+            raise JobCancelled(job_id)
+
+    def on_row(result):
+        in_flight.pop(result['resume_filename'], None)
+        queue.add_result(job_id, result)
+        check()
+
+    def on_partial(filename, fields):
+        in_flight[filename] = fields
+        check()
+
+    beat = threading.Thread(target=heartbeat, daemon=True)
+    beat.start()
+    try:
+        summary = screen_resumes(client, job['job_description'], resume_files, job['options'],
+                                 on_row=on_row, on_partial=on_partial, batch_size=concurrency)
+        # Also counts the rows written before a restart (this run only screened the resumes left)
+        summary = results_summary(queue.results(job_id)[0], summary)
+        queue.finish(job_id, 'done', summary, {'snapshot': metrics.snapshot(), 'prometheus': metrics.prometheus()})
+    except JobCancelled:
+        current = queue.get(job_id)
+        # Otherwise the lease was lost to another worker, which now owns the job
+        if current and current['cancel_requested']:
+            queue.finish(job_id, 'cancelled', metrics={'snapshot': metrics.snapshot(), 'prometheus': metrics.prometheus()})
+    except Exception as e:
+        log_event({'event': 'job_error', 'job_id': job_id, 'worker': worker_id, 'error': f"{type(e).__name__}: {e}"})
+        queue.finish(job_id, 'failed', error=str(e))
+    finally:
+        finished.set()
+        beat.join()
+
+def worker_loop(worker_id: str, jobs_path: str = None, concurrency: int = None, idle_exit: float = None):
+    queue = JobQueue(jobs_path)
+    idle_since = time.time()
+    last_seen = 0.0
+    try:
+        while True:
+            if time.time() - last_seen > JOB_CONFIG['heartbeat_seconds']:
+                queue.register_worker(worker_id)
+                last_seen = time.time()
+            job = queue.claim(worker_id)
+            if job is None:
+                if idle_exit and time.time() - idle_since > idle_exit:
+                    break
+                time.sleep(JOB_CONFIG['poll_interval'])
+                continue
+            queue.register_worker(worker_id, job['id'])
+            run_job(queue, job, worker_id, concurrency)
+            queue.register_worker(worker_id)
+            idle_since = time.time()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        queue.unregister_worker(worker_id)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=JOB_CONFIG['workers'], help='worker processes')
+    parser.add_argument('--concurrency', type=int, default=None,
+                        help="requests in flight per worker (default: API_CONFIG['max_concurrency'] shared by all workers)")
+    parser.add_argument('--idle-exit', type=float, default=None, help='exit after this many seconds without a job')
+    parser.add_argument('--jobs-path', default=None, help='job queue database (default JOB_CONFIG path)')
+    args = parser.parse_args()
+
+    concurrency = args.concurrency or max(1, API_CONFIG['max_concurrency'] // max(1, args.workers))
+    context = multiprocessing.get_context('spawn')
+    processes = [context.Process(target=worker_loop, args=(f"worker-{uuid.uuid4().hex[:8]}", args.jobs_path, concurrency,
+                                                           args.idle_exit), daemon=False)
+                 for _ in range(args.workers)]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+
+if __name__ == '__main__':
+    main()
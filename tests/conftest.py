@@ -0,0 +1,28 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Keep the result cache, job queue and exports of a test run out of the project's .cache
+_scratch = tempfile.mkdtemp(prefix='talentlens-tests-')
+os.environ.setdefault('TALENTLENS_CACHE_PATH', os.path.join(_scratch, 'results.sqlite3'))
+os.environ.setdefault('TALENTLENS_JOBS_PATH', os.path.join(_scratch, 'jobs.sqlite3'))
+os.environ.setdefault('TALENTLENS_EXPORT_DIR', os.path.join(_scratch, 'exports'))
+
+sys.path.append(str(Path(__file__).parent.parent))
+from benchmarks.mock_gateway import MockGateway
+from utils.apollo_api import API_CONFIG
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'gateway(**options): MockGateway options for the gateway fixture')
+
+@pytest.fixture
+def gateway(request, monkeypatch):
+    """A MockGateway (options from @pytest.mark.gateway(...)) with API_CONFIG pointed at it"""
+    marker = request.node.get_closest_marker('gateway')
+    with MockGateway(**dict({'latency': 0.01, 'seed': 0}, **(marker.kwargs if marker else {}))) as gateway:
+        for key, value in gateway.config(API_CONFIG).items():
+            monkeypatch.setitem(API_CONFIG, key, value)
+        yield gateway
@@ -0,0 +1,63 @@
+import time
+import socket
+import asyncio
+import threading
+
+import pytest
+import requests
+
+from utils.apollo_api import API_CONFIG, ApolloAPIClient, RateController, get_rate_controller
+from utils.llm_metrics import LLMMetrics
+
+@pytest.fixture
+def fast_retries(monkeypatch):
+    monkeypatch.setitem(API_CONFIG, 'max_retries', 2)
+    monkeypatch.setitem(API_CONFIG, 'backoff_base', 0.01)
+
+def closed_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def test_transport_errors_do_not_shrink_the_limit(gateway, fast_retries, monkeypatch):
+    monkeypatch.setitem(API_CONFIG, 'api_url', f'http://127.0.0.1:{closed_port()}/apollo/llm-api/')
+    controller = get_rate_controller(API_CONFIG)
+    limit = controller.limit
+    metrics = LLMMetrics()
+    assert ApolloAPIClient(use_cache=False, metrics=metrics).call_llm('Analyze this resume') is None
+    assert controller.limit == limit and controller.throttled == 0
+    assert metrics.snapshot()['throttled'] == 0
+
+@pytest.mark.gateway(error_rate=1.0)
+def test_5xx_halves_the_limit(gateway, fast_retries):
+    controller = get_rate_controller(API_CONFIG)
+    limit = controller.limit
+    assert ApolloAPIClient(use_cache=False).call_llm('Analyze this resume') is None
+    assert controller.throttled >= 1 and controller.limit == max(1.0, limit * 0.5)
+
+@pytest.mark.gateway(error_rate=1.0)
+def test_streamed_error_replies_are_closed(gateway, fast_retries, monkeypatch):
+    closed = []
+    close = requests.Response.close
+    monkeypatch.setattr(requests.Response, 'close', lambda self: closed.append(self.status_code) or close(self))
+    assert ApolloAPIClient(use_cache=False).call_llm('Analyze this resume', on_partial=lambda fields: None) is None
+    assert closed.count(503) == 3
+
+def test_async_waiter_is_woken_by_release_without_polling():
+    controller = RateController(1, initial=1)
+    controller.acquire()
+    checks = []
+    try_acquire = controller._try_acquire
+    controller._try_acquire = lambda: checks.append(1) or try_acquire()
+
+    async def run():
+        waiter = asyncio.create_task(controller.acquire_async())
+        await asyncio.sleep(0.3)
+        assert not waiter.done() and len(checks) == 1
+        threading.Thread(target=controller.release).start()
+        started = time.time()
+        await asyncio.wait_for(waiter, 1)
+        return time.time() - started
+
+    assert asyncio.run(run()) < 0.1
+    assert controller.in_flight == 1 and not controller._waiters
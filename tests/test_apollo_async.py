@@ -0,0 +1,72 @@
+import json
+import asyncio
+
+import pytest
+
+from benchmarks.mock_gateway import SAMPLE_ANALYSIS
+from utils.apollo_api import ApolloAPIClient
+from utils.apollo_async import AsyncApolloAPIClient
+from utils.llm_metrics import LLMMetrics
+
+RESUMES = {f'Resume_{i}.txt': f'Data engineer {i}, Python, Spark and AWS.' for i in range(6)}
+
+@pytest.mark.gateway(html_rate=1.0)
+def test_non_json_200_is_a_bad_response(gateway):
+    metrics = LLMMetrics()
+    client = AsyncApolloAPIClient(client=ApolloAPIClient(use_cache=False, metrics=metrics))
+    assert asyncio.run(client.call_llm('Analyze this resume')) is None
+    assert metrics.snapshot()['calls'] == 1
+    assert gateway.faults['html'] == 1
+
+@pytest.mark.gateway(html_rate=0.5)
+def test_non_json_200_does_not_stop_the_batch(gateway):
+    client = ApolloAPIClient(use_cache=False)
+    results = client.analyze_resumes_parallel(RESUMES, 'Data Engineer')
+    failed = [r for r in results if r.get('error') == 'Failed']
+    assert sorted(r['resume_filename'] for r in results) == sorted(RESUMES)
+    assert 0 < gateway.faults['html'] and len(failed) < len(RESUMES)
+
+@pytest.mark.gateway(latency=0.05)
+def test_concurrent_bare_calls_share_one_session(gateway):
+    client = AsyncApolloAPIClient(client=ApolloAPIClient(use_cache=False))
+
+    async def run():
+        replies = await asyncio.gather(*(client.call_llm(f'Analyze resume {i}', max_tokens=50 + i) for i in range(8)))
+        return replies, client.session
+
+    replies, session = asyncio.run(run())
+    assert all(replies)
+    assert session is None and client._entered == 0
+
+PACK_RESUMES = {f'Resume_Pack_{i}.txt': f'Packed test resume {i}: data engineer, Python, Spark and AWS.' for i in range(4)}
+
+def pack_reply(monkeypatch, reply: str) -> list:
+    """Answer packed requests with reply; every other request goes to the gateway. Returns the call purposes."""
+    purposes = []
+    call_llm = AsyncApolloAPIClient.call_llm
+
+    async def fake_call_llm(self, prompt, system_prompt=None, temperature=None, max_tokens=None, on_partial=None,
+                            purpose='chat'):
+        purposes.append(purpose)
+        if purpose == 'packed_analysis':
+            return reply
+        return await call_llm(self, prompt, system_prompt, temperature, max_tokens, on_partial, purpose)
+
+    monkeypatch.setattr(AsyncApolloAPIClient, 'call_llm', fake_call_llm)
+    return purposes
+
+def test_malformed_pack_falls_back_to_single_calls(gateway, monkeypatch):
+    purposes = pack_reply(monkeypatch, '[{"resume_id": "R1", "candidate_name": "Cut off')
+    results = ApolloAPIClient(use_cache=False).analyze_resumes_parallel(PACK_RESUMES, 'Data Engineer', packed=True)
+    assert sorted(r['resume_filename'] for r in results) == sorted(PACK_RESUMES)
+    assert not [r for r in results if 'error' in r]
+    assert sorted(purposes) == ['analysis'] * len(PACK_RESUMES) + ['packed_analysis']
+
+def test_resumes_missing_from_a_pack_are_analyzed_singly(gateway, monkeypatch):
+    entry = dict(SAMPLE_ANALYSIS, resume_id='R2', candidate_name='Packed Candidate')
+    purposes = pack_reply(monkeypatch, json.dumps({'results': [entry]}))
+    results = ApolloAPIClient(use_cache=False).analyze_resumes_parallel(PACK_RESUMES, 'Data Engineer', packed=True)
+    by_file = {r['resume_filename']: r for r in results}
+    assert by_file['Resume_Pack_1.txt']['candidate_name'] == 'Packed Candidate'
+    assert len(by_file) == len(PACK_RESUMES) and not [r for r in results if 'error' in r]
+    assert sorted(purposes) == ['analysis'] * (len(PACK_RESUMES) - 1) + ['packed_analysis']
@@ -0,0 +1,43 @@
+import threading
+
+from utils.dedup import DuplicateIndex, minhash_signature, resolve_batch_duplicates
+from utils.result_cache import ResultCache, make_cache_key
+from utils.scheduling import not_evaluated_result
+
+RESUME = 'Data engineer with six years of Python, Spark, Airflow and AWS pipelines for clinical trial data.'
+
+def test_concurrent_writers_keep_every_band_entry(tmp_path):
+    path = str(tmp_path / 'dedup.sqlite3')
+    signature = minhash_signature(RESUME)
+
+    def add(writer):
+        # One cache (connection) per writer, like separate worker processes sharing the file
+        index = DuplicateIndex('jd', ResultCache(path, enabled=True))
+        for i in range(10):
+            index.add(f'{writer}-{i}', f'Resume_{writer}_{i}.txt', signature, {'technical_fit_score': 80})
+
+    threads = [threading.Thread(target=add, args=(writer,)) for writer in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    index = DuplicateIndex('jd', ResultCache(path, enabled=True))
+    for band_key in index._band_keys(signature):
+        assert len(index._persisted_band(band_key)) == 60
+    assert index.query(signature)[1] == 1.0
+
+def test_band_list_is_written_without_duplicates(tmp_path):
+    cache = ResultCache(str(tmp_path / 'dedup.sqlite3'), enabled=True)
+    signature = minhash_signature(RESUME)
+    index = DuplicateIndex('jd', cache)
+    index.add('a', 'Resume_A.txt', signature, {'technical_fit_score': 80})
+    index.add('a', 'Resume_A.txt', signature, {'technical_fit_score': 80})
+    band_key = index._band_keys(signature)[0]
+    assert cache.get(make_cache_key('dedup-band', 'jd', *band_key)) == {'ids': ['a']}
+
+def test_batch_duplicate_of_a_not_evaluated_resume_keeps_the_reason():
+    results = [not_evaluated_result('Resume_A.txt', 'shortlist target of 5 reached')]
+    rows = resolve_batch_duplicates(results, {'Resume_A_copy.txt': ('Resume_A.txt', 0.97)})
+    assert rows == [{'resume_filename': 'Resume_A_copy.txt', 'candidate_name': 'A copy', 'error': 'Not evaluated',
+                     'not_evaluated_reason': 'shortlist target of 5 reached'}]
@@ -0,0 +1,42 @@
+import csv
+
+import pytest
+
+from utils.export import EXPORT_COLUMNS, HAVE_PYARROW, export_results
+from utils.response_parser import BEHAVIOR_KEYS
+from utils.results_store import ResultsStore
+
+def make_store() -> ResultsStore:
+    store = ResultsStore()
+    store.add({
+        'resume_filename': 'Resume_Jane.txt',
+        'candidate_name': 'Jane Doe',
+        'job': 'Data Engineer',
+        'technical_fit_score': 78,
+        'overall_recommendation': 'SHORTLIST',
+        'behavioral_scores': {key: {'score': 3.5, 'justification': 'Evidence'} for key in BEHAVIOR_KEYS},
+        'skills': ['Python', 'Spark'],
+        'experience_summary': 'Six years of data pipelines'
+    })
+    store.add({'resume_filename': 'Resume_Bad.txt', 'candidate_name': 'Bad', 'error': 'Failed'})
+    return store
+
+def test_csv_export_has_every_column():
+    with open(export_results(make_store(), 'csv'), newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == EXPORT_COLUMNS
+    assert rows[0]['job'] == 'Data Engineer'
+    assert rows[0]['skills'] == 'Python; Spark'
+    assert rows[0]['communicate_with_candor_score'] == '3.5'
+    assert rows[1]['error'] == 'Failed'
+
+@pytest.mark.skipif(not HAVE_PYARROW, reason='pyarrow is not installed')
+def test_parquet_export_keeps_types():
+    import pyarrow.parquet as pq
+    table = pq.read_table(export_results(make_store(), 'parquet'))
+    assert table.column_names == EXPORT_COLUMNS
+    rows = table.to_pylist()
+    assert rows[0]['skills'] == ['Python', 'Spark']
+    assert rows[0]['experience_summary'] == 'Six years of data pipelines'
+    assert rows[0]['deliver_to_win_score'] == 3.5
+    assert rows[1]['technical_fit_score'] is None
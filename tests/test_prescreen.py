@@ -0,0 +1,41 @@
+from pathlib import Path
+
+import pytest
+
+from utils.prescreen import PreScreener, prescreen_resumes, tokenize
+
+ROOT = Path(__file__).parent.parent
+JOB_DESCRIPTION = (ROOT / 'data' / 'Job_Description_Data_Engineer.txt').read_text()
+RESUMES = {
+    'Resume_Strong.txt': 'Data engineer: Python, Spark, Airflow, Kafka, SQL and AWS pipelines; built a data lake on S3.',
+    'Resume_Partial.txt': 'Software developer writing Python and SQL ETL jobs on AWS, some Docker.',
+    'Resume_Marketing.txt': 'Marketing manager running brand campaigns, social media and events.'
+}
+
+def test_tokenize_drops_stopwords_and_numbers():
+    assert tokenize('Strong experience with Python 3 and C++ in 2024, node.js') == ['python', 'c++', 'node.js']
+
+def test_more_relevant_resumes_score_higher():
+    scores = PreScreener(JOB_DESCRIPTION).score(RESUMES)
+    assert scores['Resume_Strong.txt'] > scores['Resume_Partial.txt'] > scores['Resume_Marketing.txt']
+    assert all(0.0 <= score <= 100.0 for score in scores.values())
+
+def test_job_description_scores_100_against_itself():
+    assert PreScreener(JOB_DESCRIPTION).score({'JD.txt': JOB_DESCRIPTION}) == {'JD.txt': 100.0}
+
+def test_empty_job_description_rules_nothing_out():
+    assert PreScreener('').score(RESUMES) == {name: 100.0 for name in RESUMES}
+
+def test_threshold_splits_queue_and_rejects():
+    scores = PreScreener(JOB_DESCRIPTION).score(RESUMES)
+    threshold = (scores['Resume_Partial.txt'] + scores['Resume_Marketing.txt']) / 2
+    queue, rejected, prescores = prescreen_resumes(RESUMES, JOB_DESCRIPTION, threshold)
+    assert list(queue) == ['Resume_Strong.txt', 'Resume_Partial.txt']
+    assert rejected == [{'resume_filename': 'Resume_Marketing.txt', 'candidate_name': 'Marketing',
+                         'prescreen_score': scores['Resume_Marketing.txt'], 'error': 'Pre-screen reject'}]
+    assert prescores == scores
+
+@pytest.mark.parametrize('threshold, queued', [(0.0, 3), (100.1, 0)])
+def test_threshold_bounds(threshold, queued):
+    queue, rejected, _ = prescreen_resumes(RESUMES, JOB_DESCRIPTION, threshold)
+    assert len(queue) == queued and len(rejected) == len(RESUMES) - queued
@@ -0,0 +1,98 @@
+import json
+
+from utils.response_parser import (ANALYSIS_FIELDS, ANALYSIS_CRITICAL, BEHAVIOR_KEYS, StreamingJSONDecoder,
+                                   extract_json, parse_response, finalize)
+
+ANALYSIS = {
+    'candidate_name': 'Jane Doe',
+    'email': 'jane@example.com',
+    'phone': '+1 555 0100',
+    'years_experience': 7,
+    'technical_fit_score': 78,
+    'technical_fit_justification': 'Strong Spark and AWS background across three data platforms.',
+    'behavioral_scores': {key: {'score': 4, 'justification': 'Clear evidence'} for key in BEHAVIOR_KEYS},
+    'overall_recommendation': 'SHORTLIST',
+    'recommendation_justification': 'Meets every core requirement.',
+    'key_strengths': ['Spark', 'AWS'],
+    'key_concerns': ['No Kafka'],
+    'missing_requirements': []
+}
+
+def cut_after(text: str, marker: str, keep: int) -> str:
+    """text cut off keep characters into the value that follows marker"""
+    return text[:text.index(marker) + len(marker) + keep]
+
+def test_extract_json_complete_with_fence_and_prose():
+    reply = f"Here is the analysis:\n```json\n{json.dumps(ANALYSIS)}\n```\nLet me know."
+    assert extract_json(reply) == ANALYSIS
+
+def test_extract_json_trailing_comma():
+    assert extract_json('{"a": 1, "b": [1, 2,],}') == {'a': 1, 'b': [1, 2]}
+
+def test_extract_json_drops_a_cut_number():
+    text = cut_after(json.dumps(ANALYSIS), '"technical_fit_score": ', 1)
+    assert text.endswith('"technical_fit_score": 7')
+    data = extract_json(text)
+    assert data['years_experience'] == 7
+    assert 'technical_fit_score' not in data
+
+def test_extract_json_drops_a_cut_string():
+    text = cut_after(json.dumps(ANALYSIS), '"technical_fit_justification": "', 20)
+    data = extract_json(text)
+    assert 'technical_fit_justification' not in data
+    assert data['technical_fit_score'] == 78
+
+def test_extract_json_keeps_complete_nested_elements():
+    text = cut_after(json.dumps(ANALYSIS), '"innovate_and_drive_change": {"score": ', 1)
+    data = extract_json(text)
+    assert data['behavioral_scores']['decide_and_act_with_speed'] == {'score': 4, 'justification': 'Clear evidence'}
+    assert 'innovate_and_drive_change' not in data['behavioral_scores']
+
+def test_extract_json_cut_list_keeps_complete_items():
+    text = cut_after(json.dumps(ANALYSIS), '"key_strengths": ["Spark", "AW', 0)
+    assert extract_json(text)['key_strengths'] == ['Spark']
+
+def test_truncated_analysis_reports_the_cut_field_missing():
+    text = cut_after(json.dumps(ANALYSIS), '"technical_fit_score": ', 1)
+    data, invalid = parse_response(text, ANALYSIS_FIELDS)
+    assert 'technical_fit_score' in invalid
+    assert 'years_experience' not in invalid
+    # A critical field was cut, so the analysis is not usable without the follow-up
+    assert finalize(data, invalid, ANALYSIS_CRITICAL) is None
+
+def test_truncated_analysis_flags_incomplete_fields():
+    text = cut_after(json.dumps(ANALYSIS), '"recommendation_justification": "Meets', 0)
+    data, invalid = parse_response(text, ANALYSIS_FIELDS)
+    assert invalid == ['recommendation_justification', 'key_strengths', 'key_concerns', 'missing_requirements']
+    result = finalize(data, invalid, ANALYSIS_CRITICAL)
+    assert result['technical_fit_score'] == 78
+    assert result['incomplete_fields'] == invalid
+
+def test_validate_coerces_scores():
+    data, invalid = parse_response(json.dumps(dict(ANALYSIS, technical_fit_score='85/100',
+                                                   overall_recommendation='maybe')), ANALYSIS_FIELDS)
+    assert invalid == []
+    assert data['technical_fit_score'] == 85
+    assert data['overall_recommendation'] == 'MAYBE'
+
+def test_streaming_decoder_surfaces_only_complete_fields():
+    decoder = StreamingJSONDecoder()
+    text = json.dumps(ANALYSIS)
+    decoder.feed(cut_after(text, '"technical_fit_score": ', 1))
+    assert decoder.fields['years_experience'] == 7
+    assert 'technical_fit_score' not in decoder.fields
+    assert not decoder.done
+
+def test_streaming_decoder_emits_list_items_as_they_complete():
+    decoder = StreamingJSONDecoder()
+    text = json.dumps(ANALYSIS)
+    decoder.feed(cut_after(text, '"key_strengths": ["Spark", "AW', 0))
+    assert decoder.fields['key_strengths'] == ['Spark']
+
+def test_streaming_decoder_chunked_matches_whole():
+    decoder = StreamingJSONDecoder()
+    text = json.dumps(ANALYSIS)
+    for i in range(0, len(text), 7):
+        decoder.feed(text[i:i + 7])
+    assert decoder.done
+    assert decoder.fields == ANALYSIS
@@ -0,0 +1,98 @@
+import json
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.apollo_api import ApolloAPIClient
+from utils.apollo_async import AsyncApolloAPIClient
+from utils.result_cache import ResultCache, SingleFlight
+
+def test_cache_errors_are_logged_as_events(tmp_path, caplog):
+    (tmp_path / 'not-a-dir').write_text('')
+    cache = ResultCache(str(tmp_path / 'not-a-dir' / 'results.sqlite3'), enabled=True)
+    with caplog.at_level(logging.WARNING, logger='talentlens.llm'):
+        cache.set('key', {'score': 1})
+        assert cache.get('key') is None
+    events = [json.loads(record.message) for record in caplog.records]
+    assert [(e['event'], e['op']) for e in events] == [('cache_error', 'set'), ('cache_error', 'get')]
+    assert all('FileExistsError' in e['error'] for e in events)
+
+class Clock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+def test_entries_expire_after_the_ttl(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr('utils.result_cache.time.time', clock)
+    cache = ResultCache(str(tmp_path / 'results.sqlite3'), ttl_seconds=60, enabled=True)
+    cache.set('key', {'score': 1})
+    clock.now += 59
+    assert cache.get('key') == {'score': 1}
+    clock.now += 2
+    assert cache.get('key') is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_eviction_drops_the_least_recently_used_entries(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr('utils.result_cache.time.time', clock)
+    cache = ResultCache(str(tmp_path / 'results.sqlite3'), ttl_seconds=0, max_entries=3, enabled=True)
+    for key in ['a', 'b', 'c', 'd']:
+        cache.set(key, {'key': key})
+        clock.now += 1
+    cache.get('a')
+    clock.now += 1
+    cache.evict()
+    assert [key for key in 'abcd' if cache.get(key) is not None] == ['a', 'c', 'd']
+
+def test_a_disabled_cache_stores_nothing(tmp_path):
+    cache = ResultCache(str(tmp_path / 'results.sqlite3'), enabled=False)
+    cache.set('key', {'score': 1})
+    assert cache.get('key') is None
+    assert cache.stats() == {'enabled': False, 'hits': 0, 'misses': 0, 'hit_rate': 0.0}
+
+def test_client_reuses_cached_analyses_unless_bypassed(gateway):
+    resume = 'Cache test resume: data engineer, Python, Spark, Airflow and AWS, eight years.'
+    cached = ApolloAPIClient()
+    assert cached.analyze_resume(resume, 'Data Engineer') == cached.analyze_resume(resume, 'Data Engineer')
+    assert gateway.chat_requests == 1
+
+    bypassed = ApolloAPIClient(use_cache=False)
+    bypassed.analyze_resume(resume, 'Data Engineer')
+    cached.analyze_resume(resume, 'Data Engineer', use_cache=False)
+    assert gateway.chat_requests == 3
+
+def test_single_flight_hands_the_leader_result_to_followers():
+    flights = SingleFlight()
+    assert flights.join('key') is None
+    follower = flights.join('key')
+    assert follower is not None and flights.in_flight() == 1 and flights.coalesced == 1
+    flights.done('key', {'score': 1})
+    assert flights.wait(follower) == {'score': 1} and flights.in_flight() == 0
+    assert flights.join('key') is None
+
+@pytest.mark.gateway(latency=0.3)
+def test_concurrent_identical_analyses_make_one_request(gateway):
+    resume = 'Single-flight test resume: data engineer, Python, Spark, Kafka and AWS, five years.'
+    client = ApolloAPIClient()
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        results = list(executor.map(lambda _: client.analyze_resume(resume, 'Data Engineer'), range(6)))
+    assert gateway.chat_requests == 1
+    assert all(result == results[0] for result in results) and results[0] is not None
+    assert client.shared + client.cache.hits >= 5
+
+@pytest.mark.gateway(latency=0.3)
+def test_concurrent_identical_coroutines_make_one_request(gateway):
+    resume = 'Single-flight coroutine test resume: analytics engineer, SQL, dbt and Snowflake.'
+    client = AsyncApolloAPIClient()
+
+    async def run():
+        return await asyncio.gather(*(client.analyze_resume(resume, 'Data Engineer') for _ in range(6)))
+
+    results = asyncio.run(run())
+    assert gateway.chat_requests == 1
+    assert all(result == results[0] for result in results) and results[0] is not None
@@ -0,0 +1,43 @@
+import numpy as np
+
+from utils.behavior_matrix import score_distribution
+from utils.response_parser import BEHAVIOR_KEYS
+from utils.results_store import ResultsStore
+
+def analysis(filename: str, scores: list) -> dict:
+    return {
+        'resume_filename': filename,
+        'candidate_name': 'Jane Doe',
+        'technical_fit_score': 78,
+        'overall_recommendation': 'SHORTLIST',
+        'behavioral_scores': {key: {'score': score, 'justification': 'Evidence'}
+                              for key, score in zip(BEHAVIOR_KEYS, scores)},
+        'key_strengths': ['Spark']
+    }
+
+def test_behavior_scores_survive_add_and_record():
+    store = ResultsStore()
+    result = analysis('Resume_Jane.txt', [3.5, 4, 2.25, 5, 3.3])
+    cid = store.add(result)
+    assert store.record(cid)['behavioral_scores'] == result['behavioral_scores']
+    assert store.record(cid)['behavioral_scores']['decide_and_act_with_speed']['score'] == 4
+    assert isinstance(store.record(cid)['behavioral_scores']['decide_and_act_with_speed']['score'], int)
+
+def test_record_round_trips_after_growing():
+    store = ResultsStore(capacity=2)
+    results = [analysis(f'Resume_{i}.txt', [1 + i % 5, 4.5, 3, 2, 5]) for i in range(5)]
+    ids = [store.add(r) for r in results]
+    assert [store.record(cid) for cid in ids] == results
+
+def test_frame_keeps_whole_scores_integer():
+    store = ResultsStore()
+    store.add(analysis('Resume_A.txt', [3, 4, 2, 5, 3]))
+    store.add(analysis('Resume_B.txt', [3.5, 4, 2, 5, 3]))
+    frame = store.frame()
+    assert frame['Communicate'].tolist() == [3.0, 3.5]
+    assert frame['Speed'].dtype == np.int8
+
+def test_score_distribution_rounds_half_scores_up():
+    distribution = score_distribution(np.array([[3.5, 0], [2.0, 4.4]]))
+    assert distribution[0].tolist() == [0, 0, 1, 0, 1, 0]
+    assert distribution[1].tolist() == [1, 0, 0, 0, 1, 0]
@@ -0,0 +1,53 @@
+from concurrent.futures.process import BrokenProcessPool
+
+import utils.resume_parser as resume_parser
+
+class BreakingPool:
+    """ProcessPoolExecutor stand-in whose worker dies after the first file"""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def map(self, fn, *iterables, chunksize=1):
+        args = list(zip(*iterables))
+        yield fn(*args[0])
+        raise BrokenProcessPool('worker died')
+
+def fake_extract(file_bytes: bytes, filename: str) -> str:
+    return f"text of {filename}"
+
+def test_extract_texts_falls_back_to_serial_when_the_pool_breaks(monkeypatch):
+    monkeypatch.setattr(resume_parser, 'ProcessPoolExecutor', BreakingPool)
+    monkeypatch.setattr(resume_parser, 'extract_text_from_file', fake_extract)
+    monkeypatch.setitem(resume_parser.EXTRACTION_CONFIG, 'min_pool_files', 2)
+    files = {f'pool_fallback_{i}.pdf': f'%PDF pool fallback {i}'.encode() for i in range(5)}
+    assert resume_parser.extract_texts(files, max_workers=4) == {name: f"text of {name}" for name in files}
+
+def test_extract_texts_falls_back_when_the_pool_cannot_start(monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise OSError('cannot start workers')
+    monkeypatch.setattr(resume_parser, 'ProcessPoolExecutor', no_pool)
+    monkeypatch.setattr(resume_parser, 'extract_text_from_file', fake_extract)
+    monkeypatch.setitem(resume_parser.EXTRACTION_CONFIG, 'min_pool_files', 2)
+    files = {f'no_pool_{i}.pdf': f'%PDF no pool {i}'.encode() for i in range(3)}
+    assert resume_parser.extract_texts(files, max_workers=4) == {name: f"text of {name}" for name in files}
+
+def test_failed_extraction_is_retried_on_the_next_call(monkeypatch):
+    attempts = []
+
+    def flaky_extract(file_bytes: bytes, filename: str) -> str:
+        attempts.append(filename)
+        return "" if len(attempts) == 1 else f"text of {filename}"
+
+    monkeypatch.setattr(resume_parser, 'extract_text_from_file', flaky_extract)
+    files = {'flaky.pdf': b'%PDF flaky extraction'}
+    assert resume_parser.extract_texts(files) == {'flaky.pdf': ''}
+    assert resume_parser.extract_texts(files) == {'flaky.pdf': 'text of flaky.pdf'}
+    assert resume_parser.extract_texts(files) == {'flaky.pdf': 'text of flaky.pdf'}
+    assert len(attempts) == 2
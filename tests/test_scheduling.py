@@ -0,0 +1,46 @@
+from utils.apollo_api import ApolloAPIClient
+from utils.llm_metrics import LLMMetrics
+from utils.scheduling import NOT_EVALUATED, ScreeningBudget, prioritize
+
+RESUMES = {f'Resume_Budget_{i}.txt': f'Budget test resume {i}: data engineer, Python, Spark and AWS.' for i in range(8)}
+
+class Client:
+    run_metrics = None
+
+def test_shortlist_target_exhausts_the_budget():
+    budget = ScreeningBudget(max_shortlist=2)
+    budget.observe({'overall_recommendation': 'SHORTLIST'})
+    budget.observe({'overall_recommendation': 'REJECT'})
+    budget.observe({'error': 'Failed'})
+    assert budget.exhausted() is None
+    # One shortlist in two analyses: two more in flight are projected to reach the target
+    assert budget.exhausted(in_flight=2) == "Shortlist target of 2 reached"
+    budget.observe({'overall_recommendation': 'SHORTLIST'})
+    assert budget.exhausted() == "Shortlist target of 2 reached"
+
+def test_token_budget_counts_tokens_since_start():
+    client = Client()
+    client.run_metrics = LLMMetrics()
+    client.run_metrics.prompt_tokens = 5000
+    budget = ScreeningBudget(token_budget=1000)
+    budget.start(client)
+    assert budget.exhausted() is None
+    client.run_metrics.prompt_tokens += 800
+    client.run_metrics.completion_tokens += 200
+    assert budget.spent() == (800, 200)
+    assert budget.exhausted() == "Token budget of 1,000 used up"
+
+def test_prioritize_puts_the_best_pre_scores_first():
+    scores = {'a.txt': 3.0, 'b.txt': 9.5, 'c.txt': 0.0}
+    assert list(prioritize({name: '' for name in scores}, 'JD', scores)) == ['b.txt', 'a.txt', 'c.txt']
+
+def test_resumes_after_the_shortlist_target_are_not_evaluated(gateway):
+    budget = ScreeningBudget(max_shortlist=3)
+    results = ApolloAPIClient(use_cache=False).analyze_resumes_parallel(RESUMES, 'Data Engineer', batch_size=1,
+                                                                       budget=budget)
+    analyzed = [r for r in results if 'error' not in r]
+    skipped = [r for r in results if r.get('error') == NOT_EVALUATED]
+    assert [r['overall_recommendation'] for r in analyzed] == ['SHORTLIST'] * 3
+    assert [r['resume_filename'] for r in skipped] == list(RESUMES)[3:]
+    assert {r['not_evaluated_reason'] for r in skipped} == {"Shortlist target of 3 reached"}
+    assert gateway.chat_requests == 3
@@ -0,0 +1,27 @@
+from pathlib import Path
+
+from screening_worker import run_job
+from utils.job_queue import JobQueue
+
+ROOT = Path(__file__).parent.parent
+JOB_DESCRIPTION = (ROOT / 'data' / 'Job_Description_Data_Engineer.txt').read_text()
+RESUMES = {path.name: path.read_text() for path in sorted((ROOT / 'sample_resumes').glob('*.txt'))[:4]}
+
+def test_resumed_job_summary_counts_rows_from_before_the_restart(gateway, tmp_path):
+    queue = JobQueue(str(tmp_path / 'jobs.sqlite3'))
+    resume_files = dict(RESUMES, **{'Resume_Marketing.txt': 'Marketing manager, brand campaigns, social media.',
+                                    'Resume_Florist.txt': 'Florist, bouquets, weddings and events.'})
+    job_id = queue.submit(JOB_DESCRIPTION, resume_files, {'use_cache': False, 'dedup': False})
+    job = queue.claim('worker-1')
+    # The first worker wrote these rows before it died
+    queue.add_result(job_id, {'resume_filename': 'Resume_Marketing.txt', 'candidate_name': 'Marketing',
+                              'prescreen_score': 0.0, 'error': 'Pre-screen reject'})
+    queue.add_result(job_id, {'resume_filename': 'Resume_Florist.txt', 'candidate_name': 'Florist',
+                              'prescreen_score': 0.0, 'error': 'Pre-screen reject'})
+
+    run_job(queue, job, 'worker-2', 4)
+    finished = queue.get(job_id)
+    assert finished['status'] == 'done'
+    assert finished['summary']['prescreened'] == 2
+    assert finished['summary']['queued'] == len(RESUMES)
+    assert len(queue.results(job_id)[0]) == len(resume_files)
@@ -1,7 +1,18 @@
 import requests
 import json
-from typing import Dict, List, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from utils.result_cache import get_result_cache, get_single_flight, make_cache_key
+from utils.dedup import DuplicateIndex
+from utils.llm_metrics import LLMMetrics, get_llm_metrics, log_event
+from utils.response_parser import (ANALYSIS_FIELDS, ANALYSIS_CRITICAL, PROFILE_FIELDS, PROFILE_CRITICAL, MATCH_FIELDS,
+                                   MATCH_CRITICAL, INTERVIEW_FIELDS, INTERVIEW_CRITICAL,
+                                   extract_json, validate, parse_response, build_followup_prompt, merge_followup,
+                                   finalize, StreamingJSONDecoder)
 
 API_CONFIG = {
     'client_id': '074c933c-112f-4acf-a6a5-3199e4c78eea',
@@ -11,17 +22,124 @@ API_CONFIG = {
     'api_url': 'https://api-gw.boehringer-ingelheim.com:443/apollo/llm-api/',
     'temperature': 0.2,
     'max_tokens': 4000,
-    'completions_path': 'chat/completions'
+    'completions_path': 'chat/completions',
+    'max_concurrency': 32,
+    'min_concurrency': 1,
+    'max_retries': 4,
+    'backoff_base': 1.0,
+    'backoff_max': 60.0,
+    'context_window': 128000,
+    'packed_max_tokens': 16000,
+    'max_pack_size': 8
 }
 
-class ApolloAPIClient:
-    def __init__(self):
-        self.access_token = None
-        self.config = API_CONFIG
-    
-    def get_access_token(self) -> Optional[str]:
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+# Congestion signals: these shrink the concurrency limit, the other retryable statuses are just retried
+THROTTLE_STATUS = {429, 503}
+
+# Bump whenever the analyze_resume prompt changes so stale cached analyses are not reused
+ANALYSIS_PROMPT_VERSION = 'analysis-v1'
+ANALYSIS_PACKED_PROMPT_VERSION = 'analysis-packed-v1'
+PROFILE_PROMPT_VERSION = 'profile-v1'
+MATCH_PROMPT_VERSION = 'match-v1'
+INTERVIEW_PROMPT_VERSION = 'interview-v1'
+ANALYSIS_TEMPERATURE = 0.1
+# Rough completion size of one analysis object, used to size packed requests
+ANALYSIS_OUTPUT_TOKENS = 900
+FOLLOWUP_MAX_TOKENS = 1500
+PROFILE_MAX_TOKENS = 2000
+MATCH_MAX_TOKENS = 1000
+
+ANALYSIS_SCHEMA = """{
+  "candidate_name": "Full name",
+  "email": "Email",
+  "phone": "Phone",
+  "years_experience": number,
+  "technical_fit_score": 0-100,
+  "technical_fit_justification": "Explanation with evidence",
+  "behavioral_scores": {
+    "communicate_with_candor": {"score": 1-5, "justification": "Evidence"},
+    "decide_and_act_with_speed": {"score": 1-5, "justification": "Evidence"},
+    "innovate_and_drive_change": {"score": 1-5, "justification": "Evidence"},
+    "deliver_to_win": {"score": 1-5, "justification": "Evidence"},
+    "collaborate_with_a_purpose": {"score": 1-5, "justification": "Evidence"}
+  },
+  "overall_recommendation": "SHORTLIST" or "MAYBE" or "REJECT",
+  "recommendation_justification": "Summary",
+  "key_strengths": ["strength1", "strength2", "strength3"],
+  "key_concerns": ["concern1", "concern2"],
+  "missing_requirements": ["req1", "req2"]
+}"""
+
+# Two-stage analysis: the profile depends on the resume only, the match on the profile and the job description
+PROFILE_SCHEMA = """{
+  "candidate_name": "Full name",
+  "email": "Email",
+  "phone": "Phone",
+  "years_experience": number,
+  "skills": ["skill or technology (years if stated)", "..."],
+  "experience_summary": "Roles, domains, scale and achievements, most recent first",
+  "behavioral_scores": {
+    "communicate_with_candor": {"score": 1-5, "justification": "Evidence"},
+    "decide_and_act_with_speed": {"score": 1-5, "justification": "Evidence"},
+    "innovate_and_drive_change": {"score": 1-5, "justification": "Evidence"},
+    "deliver_to_win": {"score": 1-5, "justification": "Evidence"},
+    "collaborate_with_a_purpose": {"score": 1-5, "justification": "Evidence"}
+  },
+  "key_strengths": ["strength1", "strength2", "strength3"]
+}"""
+
+MATCH_SCHEMA = """{
+  "technical_fit_score": 0-100,
+  "technical_fit_justification": "Explanation with evidence",
+  "overall_recommendation": "SHORTLIST" or "MAYBE" or "REJECT",
+  "recommendation_justification": "Summary",
+  "key_concerns": ["concern1", "concern2"],
+  "missing_requirements": ["req1", "req2"]
+}"""
+
+ANALYSIS_SCORING = "SCORING: Tech>75 & Behavior>3.5 = SHORTLIST, Tech 60-75 = MAYBE, Tech<60 = REJECT"
+
+def merge_profile_match(profile: Optional[Dict], match: Optional[Dict]) -> Optional[Dict]:
+    """Full analysis (every ANALYSIS_FIELDS field) from a resume profile and its match; None if either pass failed"""
+    if profile is None or match is None:
+        return None
+    result = {**profile, **match}
+    incomplete = profile.get('incomplete_fields', []) + match.get('incomplete_fields', [])
+    if incomplete:
+        result['incomplete_fields'] = incomplete
+    return result
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) for budgeting, no tokenizer needed"""
+    return len(text or '') // 4 + 1
+
+def estimate_usage(prompt: str, system_prompt: str, content: str) -> Dict:
+    """Stand-in for the usage block when the gateway does not report one, so token budgets still count the call"""
+    return {'prompt_tokens': estimate_tokens((system_prompt or '') + prompt), 'completion_tokens': estimate_tokens(content),
+            'estimated': True}
+
+class TokenManager:
+    """Caches the OAuth token until shortly before expires_in and refreshes it under a lock"""
+
+    def __init__(self, config: Dict, refresh_margin: float = 60.0):
+        self.config = config
+        self.refresh_margin = refresh_margin
+        self._token = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+
+    def _usable(self, token: Optional[str], stale_token: Optional[str], until: float) -> bool:
+        return bool(token) and token != stale_token and time.time() < until
+
+    def peek(self) -> Optional[str]:
+        """Current token if it is not due for refresh, without blocking"""
+        token = self._token
+        return token if self._usable(token, None, self._expires_at - self.refresh_margin) else None
+
+    def _fetch(self) -> Optional[str]:
         try:
-            response = requests.post(
+            response = get_http_session().post(
                 self.config['token_url'],
                 headers={'Content-Type': 'application/x-www-form-urlencoded'},
                 data={
@@ -32,53 +150,428 @@ class ApolloAPIClient:
                 timeout=10
             )
             if response.status_code == 200:
-                self.access_token = response.json().get('access_token')
-                return self.access_token
+                data = response.json()
+                self._token = data.get('access_token')
+                self._expires_at = time.time() + float(data.get('expires_in') or 3600)
+                return self._token
+            log_event({'event': 'token_error', 'status': response.status_code})
             return None
         except Exception as e:
-            print(f"Error: {e}")
+            log_event({'event': 'token_error', 'error': f"{type(e).__name__}: {e}"})
+            return None
+
+    def get_token(self, stale_token: str = None) -> Optional[str]:
+        """Valid token, refreshing if it is near expiry or equal to stale_token (rejected with a 401)"""
+        token = self._token
+        if self._usable(token, stale_token, self._expires_at - self.refresh_margin):
+            return token
+        if self._usable(token, stale_token, self._expires_at):
+            # Still valid: refresh proactively unless another worker already is
+            if not self._lock.acquire(blocking=False):
+                return token
+        else:
+            self._lock.acquire()
+        try:
+            token = self._token
+            if self._usable(token, stale_token, self._expires_at - self.refresh_margin):
+                return token
+            fetched = self._fetch()
+            if fetched:
+                return fetched
+            return token if self._usable(token, stale_token, self._expires_at) else None
+        finally:
+            self._lock.release()
+
+class RateController:
+    """AIMD concurrency limit for the gateway, with Retry-After pauses and jittered exponential backoff
+
+    Starts in slow start (+1 per success, doubling each round) until the first congestion signal,
+    then grows by 1/limit per success (about +1 per round of requests). It is halved on 429/503
+    or cut by 20% when latency balloons past latency_factor x its moving average.
+    Decreases happen at most once per observed latency window so a burst of concurrent
+    throttles counts as one congestion signal.
+    """
+
+    def __init__(self, max_concurrency: int, min_concurrency: int = 1, initial: int = None,
+                 backoff_base: float = 1.0, backoff_max: float = 60.0, latency_factor: float = 2.5):
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.limit = float(initial or max(min_concurrency, max_concurrency // 4))
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.latency_factor = latency_factor
+        self.in_flight = 0
+        self.throttled = 0
+        self._slow_start = True
+        self._latency_avg = None
+        self._latency_samples = 0
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        # (loop, future) of coroutines in acquire_async, woken alongside the threads waiting on _cond
+        self._waiters = []
+
+    def _try_acquire(self) -> Optional[float]:
+        """Under the lock: None if a slot was taken, otherwise seconds left of a Retry-After pause,
+        or 0.0 to wait for a slot to be released"""
+        pause = self._paused_until - time.time()
+        if pause > 0:
+            return pause
+        if self.in_flight < int(self.limit):
+            self.in_flight += 1
             return None
+        return 0.0
+
+    def _notify(self):
+        self._cond.notify_all()
+        for loop, waiter in self._waiters:
+            try:
+                loop.call_soon_threadsafe(lambda waiter=waiter: waiter.done() or waiter.set_result(None))
+            except RuntimeError:
+                pass
+        self._waiters.clear()
+
+    def acquire(self):
+        with self._cond:
+            while True:
+                wait = self._try_acquire()
+                if wait is None:
+                    return
+                self._cond.wait(wait or None)
+
+    async def acquire_async(self):
+        import asyncio
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._cond:
+                wait = self._try_acquire()
+                if wait is None:
+                    return
+                waiter = loop.create_future()
+                self._waiters.append((loop, waiter))
+            try:
+                await asyncio.wait_for(waiter, wait or None)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                with self._cond:
+                    if (loop, waiter) in self._waiters:
+                        self._waiters.remove((loop, waiter))
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._notify()
+
+    def _decrease(self, factor: float):
+        now = time.time()
+        if now - self._last_decrease < (self._latency_avg or 1.0):
+            return
+        self._last_decrease = now
+        self._slow_start = False
+        self.limit = max(float(self.min_concurrency), self.limit * factor)
+
+    def on_success(self, latency: float):
+        with self._cond:
+            self._latency_samples += 1
+            if self._latency_avg is None:
+                self._latency_avg = latency
+            if self._latency_samples > 10 and latency > self.latency_factor * self._latency_avg:
+                self._decrease(0.8)
+            else:
+                step = 1.0 if self._slow_start else 1.0 / self.limit
+                self.limit = min(float(self.max_concurrency), self.limit + step)
+            self._latency_avg = 0.9 * self._latency_avg + 0.1 * latency
+            self._notify()
+
+    def raise_ceiling(self, max_concurrency: int):
+        with self._cond:
+            self.max_concurrency = max(self.max_concurrency, max_concurrency)
+
+    def on_throttle(self, retry_after: float = None):
+        with self._cond:
+            self.throttled += 1
+            self._decrease(0.5)
+            if retry_after:
+                self._paused_until = max(self._paused_until, time.time() + retry_after)
+
+    def backoff(self, attempt: int, retry_after: float = None) -> float:
+        """Full-jitter exponential backoff, never shorter than the server's Retry-After"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        return max(delay, retry_after or 0.0)
+
+def sse_event(line) -> Optional[Dict]:
+    """Decoded JSON payload of one server-sent event line (None for comments, keep-alives and [DONE])"""
+    if isinstance(line, bytes):
+        line = line.decode('utf-8', errors='replace')
+    line = line.strip()
+    if not line.startswith('data:'):
+        return None
+    data = line[5:].strip()
+    if not data or data == '[DONE]':
+        return None
+    try:
+        event = json.loads(data)
+    except ValueError:
+        return None
+    return event if isinstance(event, dict) else None
+
+def sse_delta(event: Dict) -> str:
+    try:
+        choice = event['choices'][0]
+        return (choice.get('delta') or choice.get('message') or {}).get('content') or ''
+    except (KeyError, IndexError, TypeError, AttributeError):
+        return ''
+
+class StreamCollector:
+    """Accumulates a streamed completion and calls on_partial(fields) whenever another JSON field completes"""
+
+    def __init__(self, on_partial: Callable):
+        self.on_partial = on_partial
+        self.decoder = StreamingJSONDecoder()
+        self.usage = None
+
+    def feed_line(self, line):
+        event = sse_event(line)
+        if event is None:
+            return
+        # Gateways that report usage on a stream do so in the final chunk
+        if event.get('usage'):
+            self.usage = event['usage']
+        delta = sse_delta(event)
+        if delta and self.decoder.feed(delta):
+            self.on_partial(dict(self.decoder.fields))
+
+    @property
+    def text(self) -> str:
+        return self.decoder.buffer
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except Exception:
+        return None
+
+_token_managers = {}
+_rate_controllers = {}
+_http_session = None
+_http_pool_size = 0
+_shared_lock = threading.Lock()
+
+def get_token_manager(config: Dict) -> TokenManager:
+    """Process-wide token manager per gateway/client id, shared by every ApolloAPIClient"""
+    key = (config['token_url'], config['client_id'])
+    with _shared_lock:
+        if key not in _token_managers:
+            _token_managers[key] = TokenManager(config)
+        return _token_managers[key]
+
+def get_rate_controller(config: Dict) -> RateController:
+    """Process-wide rate controller per gateway, so every client and page shares its capacity"""
+    with _shared_lock:
+        if config['api_url'] not in _rate_controllers:
+            _rate_controllers[config['api_url']] = RateController(
+                config['max_concurrency'],
+                min_concurrency=config['min_concurrency'],
+                backoff_base=config['backoff_base'],
+                backoff_max=config['backoff_max']
+            )
+        return _rate_controllers[config['api_url']]
+
+def get_http_session(pool_size: int = None) -> requests.Session:
+    """Process-wide keep-alive session; the connection pool grows to the largest worker count requested"""
+    global _http_session, _http_pool_size
+    pool_size = pool_size or API_CONFIG['max_concurrency']
+    with _shared_lock:
+        if _http_session is None:
+            _http_session = requests.Session()
+        if pool_size > _http_pool_size:
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+            _http_session.mount('https://', adapter)
+            _http_session.mount('http://', adapter)
+            _http_pool_size = pool_size
+        return _http_session
+
+class ApolloAPIClient:
+    def __init__(self, use_cache: bool = True, metrics: LLMMetrics = None):
+        self.access_token = None
+        self.config = API_CONFIG
+        self.cache = get_result_cache() if use_cache else None
+        self.session = get_http_session()
+        # Calls are always counted in the process-wide metrics; metrics adds a per-run view
+        self.run_metrics = metrics
+        # Results taken from an identical request another session had in flight
+        self.shared = 0
+    
+    def new_call(self, purpose: str, streamed: bool = False) -> Dict:
+        return {'purpose': purpose, 'streamed': streamed, 'status': None, 'attempts': 0, 'retries': 0,
+                'throttled': 0, 'token_time': 0.0, 'latency': None, 'total_time': 0.0,
+                'prompt_tokens': None, 'completion_tokens': None}
+    
+    def record_call(self, call: Dict, usage: Optional[Dict] = None):
+        if usage:
+            call['prompt_tokens'] = usage.get('prompt_tokens')
+            call['completion_tokens'] = usage.get('completion_tokens')
+            call['usage_estimated'] = usage.get('estimated', False)
+        call['retries'] = max(0, call['attempts'] - 1)
+        for metrics in (get_llm_metrics(), self.run_metrics):
+            if metrics is not None:
+                metrics.record_call(call)
+        log_event(dict(call, event='llm_call', model=self.config['model_name']))
+    
+    def record_parse(self, outcome: str, purpose: str):
+        for metrics in (get_llm_metrics(), self.run_metrics):
+            if metrics is not None:
+                metrics.record_parse(outcome)
+        log_event({'event': 'llm_parse', 'purpose': purpose, 'outcome': outcome})
     
-    def call_llm(self, prompt: str, system_prompt: str = None, temperature: float = None, max_tokens: int = None) -> Optional[str]:
-        if not self.access_token:
-            if not self.get_access_token():
-                return None
+    def get_access_token(self, stale_token: str = None) -> Optional[str]:
+        self.access_token = get_token_manager(self.config).get_token(stale_token)
+        return self.access_token
+    
+    def build_request(self, prompt: str, system_prompt: str = None, temperature: float = None, max_tokens: int = None,
+                      stream: bool = False):
+        messages = []
+        if system_prompt:
+            messages.append({'role': 'system', 'content': system_prompt})
+        messages.append({'role': 'user', 'content': prompt})
         
+        url = f"{self.config['api_url']}{self.config['completions_path']}"
+        payload = {
+            'model': self.config['model_name'],
+            'messages': messages,
+            'temperature': temperature if temperature is not None else self.config['temperature'],
+            'max_tokens': max_tokens if max_tokens is not None else self.config['max_tokens']
+        }
+        if stream:
+            payload['stream'] = True
+        return url, payload
+    
+    def read_stream(self, response: requests.Response, on_partial: Callable) -> Tuple[Optional[str], Optional[Dict]]:
+        """Full text and usage of a streamed (SSE) completion, reporting fields as they arrive"""
+        if 'event-stream' not in response.headers.get('Content-Type', ''):
+            # Gateway ignored stream=True and answered in one piece
+            try:
+                data = response.json()
+                return data['choices'][0]['message']['content'], data.get('usage')
+            except (ValueError, KeyError, IndexError, TypeError):
+                return None, None
+        collector = StreamCollector(on_partial)
+        for line in response.iter_lines():
+            collector.feed_line(line)
+        return collector.text, collector.usage
+    
+    def call_llm(self, prompt: str, system_prompt: str = None, temperature: float = None, max_tokens: int = None,
+                 on_partial: Callable = None, purpose: str = 'chat') -> Optional[str]:
+        """Completion text, or None. With on_partial the reply is streamed and on_partial(fields) is called
+        with the JSON fields decoded so far each time another one completes. Every call is recorded in
+        the LLM metrics under purpose."""
+        call = self.new_call(purpose, bool(on_partial))
+        started = time.time()
+        content, usage = None, None
         try:
-            messages = []
-            if system_prompt:
-                messages.append({'role': 'system', 'content': system_prompt})
-            messages.append({'role': 'user', 'content': prompt})
-            
-            url = f"{self.config['api_url']}{self.config['completions_path']}"
+            content, usage = self._call_llm(call, prompt, system_prompt, temperature, max_tokens, on_partial)
+            return content
+        finally:
+            call['total_time'] = time.time() - started
+            if usage is None and content is not None:
+                usage = estimate_usage(prompt, system_prompt, content)
+            self.record_call(call, usage)
+    
+    def _call_llm(self, call: Dict, prompt: str, system_prompt: str, temperature: float, max_tokens: int,
+                  on_partial: Callable) -> Tuple[Optional[str], Optional[Dict]]:
+        token_start = time.time()
+        token = self.get_access_token()
+        call['token_time'] = time.time() - token_start
+        if not token:
+            call['status'] = 'no_token'
+            return None, None
+        
+        url, payload = self.build_request(prompt, system_prompt, temperature, max_tokens, stream=bool(on_partial))
+        controller = get_rate_controller(self.config)
+        refreshed = False
+        for attempt in range(self.config['max_retries'] + 1):
             headers = {
-                'Authorization': f'Bearer {self.access_token}',
+                'Authorization': f'Bearer {token}',
                 'Content-Type': 'application/json'
             }
+            retry_after = None
+            content, usage = None, None
+            call['attempts'] += 1
+            controller.acquire()
+            start = time.time()
+            response = None
+            try:
+                response = self.session.post(url, headers=headers, json=payload, timeout=90, stream=bool(on_partial))
+                if on_partial and response.status_code == 200:
+                    # The slot stays taken until the whole stream has been read
+                    content, usage = self.read_stream(response, on_partial)
+            except requests.RequestException as e:
+                # Counted as a failed attempt (status 'error') when the call is recorded
+                log_event({'event': 'llm_error', 'purpose': call['purpose'], 'attempt': call['attempts'],
+                           'error': f"{type(e).__name__}: {e}"})
+                if response is not None:
+                    response.close()
+                response = None
+            finally:
+                controller.release()
+            call['latency'] = time.time() - start
+            call['status'] = response.status_code if response is not None else 'error'
             
-            payload = {
-                'model': self.config['model_name'],
-                'messages': messages,
-                'temperature': temperature if temperature is not None else self.config['temperature'],
-                'max_tokens': max_tokens if max_tokens is not None else self.config['max_tokens']
-            }
-            
-            response = requests.post(url, headers=headers, json=payload, timeout=90)
-            
-            if response.status_code == 200:
-                return response.json()['choices'][0]['message']['content']
-            elif response.status_code == 401:
-                if self.get_access_token():
-                    headers['Authorization'] = f'Bearer {self.access_token}'
-                    response = requests.post(url, headers=headers, json=payload, timeout=90)
-                    if response.status_code == 200:
-                        return response.json()['choices'][0]['message']['content']
-            return None
-        except Exception as e:
-            print(f"Error: {e}")
-            return None
+            try:
+                if response is None:
+                    # A transport error is retried with backoff without shrinking the limit
+                    pass
+                elif response.status_code == 200:
+                    controller.on_success(time.time() - start)
+                    if on_partial:
+                        return content, usage
+                    data = response.json()
+                    return data['choices'][0]['message']['content'], data.get('usage')
+                elif response.status_code == 401 and not refreshed:
+                    refreshed = True
+                    token_start = time.time()
+                    token = self.get_access_token(stale_token=token)
+                    call['token_time'] += time.time() - token_start
+                    if not token:
+                        return None, None
+                    continue
+                elif response.status_code in RETRYABLE_STATUS:
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    if response.status_code in THROTTLE_STATUS:
+                        call['throttled'] += 1
+                        controller.on_throttle(retry_after)
+                else:
+                    return None, None
+            except Exception as e:
+                log_event({'event': 'llm_error', 'purpose': call['purpose'], 'attempt': call['attempts'],
+                           'error': f"bad response: {type(e).__name__}: {e}"})
+                call['status'] = 'bad_response'
+                return None, None
+            finally:
+                # Streamed error replies are never read: give their connection back to the pool
+                if response is not None:
+                    response.close()
+            if attempt < self.config['max_retries']:
+                time.sleep(controller.backoff(attempt, retry_after))
+        return None, None
     
-    def analyze_resume(self, resume_text: str, job_description: str) -> Optional[Dict]:
+    def analysis_cache_key(self, resume_text: str, job_description: str, prompt_version: str = ANALYSIS_PROMPT_VERSION) -> str:
+        return make_cache_key('analysis', prompt_version, self.config['model_name'], ANALYSIS_TEMPERATURE,
+                              resume_text, job_description)
+    
+    def duplicate_index(self, job_description: str, threshold: float = None) -> DuplicateIndex:
+        """Near-duplicate index for this job description; persisted in the result cache when caching is on"""
+        namespace = make_cache_key('dedup', ANALYSIS_PROMPT_VERSION, self.config['model_name'], job_description)
+        return DuplicateIndex(namespace, self.cache, threshold)
+    
+    def build_analysis_prompt(self, resume_text: str, job_description: str):
         system_prompt = """You are an expert HR analyst for Boehringer Ingelheim. Analyze resumes objectively."""
 
         user_prompt = f"""Analyze resume against job description.
@@ -90,71 +583,250 @@ RESUME:
 {resume_text}
 
 Provide JSON:
-{{
-  "candidate_name": "Full name",
-  "email": "Email",
-  "phone": "Phone",
-  "years_experience": number,
-  "technical_fit_score": 0-100,
-  "technical_fit_justification": "Explanation with evidence",
-  "behavioral_scores": {{
-    "communicate_with_candor": {{"score": 1-5, "justification": "Evidence"}},
-    "decide_and_act_with_speed": {{"score": 1-5, "justification": "Evidence"}},
-    "innovate_and_drive_change": {{"score": 1-5, "justification": "Evidence"}},
-    "deliver_to_win": {{"score": 1-5, "justification": "Evidence"}},
-    "collaborate_with_a_purpose": {{"score": 1-5, "justification": "Evidence"}}
-  }},
-  "overall_recommendation": "SHORTLIST" or "MAYBE" or "REJECT",
-  "recommendation_justification": "Summary",
-  "key_strengths": ["strength1", "strength2", "strength3"],
-  "key_concerns": ["concern1", "concern2"],
-  "missing_requirements": ["req1", "req2"]
-}}
+{ANALYSIS_SCHEMA}
+
+{ANALYSIS_SCORING}
+Return ONLY valid JSON."""
+        return system_prompt, user_prompt
+    
+    def profile_cache_key(self, resume_text: str) -> str:
+        """Key of a resume profile: the resume text alone, so it is shared by every job description"""
+        return make_cache_key('profile', PROFILE_PROMPT_VERSION, self.config['model_name'], ANALYSIS_TEMPERATURE,
+                              resume_text)
+
+    def match_cache_key(self, profile: Dict, job_description: str) -> str:
+        return make_cache_key('match', MATCH_PROMPT_VERSION, self.config['model_name'], ANALYSIS_TEMPERATURE,
+                              self.profile_text(profile), job_description)
+
+    def build_profile_prompt(self, resume_text: str):
+        system_prompt = """You are an expert HR analyst for Boehringer Ingelheim. Analyze resumes objectively."""
+
+        user_prompt = f"""Profile this resume so it can be matched against any job opening later.
+
+RESUME:
+{resume_text}
+
+Provide JSON:
+{PROFILE_SCHEMA}
+
+Return ONLY valid JSON."""
+        return system_prompt, user_prompt
+
+    def profile_text(self, profile: Dict) -> str:
+        """The parts of a profile the match pass needs, compact (contact details and justifications left out)"""
+        behavior = {key: value.get('score') for key, value in profile.get('behavioral_scores', {}).items()
+                    if isinstance(value, dict)}
+        return json.dumps({
+            'years_experience': profile.get('years_experience'),
+            'skills': profile.get('skills', []),
+            'experience_summary': profile.get('experience_summary', ''),
+            'key_strengths': profile.get('key_strengths', []),
+            'behavioral_scores': behavior
+        }, indent=1)
+
+    def build_match_prompt(self, profile: Dict, job_description: str):
+        system_prompt = """You are an expert HR analyst for Boehringer Ingelheim. Analyze resumes objectively."""
 
-SCORING: Tech>75 & Behavior>3.5 = SHORTLIST, Tech 60-75 = MAYBE, Tech<60 = REJECT
+        user_prompt = f"""Match the candidate profile against the job description.
+
+JOB DESCRIPTION:
+{job_description}
+
+CANDIDATE PROFILE:
+{self.profile_text(profile)}
+
+Provide JSON:
+{MATCH_SCHEMA}
+
+{ANALYSIS_SCORING}
 Return ONLY valid JSON."""
+        return system_prompt, user_prompt
 
-        response = self.call_llm(user_prompt, system_prompt, temperature=0.1, max_tokens=3000)
+    def build_packed_analysis_prompt(self, resumes: Dict[str, str], job_description: str):
+        """One prompt for several resumes sharing the job description; resumes maps resume_id -> text"""
+        system_prompt = """You are an expert HR analyst for Boehringer Ingelheim. Analyze resumes objectively."""
         
-        if response:
-            try:
-                response = response.strip()
-                if response.startswith('```json'):
-                    response = response[7:]
-                if response.startswith('```'):
-                    response = response[3:]
-                if response.endswith('```'):
-                    response = response[:-3]
-                return json.loads(response.strip())
-            except:
-                return None
-        return None
+        resume_blocks = '\n\n'.join(f"=== RESUME {resume_id} ===\n{text}" for resume_id, text in resumes.items())
+        schema = ANALYSIS_SCHEMA.replace('{\n', '{\n  "resume_id": "ID from the resume header",\n', 1)
+        user_prompt = f"""Analyze each resume below against the job description, independently of the others.
+
+JOB DESCRIPTION:
+{job_description}
+
+RESUMES:
+{resume_blocks}
+
+Provide a JSON array with exactly one object per resume ({', '.join(resumes)}), each in this format:
+{schema}
+
+{ANALYSIS_SCORING}
+Return ONLY a valid JSON array."""
+        return system_prompt, user_prompt
     
-    def analyze_resumes_parallel(self, resume_files: dict, job_description: str, batch_size: int = 2):
-        """Analyze resumes in parallel batches"""
-        def analyze_single(item):
-            filename, resume_text = item
-            result = self.analyze_resume(resume_text, job_description)
-            if result:
-                result['resume_filename'] = filename
-                return result
-            return {
-                'resume_filename': filename,
-                'candidate_name': filename.replace('Resume_', '').replace('.txt', '').replace('_', ' '),
-                'error': 'Failed'
-            }
-        
-        results = []
-        items = list(resume_files.items())
-        
-        with ThreadPoolExecutor(max_workers=batch_size) as executor:
-            futures = [executor.submit(analyze_single, item) for item in items]
-            for future in as_completed(futures):
-                results.append(future.result())
-        
+    def parse_packed_response(self, response: Optional[str]) -> Dict[str, Dict]:
+        """Map resume_id -> analysis for every usable entry of a packed response"""
+        parsed = extract_json(response)
+        if isinstance(parsed, dict):
+            parsed = parsed.get('results', [parsed])
+        if not isinstance(parsed, list):
+            return {}
+        results = {}
+        for item in parsed:
+            if not isinstance(item, dict) or not item.get('resume_id'):
+                continue
+            resume_id = str(item.pop('resume_id'))
+            item, invalid = validate(item, ANALYSIS_FIELDS)
+            item = finalize(item, invalid, ANALYSIS_CRITICAL)
+            if item is not None:
+                results[resume_id] = item
         return results
     
-    def generate_interview_questions(self, candidate_data: Dict, job_description: str) -> Optional[Dict]:
+    def plan_packs(self, resume_files: Dict[str, str], job_description: str) -> List[List[str]]:
+        """Group filenames into packs that fit the completion budget (packed_max_tokens) and the context window"""
+        max_pack = max(1, min(self.config['max_pack_size'], self.config['packed_max_tokens'] // ANALYSIS_OUTPUT_TOKENS))
+        input_budget = self.config['context_window'] - self.config['packed_max_tokens'] - estimate_tokens(job_description) - 500
+        packs, current, current_tokens = [], [], 0
+        for filename, text in resume_files.items():
+            tokens = estimate_tokens(text)
+            if current and (len(current) >= max_pack or current_tokens + tokens > input_budget):
+                packs.append(current)
+                current, current_tokens = [], 0
+            current.append(filename)
+            current_tokens += tokens
+        if current:
+            packs.append(current)
+        return packs
+    
+    def complete_response(self, response: Optional[str], user_prompt: str, system_prompt: str, fields: Dict,
+                          critical: set, temperature: float = None, purpose: str = 'chat') -> Optional[Dict]:
+        """Validate a reply against its schema; fields that are missing or invalid are fetched with one
+        targeted follow-up call rather than repeating the whole request"""
+        data, invalid = parse_response(response, fields)
+        repaired = data is not None and bool(invalid)
+        if repaired:
+            followup = self.call_llm(build_followup_prompt(user_prompt, invalid), system_prompt,
+                                     temperature=temperature, max_tokens=FOLLOWUP_MAX_TOKENS, purpose=f'{purpose}_followup')
+            data, invalid = merge_followup(data, followup, invalid, fields)
+        result = finalize(data, invalid, critical)
+        if response is not None:
+            self.record_parse('failed' if result is None else 'repaired' if repaired else 'parsed', purpose)
+        return result
+    
+    def shared_result(self, cache_key: str, compute: Callable, use_cache: bool = True) -> Optional[Dict]:
+        """Cached result for cache_key, else compute(); while it runs, identical requests from other sessions
+        and threads wait for it (see SingleFlight) instead of making their own LLM calls"""
+        if not (self.cache and use_cache):
+            return compute()
+        flights = get_single_flight()
+        while True:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+            leader = flights.join(cache_key)
+            if leader is None:
+                break
+            shared = flights.wait(leader)
+            if shared is not None:
+                self.shared += 1
+                return shared
+            # The leader failed: try again, one caller at a time
+
+        result = None
+        try:
+            result = compute()
+            if result is not None and 'incomplete_fields' not in result:
+                self.cache.set(cache_key, result)
+            return result
+        finally:
+            flights.done(cache_key, result)
+
+    def analyze_resume(self, resume_text: str, job_description: str, use_cache: bool = True,
+                       on_partial: Callable = None) -> Optional[Dict]:
+        """Analysis of one resume; on_partial(fields) streams fields in as the model writes them"""
+        def compute():
+            system_prompt, user_prompt = self.build_analysis_prompt(resume_text, job_description)
+            response = self.call_llm(user_prompt, system_prompt, temperature=ANALYSIS_TEMPERATURE, max_tokens=3000,
+                                     on_partial=on_partial, purpose='analysis')
+            return self.complete_response(response, user_prompt, system_prompt, ANALYSIS_FIELDS, ANALYSIS_CRITICAL,
+                                          ANALYSIS_TEMPERATURE, purpose='analysis')
+
+        return self.shared_result(self.analysis_cache_key(resume_text, job_description), compute, use_cache)
+    
+    def profile_resume(self, resume_text: str, use_cache: bool = True, on_partial: Callable = None) -> Optional[Dict]:
+        """JD-independent profile of one resume (contact, experience, skills, behavioral scores, strengths)"""
+        def compute():
+            system_prompt, user_prompt = self.build_profile_prompt(resume_text)
+            response = self.call_llm(user_prompt, system_prompt, temperature=ANALYSIS_TEMPERATURE,
+                                     max_tokens=PROFILE_MAX_TOKENS, on_partial=on_partial, purpose='profile')
+            return self.complete_response(response, user_prompt, system_prompt, PROFILE_FIELDS, PROFILE_CRITICAL,
+                                          ANALYSIS_TEMPERATURE, purpose='profile')
+
+        return self.shared_result(self.profile_cache_key(resume_text), compute, use_cache)
+
+    def match_profile(self, profile: Dict, job_description: str, use_cache: bool = True,
+                      on_partial: Callable = None) -> Optional[Dict]:
+        """Technical fit and recommendation of a profile for one job description"""
+        def compute():
+            system_prompt, user_prompt = self.build_match_prompt(profile, job_description)
+            response = self.call_llm(user_prompt, system_prompt, temperature=ANALYSIS_TEMPERATURE,
+                                     max_tokens=MATCH_MAX_TOKENS, on_partial=on_partial, purpose='match')
+            return self.complete_response(response, user_prompt, system_prompt, MATCH_FIELDS, MATCH_CRITICAL,
+                                          ANALYSIS_TEMPERATURE, purpose='match')
+
+        return self.shared_result(self.match_cache_key(profile, job_description), compute, use_cache)
+
+    def analyze_resume_staged(self, resume_text: str, job_description: str, use_cache: bool = True,
+                              on_partial: Callable = None) -> Optional[Dict]:
+        """analyze_resume in two passes. The profile is cached per resume, so screening the same resume
+        against another job description only costs the match pass, which reads the profile, not the resume."""
+        profile = self.profile_resume(resume_text, use_cache, on_partial)
+        if profile is None:
+            return None
+        partial = (lambda fields: on_partial({**profile, **fields})) if on_partial else None
+        return merge_profile_match(profile, self.match_profile(profile, job_description, use_cache, partial))
+
+    def failed_result(self, filename: str) -> Dict:
+        return {
+            'resume_filename': filename,
+            'candidate_name': filename.replace('Resume_', '').replace('.txt', '').replace('_', ' '),
+            'error': 'Failed'
+        }
+    
+    def analyze_resumes_parallel(self, resume_files: dict, job_description: str, batch_size: int = None,
+                                 on_result: Callable = None, packed: bool = False, on_partial: Callable = None,
+                                 budget=None, two_stage: bool = False):
+        """Analyze resumes concurrently on one event loop, at most batch_size requests in flight.
+        on_result(result, done, total) is called on this thread as each resume completes, and
+        on_partial(filename, fields) as streamed fields arrive for resumes still in flight.
+        packed=True scores several resumes per request, see plan_packs. Results are reported and
+        returned in completion order, not input order. Dispatch order only applies with a ScreeningBudget:
+        requests (single resumes, or packs in plan_packs order) then start in dict order, one window
+        of batch_size at a time (see scheduling.prioritize), until the budget is exhausted; the rest
+        come back as 'Not evaluated' rows. Without a budget every request is started at once.
+        two_stage=True analyzes each resume with analyze_resume_staged (packing does not apply)."""
+        from utils.apollo_async import AsyncApolloAPIClient
+        async_client = AsyncApolloAPIClient(concurrency=batch_size, client=self)
+        return async_client.analyze_resumes_parallel(resume_files, job_description, on_result, packed, on_partial, budget,
+                                                     two_stage)
+    
+    def match_resumes_parallel(self, resume_files: dict, job_descriptions: Dict[str, str], batch_size: int = None,
+                               pairs: List[Tuple[str, str]] = None, on_result: Callable = None) -> List[Dict]:
+        """Screen resumes against several job descriptions at once, see AsyncApolloAPIClient.match_resumes"""
+        from utils.apollo_async import AsyncApolloAPIClient
+        async_client = AsyncApolloAPIClient(concurrency=batch_size, client=self)
+        return async_client.match_resumes_parallel(resume_files, job_descriptions, pairs, on_result)
+    
+    def interview_cache_key(self, candidate_data: Dict, job_description: str) -> str:
+        """Key of an interview guide: the candidate's full analysis and the job description"""
+        return make_cache_key('interview', INTERVIEW_PROMPT_VERSION, self.config['model_name'],
+                              json.dumps(candidate_data, sort_keys=True, default=str), job_description)
+    
+    def generate_interview_questions(self, candidate_data: Dict, job_description: str,
+                                     on_partial: Callable = None, use_cache: bool = True) -> Optional[Dict]:
+        return self.shared_result(self.interview_cache_key(candidate_data, job_description),
+                                  lambda: self._generate_interview_questions(candidate_data, on_partial), use_cache)
+
+    def _generate_interview_questions(self, candidate_data: Dict, on_partial: Callable = None) -> Optional[Dict]:
         system_prompt = """You are an expert interview coach."""
         
         user_prompt = f"""Generate interview questions for:
@@ -187,18 +859,18 @@ JSON format:
 
 Return ONLY valid JSON."""
 
-        response = self.call_llm(user_prompt, system_prompt, temperature=0.3, max_tokens=3000)
-        
-        if response:
-            try:
-                response = response.strip()
-                if response.startswith('```json'):
-                    response = response[7:]
-                if response.startswith('```'):
-                    response = response[3:]
-                if response.endswith('```'):
-                    response = response[:-3]
-                return json.loads(response.strip())
-            except:
-                return None
-        return None
+        response = self.call_llm(user_prompt, system_prompt, temperature=0.3, max_tokens=3000, on_partial=on_partial,
+                                 purpose='interview')
+        return self.complete_response(response, user_prompt, system_prompt, INTERVIEW_FIELDS, INTERVIEW_CRITICAL, 0.3,
+                                      purpose='interview')
+
+_api_client = None
+_api_client_lock = threading.Lock()
+
+def get_api_client() -> ApolloAPIClient:
+    """Process-wide client (cached results, no per-run metrics) for calls that are not part of a screening run"""
+    global _api_client
+    with _api_client_lock:
+        if _api_client is None:
+            _api_client = ApolloAPIClient()
+        return _api_client
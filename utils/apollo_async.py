@@ -0,0 +1,472 @@
+import json
+import time
+import queue
+import atexit
+import asyncio
+import threading
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from utils.apollo_api import (ApolloAPIClient, ANALYSIS_TEMPERATURE, ANALYSIS_PACKED_PROMPT_VERSION, RETRYABLE_STATUS,
+                              THROTTLE_STATUS, FOLLOWUP_MAX_TOKENS, PROFILE_MAX_TOKENS, MATCH_MAX_TOKENS, StreamCollector,
+                              get_token_manager, get_rate_controller, parse_retry_after, estimate_usage,
+                              merge_profile_match)
+from utils.result_cache import get_single_flight
+from utils.llm_metrics import log_event
+from utils.scheduling import ScreeningBudget, not_evaluated_result
+from utils.response_parser import (ANALYSIS_FIELDS, ANALYSIS_CRITICAL, PROFILE_FIELDS, PROFILE_CRITICAL, MATCH_FIELDS,
+                                   MATCH_CRITICAL, parse_response, build_followup_prompt, merge_followup, finalize)
+
+SESSION_TIMEOUT = aiohttp.ClientTimeout(total=90)
+
+# One event loop thread per process: its aiohttp session (keep-alive connections, TLS sessions) outlives
+# individual screening runs and Streamlit reruns instead of being rebuilt by each asyncio.run()
+_loop = None
+_loop_lock = threading.Lock()
+_session = None
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name='apollo-async', daemon=True).start()
+            atexit.register(_close_session)
+        return _loop
+
+def get_client_session() -> aiohttp.ClientSession:
+    """Process-wide session; only for use on the get_event_loop() loop. Runs bound their own concurrency,
+    so the connector is not capped."""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0), timeout=SESSION_TIMEOUT)
+    return _session
+
+def _close_session():
+    if _session is not None and not _session.closed:
+        try:
+            asyncio.run_coroutine_threadsafe(_session.close(), _loop).result(timeout=5)
+        except Exception:
+            pass
+
+def run_on_loop(make_coro: Callable[..., Awaitable], *callbacks: Optional[Callable]):
+    """Run make_coro(*callbacks) on the shared loop and block until it finishes. The callbacks are relayed
+    to the calling thread, so they may update Streamlit elements; if one raises, the run is cancelled."""
+    calls = queue.Queue()
+
+    def relay(callback):
+        return (lambda *args: calls.put((callback, args))) if callback else None
+
+    future = asyncio.run_coroutine_threadsafe(make_coro(*(relay(c) for c in callbacks)), get_event_loop())
+    future.add_done_callback(lambda _: calls.put(None))
+    try:
+        while True:
+            item = calls.get()
+            if item is None:
+                return future.result()
+            callback, args = item
+            callback(*args)
+    except BaseException:
+        future.cancel()
+        raise
+
+class AsyncApolloAPIClient:
+    """Coroutine variant of ApolloAPIClient: one event loop, a bounded number of requests in flight"""
+
+    def __init__(self, concurrency: int = None, use_cache: bool = True, client: ApolloAPIClient = None):
+        self.client = client or ApolloAPIClient(use_cache=use_cache)
+        self.config = self.client.config
+        self.concurrency = concurrency or self.config['max_concurrency']
+        self.semaphore = None
+        self.session = None
+        self._own_session = False
+        self._entered = 0
+
+    async def __aenter__(self):
+        # Reference-counted: concurrent runs and bare call_llm()s share one session and semaphore,
+        # released only when the last of them exits
+        if not self._entered:
+            self.semaphore = asyncio.BoundedSemaphore(self.concurrency)
+            get_rate_controller(self.config).raise_ceiling(self.concurrency)
+            self._own_session = asyncio.get_running_loop() is not _loop
+            if self._own_session:
+                # Driven from the caller's own event loop: the shared session is bound to another loop
+                self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.concurrency),
+                                                     timeout=SESSION_TIMEOUT)
+            else:
+                self.session = get_client_session()
+        self._entered += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        self._entered -= 1
+        if self._entered:
+            return
+        session, self.session, self.semaphore = self.session, None, None
+        if self._own_session:
+            await session.close()
+
+    async def get_access_token(self, stale_token: str = None) -> Optional[str]:
+        token = get_token_manager(self.config).peek()
+        if token and token != stale_token:
+            return token
+        # The shared TokenManager serializes refreshes; keep its blocking fetch off the event loop
+        return await asyncio.to_thread(self.client.get_access_token, stale_token)
+
+    async def read_stream(self, response: aiohttp.ClientResponse, on_partial: Callable) -> Tuple[Optional[str], Optional[Dict]]:
+        if 'event-stream' not in response.headers.get('Content-Type', ''):
+            try:
+                data = await response.json(content_type=None)
+                return data['choices'][0]['message']['content'], data.get('usage')
+            except (ValueError, KeyError, IndexError, TypeError):
+                return None, None
+        collector = StreamCollector(on_partial)
+        async for line in response.content:
+            collector.feed_line(line)
+        return collector.text, collector.usage
+
+    async def call_llm(self, prompt: str, system_prompt: str = None, temperature: float = None, max_tokens: int = None,
+                       on_partial: Callable = None, purpose: str = 'chat') -> Optional[str]:
+        call = self.client.new_call(purpose, bool(on_partial))
+        started = time.time()
+        content, usage = None, None
+        try:
+            async with self:
+                content, usage = await self._call_llm(call, prompt, system_prompt, temperature, max_tokens, on_partial)
+            return content
+        finally:
+            call['total_time'] = time.time() - started
+            if usage is None and content is not None:
+                usage = estimate_usage(prompt, system_prompt, content)
+            self.client.record_call(call, usage)
+
+    async def _call_llm(self, call: Dict, prompt: str, system_prompt: str, temperature: float, max_tokens: int,
+                        on_partial: Callable) -> Tuple[Optional[str], Optional[Dict]]:
+        token_start = time.time()
+        token = await self.get_access_token()
+        call['token_time'] = time.time() - token_start
+        if not token:
+            call['status'] = 'no_token'
+            return None, None
+
+        url, payload = self.client.build_request(prompt, system_prompt, temperature, max_tokens, stream=bool(on_partial))
+        controller = get_rate_controller(self.config)
+        refreshed = False
+        for attempt in range(self.config['max_retries'] + 1):
+            headers = {
+                'Authorization': f'Bearer {token}',
+                'Content-Type': 'application/json'
+            }
+            retry_after = None
+            usage = None
+            call['attempts'] += 1
+            try:
+                async with self.semaphore:
+                    await controller.acquire_async()
+                    start = time.time()
+                    try:
+                        async with self.session.post(url, headers=headers, json=payload) as response:
+                            status = response.status
+                            if status == 200:
+                                if on_partial:
+                                    content, usage = await self.read_stream(response, on_partial)
+                                else:
+                                    # Decoded below, where a non-JSON body (e.g. a proxy's HTML page) is a bad response
+                                    body = await response.read()
+                            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    finally:
+                        controller.release()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                log_event({'event': 'llm_error', 'purpose': call['purpose'], 'attempt': call['attempts'],
+                           'error': f"{type(e).__name__}: {e}"})
+                status = None
+            call['latency'] = time.time() - start
+            call['status'] = status if status is not None else 'error'
+
+            try:
+                if status == 200:
+                    controller.on_success(time.time() - start)
+                    if on_partial:
+                        return content, usage
+                    data = json.loads(body)
+                    return data['choices'][0]['message']['content'], data.get('usage')
+                elif status == 401 and not refreshed:
+                    refreshed = True
+                    token_start = time.time()
+                    token = await self.get_access_token(stale_token=token)
+                    call['token_time'] += time.time() - token_start
+                    if not token:
+                        return None, None
+                    continue
+                elif status in THROTTLE_STATUS:
+                    call['throttled'] += 1
+                    controller.on_throttle(retry_after)
+                elif status is not None and status not in RETRYABLE_STATUS:
+                    return None, None
+                # Transport errors and other retryable statuses are retried with backoff without shrinking the limit
+            except Exception as e:
+                log_event({'event': 'llm_error', 'purpose': call['purpose'], 'attempt': call['attempts'],
+                           'error': f"bad response: {type(e).__name__}: {e}"})
+                call['status'] = 'bad_response'
+                return None, None
+            if attempt < self.config['max_retries']:
+                await asyncio.sleep(controller.backoff(attempt, retry_after))
+        return None, None
+
+    async def complete_response(self, response: Optional[str], user_prompt: str, system_prompt: str, fields: Dict,
+                                critical: set, temperature: float = None, purpose: str = 'chat') -> Optional[Dict]:
+        """Coroutine counterpart of ApolloAPIClient.complete_response"""
+        data, invalid = parse_response(response, fields)
+        repaired = data is not None and bool(invalid)
+        if repaired:
+            followup = await self.call_llm(build_followup_prompt(user_prompt, invalid), system_prompt,
+                                           temperature=temperature, max_tokens=FOLLOWUP_MAX_TOKENS,
+                                           purpose=f'{purpose}_followup')
+            data, invalid = merge_followup(data, followup, invalid, fields)
+        result = finalize(data, invalid, critical)
+        if response is not None:
+            self.client.record_parse('failed' if result is None else 'repaired' if repaired else 'parsed', purpose)
+        return result
+
+    async def shared_result(self, cache_key: str, compute: Callable, use_cache: bool = True) -> Optional[Dict]:
+        """ApolloAPIClient.shared_result for a coroutine: waiting on another session's identical request
+        does not block the event loop"""
+        cache = self.client.cache if use_cache else None
+        if not cache:
+            return await compute()
+        flights = get_single_flight()
+        while True:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+            leader = flights.join(cache_key)
+            if leader is None:
+                break
+            shared = flights.decode(await asyncio.wrap_future(leader))
+            if shared is not None:
+                self.client.shared += 1
+                return shared
+
+        result = None
+        try:
+            result = await compute()
+            if result is not None and 'incomplete_fields' not in result:
+                cache.set(cache_key, result)
+            return result
+        finally:
+            flights.done(cache_key, result)
+
+    async def analyze_resume(self, resume_text: str, job_description: str, use_cache: bool = True,
+                             on_partial: Callable = None) -> Optional[Dict]:
+        async def compute():
+            system_prompt, user_prompt = self.client.build_analysis_prompt(resume_text, job_description)
+            response = await self.call_llm(user_prompt, system_prompt, temperature=ANALYSIS_TEMPERATURE, max_tokens=3000,
+                                           on_partial=on_partial, purpose='analysis')
+            return await self.complete_response(response, user_prompt, system_prompt, ANALYSIS_FIELDS,
+                                                ANALYSIS_CRITICAL, ANALYSIS_TEMPERATURE, purpose='analysis')
+
+        return await self.shared_result(self.client.analysis_cache_key(resume_text, job_description), compute, use_cache)
+
+    async def profile_resume(self, resume_text: str, use_cache: bool = True, on_partial: Callable = None) -> Optional[Dict]:
+        async def compute():
+            system_prompt, user_prompt = self.client.build_profile_prompt(resume_text)
+            response = await self.call_llm(user_prompt, system_prompt, temperature=ANALYSIS_TEMPERATURE,
+                                           max_tokens=PROFILE_MAX_TOKENS, on_partial=on_partial, purpose='profile')
+            return await self.complete_response(response, user_prompt, system_prompt, PROFILE_FIELDS, PROFILE_CRITICAL,
+                                                ANALYSIS_TEMPERATURE, purpose='profile')
+
+        return await self.shared_result(self.client.profile_cache_key(resume_text), compute, use_cache)
+
+    async def match_profile(self, profile: Dict, job_description: str, use_cache: bool = True,
+                            on_partial: Callable = None) -> Optional[Dict]:
+        async def compute():
+            system_prompt, user_prompt = self.client.build_match_prompt(profile, job_description)
+            response = await self.call_llm(user_prompt, system_prompt, temperature=ANALYSIS_TEMPERATURE,
+                                           max_tokens=MATCH_MAX_TOKENS, on_partial=on_partial, purpose='match')
+            return await self.complete_response(response, user_prompt, system_prompt, MATCH_FIELDS, MATCH_CRITICAL,
+                                                ANALYSIS_TEMPERATURE, purpose='match')
+
+        return await self.shared_result(self.client.match_cache_key(profile, job_description), compute, use_cache)
+
+    async def analyze_resume_staged(self, resume_text: str, job_description: str, use_cache: bool = True,
+                                    on_partial: Callable = None) -> Optional[Dict]:
+        """ApolloAPIClient.analyze_resume_staged: cached profile, then the JD match"""
+        profile = await self.profile_resume(resume_text, use_cache, on_partial)
+        if profile is None:
+            return None
+        partial = (lambda fields: on_partial({**profile, **fields})) if on_partial else None
+        return merge_profile_match(profile, await self.match_profile(profile, job_description, use_cache, partial))
+
+    async def analyze_pack(self, pack: Dict[str, str], job_description: str, use_cache: bool = True) -> Dict[str, Optional[Dict]]:
+        """Analyze several resumes in one request; entries missing from a malformed response fall back to single calls"""
+        cache = self.client.cache if use_cache else None
+        results = {}
+        pending = {}
+        for filename, text in pack.items():
+            cached = None
+            if cache:
+                cached = cache.get(self.client.analysis_cache_key(text, job_description, ANALYSIS_PACKED_PROMPT_VERSION))
+                if cached is None:
+                    cached = cache.get(self.client.analysis_cache_key(text, job_description))
+            if cached is not None:
+                results[filename] = cached
+            else:
+                pending[f"R{len(pending) + 1}"] = filename
+
+        if len(pending) > 1:
+            system_prompt, user_prompt = self.client.build_packed_analysis_prompt(
+                {resume_id: pack[filename] for resume_id, filename in pending.items()}, job_description)
+            response = await self.call_llm(user_prompt, system_prompt, temperature=ANALYSIS_TEMPERATURE,
+                                           max_tokens=self.config['packed_max_tokens'], purpose='packed_analysis')
+            parsed = self.client.parse_packed_response(response)
+            if response is not None:
+                # Entries missing from the pack are recovered by single calls below
+                self.client.record_parse('parsed' if len(parsed) == len(pending) else 'repaired' if parsed else 'failed',
+                                         'packed_analysis')
+            for resume_id, filename in list(pending.items()):
+                if resume_id in parsed:
+                    results[filename] = parsed[resume_id]
+                    del pending[resume_id]
+                    if cache and 'incomplete_fields' not in results[filename]:
+                        cache.set(self.client.analysis_cache_key(pack[filename], job_description,
+                                                                 ANALYSIS_PACKED_PROMPT_VERSION), results[filename])
+
+        fallback = await asyncio.gather(*(self.analyze_resume(pack[filename], job_description, use_cache)
+                                          for filename in pending.values()))
+        results.update(zip(pending.values(), fallback))
+        return results
+
+    async def analyze_resumes(self, resume_files: dict, job_description: str, on_result: Callable = None,
+                              packed: bool = False, on_partial: Callable = None,
+                              budget: ScreeningBudget = None, two_stage: bool = False) -> List[Dict]:
+        """Analyze all resumes; on_result(result, done, total) is called as each one completes.
+        With packed=True several resumes share one request (and one copy of the job description).
+        on_partial(filename, fields) streams single-resume replies as they are written; packed replies are not streamed.
+        With a budget, requests are dispatched in order one window (concurrency) at a time and dispatch
+        stops once the budget is exhausted; resumes never sent are reported as 'Not evaluated'.
+        two_stage=True runs analyze_resume_staged per resume instead (packing does not apply)."""
+        def finish(filename, result):
+            if result:
+                result['resume_filename'] = filename
+                return result
+            return self.client.failed_result(filename)
+
+        analyze = self.analyze_resume_staged if two_stage else self.analyze_resume
+
+        async def analyze_single(filename):
+            partial = (lambda fields: on_partial(filename, fields)) if on_partial else None
+            return [finish(filename, await analyze(resume_files[filename], job_description, on_partial=partial))]
+
+        async def analyze_packed(filenames):
+            pack_results = await self.analyze_pack({f: resume_files[f] for f in filenames}, job_description)
+            return [finish(f, pack_results.get(f)) for f in filenames]
+
+        if packed and not two_stage:
+            units, run = self.client.plan_packs(resume_files, job_description), analyze_packed
+        else:
+            units, run = [[filename] for filename in resume_files], lambda filenames: analyze_single(filenames[0])
+
+        results = []
+
+        def report(result):
+            results.append(result)
+            if budget is not None:
+                budget.observe(result)
+            if on_result:
+                on_result(result, len(results), len(resume_files))
+
+        tasks = []
+        async with self:
+            try:
+                if budget is None:
+                    tasks = [asyncio.create_task(run(unit)) for unit in units]
+                    for task in asyncio.as_completed(tasks):
+                        for result in await task:
+                            report(result)
+                    return results
+
+                budget.start(self.client)
+                dispatched = 0
+                in_flight = {}
+                while True:
+                    while (dispatched < len(units) and len(in_flight) < self.concurrency
+                           and not budget.exhausted(sum(in_flight.values()))):
+                        task = asyncio.create_task(run(units[dispatched]))
+                        tasks.append(task)
+                        in_flight[task] = len(units[dispatched])
+                        dispatched += 1
+                    if not in_flight:
+                        break
+                    done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        del in_flight[task]
+                        for result in task.result():
+                            report(result)
+            finally:
+                # The run was cancelled (e.g. a callback raised on the calling thread): stop the remaining requests
+                pending = [task for task in tasks if not task.done()]
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+        reason = budget.exhausted()
+        for unit in units[dispatched:]:
+            for filename in unit:
+                report(not_evaluated_result(filename, reason))
+        return results
+
+    async def match_resumes(self, resume_files: dict, job_descriptions: Dict[str, str], pairs: List[Tuple[str, str]] = None,
+                            on_result: Callable = None) -> List[Dict]:
+        """Two-stage analysis of (filename, job) pairs (default: every resume against every job) on one pool of
+        requests in flight. Each resume is profiled once and its match passes start as soon as the profile is
+        ready. Result rows carry 'job'; on_result(result, done, total) is called as each pair completes."""
+        if pairs is None:
+            pairs = [(filename, job) for filename in resume_files for job in job_descriptions]
+        jobs_by_resume = {}
+        for filename, job in pairs:
+            jobs_by_resume.setdefault(filename, []).append(job)
+        results = []
+
+        def report(filename, job, result):
+            result = dict(result, resume_filename=filename, job=job) if result else \
+                dict(self.client.failed_result(filename), job=job)
+            results.append(result)
+            if on_result:
+                on_result(result, len(results), len(pairs))
+
+        async def match(filename, job, profile):
+            report(filename, job, merge_profile_match(profile, await self.match_profile(profile, job_descriptions[job])))
+
+        async def run(filename):
+            profile = await self.profile_resume(resume_files[filename])
+            if profile is None:
+                for job in jobs_by_resume[filename]:
+                    report(filename, job, None)
+                return
+            await asyncio.gather(*(match(filename, job, profile) for job in jobs_by_resume[filename]))
+
+        tasks = []
+        async with self:
+            try:
+                tasks = [asyncio.create_task(run(filename)) for filename in jobs_by_resume]
+                await asyncio.gather(*tasks)
+            finally:
+                pending = [task for task in tasks if not task.done()]
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+        return results
+
+    def match_resumes_parallel(self, resume_files: dict, job_descriptions: Dict[str, str],
+                               pairs: List[Tuple[str, str]] = None, on_result: Callable = None) -> List[Dict]:
+        return run_on_loop(lambda on_result: self.match_resumes(resume_files, job_descriptions, pairs, on_result),
+                           on_result)
+
+    def analyze_resumes_parallel(self, resume_files: dict, job_description: str, on_result: Callable = None,
+                                 packed: bool = False, on_partial: Callable = None,
+                                 budget: ScreeningBudget = None, two_stage: bool = False) -> List[Dict]:
+        """Blocking entry point for callers without a running event loop (Streamlit script thread, CLI, workers).
+        Requests run on the process-wide loop and session; on_result and on_partial run on the calling thread,
+        so they may update Streamlit elements directly."""
+        return run_on_loop(lambda on_result, on_partial: self.analyze_resumes(
+            resume_files, job_description, on_result, packed, on_partial, budget, two_stage), on_result, on_partial)
@@ -0,0 +1,45 @@
+from typing import List, Tuple
+
+import numpy as np
+
+def behavior_average(scores: np.ndarray) -> np.ndarray:
+    return scores.astype(np.float32).mean(axis=1) if len(scores) else np.zeros(0, dtype=np.float32)
+
+def display_scores(scores: np.ndarray) -> np.ndarray:
+    """Scores as int8 for tables when they are all whole, otherwise unchanged"""
+    return scores.astype(np.int8) if np.array_equal(scores, np.round(scores)) else scores
+
+def cluster_order(scores: np.ndarray, k: int = 8, iterations: int = 10) -> np.ndarray:
+    """Row order grouping similar behavior profiles (k-means), clusters and rows within them best first"""
+    n = len(scores)
+    if n <= k:
+        return np.argsort(-behavior_average(scores), kind='stable')
+    points = scores.astype(np.float32)
+    average = points.mean(axis=1)
+    # Deterministic start: profiles at evenly spaced quantiles of the average score
+    centroids = points[np.argsort(average, kind='stable')[np.linspace(0, n - 1, k).astype(int)]]
+    for _ in range(iterations):
+        distances = ((points[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2)
+        labels = distances.argmin(axis=1)
+        for c in range(k):
+            members = points[labels == c]
+            if len(members):
+                centroids[c] = members.mean(axis=0)
+    cluster_rank = np.argsort(np.argsort(-centroids.mean(axis=1), kind='stable'), kind='stable')
+    return np.lexsort((-average, cluster_rank[labels]))
+
+def score_distribution(scores: np.ndarray, max_score: int = 5) -> np.ndarray:
+    """(5, max_score + 1) counts of each score per behavior, half scores rounded up; column 0 counts missing scores"""
+    whole = np.floor(scores + 0.5).astype(np.int64)
+    return np.stack([np.bincount(whole[:, col].clip(0, max_score), minlength=max_score + 1)
+                     for col in range(scores.shape[1])]) if len(scores) else np.zeros((scores.shape[1], max_score + 1), dtype=int)
+
+def downsample_rows(scores: np.ndarray, max_rows: int) -> Tuple[np.ndarray, List[Tuple[int, int]]]:
+    """Average consecutive rows into at most max_rows bands; returns the band means and (start, end) row ranges"""
+    n = len(scores)
+    if n <= max_rows:
+        return scores.astype(np.float32), [(i, i + 1) for i in range(n)]
+    edges = np.linspace(0, n, max_rows + 1).astype(int)
+    sums = np.add.reduceat(scores.astype(np.float32), edges[:-1], axis=0)
+    counts = np.diff(edges)[:, None]
+    return sums / counts, list(zip(edges[:-1].tolist(), edges[1:].tolist()))
@@ -0,0 +1,161 @@
+import re
+import hashlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.result_cache import ResultCache, make_cache_key
+
+DEDUP_CONFIG = {
+    'threshold': 0.85,
+    'num_perm': 128,
+    'bands': 32,
+    'shingle_size': 5
+}
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_rng = np.random.RandomState(20240601)
+_PERM_A = _rng.randint(1, 1 << 32, size=DEDUP_CONFIG['num_perm'], dtype=np.uint64)
+_PERM_B = _rng.randint(0, 1 << 32, size=DEDUP_CONFIG['num_perm'], dtype=np.uint64)
+
+WORD_PATTERN = re.compile(r"\w+")
+
+def shingles(text: str, size: int = None) -> set:
+    """Overlapping word n-grams of the resume, case and whitespace insensitive"""
+    size = size or DEDUP_CONFIG['shingle_size']
+    words = WORD_PATTERN.findall((text or '').lower())
+    if len(words) <= size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+def minhash_signature(text: str) -> np.ndarray:
+    """MinHash signature (num_perm uint64 values); equal positions estimate the Jaccard similarity of shingle sets"""
+    grams = shingles(text)
+    if not grams:
+        return np.full(len(_PERM_A), _MERSENNE_PRIME, dtype=np.uint64)
+    hashes = np.fromiter((int.from_bytes(hashlib.blake2b(g.encode('utf-8'), digest_size=4).digest(), 'little')
+                          for g in grams), dtype=np.uint64, count=len(grams))
+    # (a * x + b) mod p with 32-bit x and a, so the product cannot overflow 64 bits
+    permuted = (np.outer(hashes, _PERM_A) % _MERSENNE_PRIME + _PERM_B) % _MERSENNE_PRIME
+    return permuted.min(axis=0)
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.mean(a == b))
+
+class DuplicateIndex:
+    """LSH index of MinHash signatures for resumes screened against one job description.
+
+    Signatures are split into bands; resumes sharing any band hash are candidates, confirmed by the
+    estimated similarity. With a cache, analyzed resumes and their results persist across screenings.
+    """
+
+    def __init__(self, namespace: str, cache: ResultCache = None, threshold: float = None):
+        self.namespace = namespace
+        self.cache = cache
+        self.threshold = DEDUP_CONFIG['threshold'] if threshold is None else threshold
+        self.bands = DEDUP_CONFIG['bands']
+        self._buckets = {}
+        self._entries = {}
+
+    def _band_keys(self, signature: np.ndarray) -> List[Tuple[int, str]]:
+        rows = len(signature) // self.bands
+        return [(band, hashlib.blake2b(signature[band * rows:(band + 1) * rows].tobytes(), digest_size=8).hexdigest())
+                for band in range(self.bands)]
+
+    def _persisted_band(self, band_key: Tuple[int, str]) -> List[str]:
+        if not self.cache:
+            return []
+        cached = self.cache.get(make_cache_key('dedup-band', self.namespace, *band_key))
+        return cached['ids'] if cached else []
+
+    def _entry(self, entry_id: str) -> Optional[Dict]:
+        if entry_id not in self._entries and self.cache:
+            cached = self.cache.get(make_cache_key('dedup-entry', self.namespace, entry_id))
+            if cached:
+                cached['signature'] = np.array(cached['signature'], dtype=np.uint64)
+                self._entries[entry_id] = cached
+        return self._entries.get(entry_id)
+
+    def query(self, signature: np.ndarray) -> Tuple[Optional[Dict], float]:
+        """Most similar indexed entry at or above the threshold, and its estimated similarity"""
+        candidates = set()
+        for band_key in self._band_keys(signature):
+            candidates.update(self._buckets.get(band_key, ()))
+            candidates.update(self._persisted_band(band_key))
+        best, best_similarity = None, 0.0
+        for entry_id in candidates:
+            entry = self._entry(entry_id)
+            if entry is None:
+                continue
+            score = similarity(signature, entry['signature'])
+            if score >= self.threshold and score > best_similarity:
+                best, best_similarity = entry, score
+        return best, best_similarity
+
+    def add(self, entry_id: str, filename: str, signature: np.ndarray, result: Dict = None):
+        """Index a resume; with a result (and a cache) it is also remembered for later screenings"""
+        entry = {'id': entry_id, 'filename': filename, 'signature': signature, 'result': result}
+        self._entries[entry_id] = entry
+        persist = self.cache is not None and result is not None
+        for band_key in self._band_keys(signature):
+            bucket = self._buckets.setdefault(band_key, [])
+            if entry_id not in bucket:
+                bucket.append(entry_id)
+            if persist:
+                self.cache.append(make_cache_key('dedup-band', self.namespace, *band_key), 'ids', entry_id)
+        if persist:
+            self.cache.set(make_cache_key('dedup-entry', self.namespace, entry_id),
+                           dict(entry, signature=[int(v) for v in signature]))
+
+def flag_duplicate(result: Dict, filename: str, source: str, score: float) -> Dict:
+    """Copy of source's analysis reported for filename, marked as reused"""
+    return dict(result, resume_filename=filename, duplicate_of=source, duplicate_similarity=round(score, 3))
+
+def dedupe_resumes(resume_files: Dict[str, str], index: DuplicateIndex):
+    """Split resumes into an LLM queue and near-duplicates that can reuse another analysis.
+
+    Returns (queue, reused, batch_duplicates): reused holds flagged result rows copied from earlier
+    screenings; batch_duplicates maps filename -> (filename in queue it duplicates, similarity) and is
+    resolved with resolve_batch_duplicates once the queue has been analyzed. Queue order is preserved.
+    """
+    queue, reused, batch_duplicates = {}, [], {}
+    for filename, text in resume_files.items():
+        signature = minhash_signature(text)
+        entry_id = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        match, score = index.query(signature)
+        if match is not None and match.get('result') is not None:
+            reused.append(flag_duplicate(match['result'], filename, match['filename'], score))
+        elif match is not None and match['filename'] in queue:
+            batch_duplicates[filename] = (match['filename'], score)
+        else:
+            queue[filename] = text
+            index.add(entry_id, filename, signature)
+    return queue, reused, batch_duplicates
+
+def resolve_batch_duplicates(results: List[Dict], batch_duplicates: Dict[str, Tuple[str, float]]) -> List[Dict]:
+    """Result rows for in-batch duplicates, copied from their analyzed originals (failed or not evaluated
+    originals give the copy the same error and reason)"""
+    by_filename = {r['resume_filename']: r for r in results}
+    rows = []
+    for filename, (source, score) in batch_duplicates.items():
+        result = by_filename.get(source)
+        if result is None or 'error' in result:
+            rows.append({
+                'resume_filename': filename,
+                'candidate_name': filename.replace('Resume_', '').rsplit('.', 1)[0].replace('_', ' '),
+                'error': result['error'] if result is not None else 'Failed'
+            })
+            if result is not None and 'not_evaluated_reason' in result:
+                rows[-1]['not_evaluated_reason'] = result['not_evaluated_reason']
+        else:
+            rows.append(flag_duplicate(result, filename, source, score))
+    return rows
+
+def remember_results(results: List[Dict], resume_files: Dict[str, str], index: DuplicateIndex):
+    """Add complete analyses to the index so later screenings can reuse them"""
+    for result in results:
+        text = resume_files.get(result['resume_filename'])
+        if text is None or 'error' in result or 'incomplete_fields' in result or 'duplicate_of' in result:
+            continue
+        index.add(hashlib.sha256(text.encode('utf-8')).hexdigest(), result['resume_filename'],
+                  minhash_signature(text), result)
@@ -0,0 +1,146 @@
+import os
+import csv
+import time
+from pathlib import Path
+from importlib.util import find_spec
+from typing import Dict, Iterator, List
+
+from utils.response_parser import BEHAVIOR_KEYS
+from utils.results_store import ResultsStore
+
+# Checked without importing: pyarrow and openpyxl are only loaded when that format is exported
+HAVE_PYARROW = find_spec('pyarrow') is not None
+HAVE_OPENPYXL = find_spec('openpyxl') is not None
+
+EXPORT_CONFIG = {
+    'dir': os.environ.get('TALENTLENS_EXPORT_DIR', str(Path(__file__).parent.parent / '.cache' / 'exports')),
+    'batch_rows': 1000,
+    'max_files': 20
+}
+
+# Every analysis field, flattened to one column each; 'list' columns are joined with "; " in CSV/XLSX
+# and kept as lists in Parquet. skills and experience_summary come from two-stage analyses, job from
+# Job Matching runs; they are empty otherwise.
+EXPORT_FIELDS = [
+    ('candidate_id', 'str'),
+    ('job', 'str'),
+    ('resume_filename', 'str'),
+    ('candidate_name', 'str'),
+    ('email', 'str'),
+    ('phone', 'str'),
+    ('years_experience', 'float'),
+    ('technical_fit_score', 'int'),
+    ('technical_fit_justification', 'str'),
+    *[field for key in BEHAVIOR_KEYS for field in ((f'{key}_score', 'float'), (f'{key}_justification', 'str'))],
+    ('overall_recommendation', 'str'),
+    ('recommendation_justification', 'str'),
+    ('key_strengths', 'list'),
+    ('key_concerns', 'list'),
+    ('missing_requirements', 'list'),
+    ('skills', 'list'),
+    ('experience_summary', 'str'),
+    ('prescreen_score', 'float'),
+    ('duplicate_of', 'str'),
+    ('duplicate_similarity', 'float'),
+    ('incomplete_fields', 'list'),
+    ('error', 'str'),
+    ('not_evaluated_reason', 'str')
+]
+EXPORT_COLUMNS = [name for name, _ in EXPORT_FIELDS]
+
+def export_row(cid: str, record: Dict) -> Dict:
+    row = dict(record, candidate_id=cid)
+    behaviors = row.pop('behavioral_scores', None) or {}
+    for key in BEHAVIOR_KEYS:
+        row[f'{key}_score'] = (behaviors.get(key) or {}).get('score')
+        row[f'{key}_justification'] = (behaviors.get(key) or {}).get('justification')
+    for name, kind in EXPORT_FIELDS:
+        value = row.get(name)
+        if kind == 'list' and value is not None and not isinstance(value, list):
+            value = [value]
+        elif kind in ('int', 'float') and not isinstance(value, (int, float)):
+            value = None
+        elif kind == 'str' and value is not None:
+            value = str(value)
+        row[name] = value
+    return {name: row[name] for name in EXPORT_COLUMNS}
+
+def iter_export_rows(store: ResultsStore) -> Iterator[Dict]:
+    """Export rows one at a time, so writers never hold more than a batch"""
+    for cid in list(store.ids):
+        yield export_row(cid, store.record(cid))
+
+def _flat(row: Dict) -> List:
+    return ['; '.join(str(v) for v in value) if isinstance(value, list) else value for value in row.values()]
+
+def write_csv(store: ResultsStore, path: str):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(EXPORT_COLUMNS)
+        for row in iter_export_rows(store):
+            writer.writerow(['' if v is None else v for v in _flat(row)])
+
+def write_xlsx(store: ResultsStore, path: str):
+    from openpyxl import Workbook
+    # write_only streams rows to the zip instead of keeping every cell object in memory
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Analysis')
+    sheet.append(EXPORT_COLUMNS)
+    for row in iter_export_rows(store):
+        sheet.append(_flat(row))
+    workbook.save(path)
+
+def write_parquet(store: ResultsStore, path: str):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    types = {'str': pa.string(), 'int': pa.int64(), 'float': pa.float64(), 'list': pa.list_(pa.string())}
+    schema = pa.schema([(name, types[kind]) for name, kind in EXPORT_FIELDS])
+    with pq.ParquetWriter(path, schema, compression='zstd') as writer:
+        batch = []
+        for row in iter_export_rows(store):
+            for name, kind in EXPORT_FIELDS:
+                if kind == 'list' and row[name] is not None:
+                    row[name] = [str(v) for v in row[name]]
+            batch.append(row)
+            if len(batch) >= EXPORT_CONFIG['batch_rows']:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                batch = []
+        if batch:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+
+EXPORT_FORMATS = {
+    'csv': (write_csv, 'text/csv', True),
+    'xlsx': (write_xlsx, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', HAVE_OPENPYXL),
+    'parquet': (write_parquet, 'application/vnd.apache.parquet', HAVE_PYARROW)
+}
+
+def available_formats() -> List[str]:
+    return [fmt for fmt, (_, _, available) in EXPORT_FORMATS.items() if available]
+
+def _prune(directory: Path):
+    files = sorted((p for p in directory.glob('results-*') if p.suffix != '.tmp'), key=lambda p: p.stat().st_mtime,
+                   reverse=True)
+    for path in files[EXPORT_CONFIG['max_files']:]:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+def export_path(store: ResultsStore, fmt: str) -> Path:
+    return Path(EXPORT_CONFIG['dir']) / f"results-{store.uid}-{store.version}.{fmt}"
+
+def export_results(store: ResultsStore, fmt: str) -> str:
+    """Path of an export of every result field; written once per store version and format, then reused"""
+    writer = EXPORT_FORMATS[fmt][0]
+    path = export_path(store, fmt)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if not path.exists():
+        partial = path.with_name(f"{path.name}.{os.getpid()}.{time.time_ns()}.tmp")
+        try:
+            writer(store, str(partial))
+            os.replace(partial, path)
+        finally:
+            if partial.exists():
+                partial.unlink()
+        _prune(path.parent)
+    return str(path)
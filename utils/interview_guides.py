@@ -0,0 +1,87 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from utils.apollo_api import get_api_client
+from utils.llm_metrics import log_event
+
+GUIDE_CONFIG = {
+    'max_workers': 8
+}
+
+class GuidePrefetcher:
+    """Generates interview guides in background threads, keyed like ApolloAPIClient.interview_cache_key.
+
+    Guides are also written to the result cache, so once generated they survive reruns, page switches
+    and restarts. Requests share the gateway's rate controller with screening.
+    """
+
+    def __init__(self, max_workers: int = None):
+        self.client = get_api_client()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or GUIDE_CONFIG['max_workers'],
+                                            thread_name_prefix='interview-guide')
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def key(self, candidate_data: Dict, job_description: str) -> str:
+        return self.client.interview_cache_key(candidate_data, job_description)
+
+    def prefetch(self, candidates: List[Dict], job_description: str) -> List[str]:
+        """Start generating a guide for every candidate that has none yet (failed ones are retried); returns their keys"""
+        keys = []
+        with self._lock:
+            for candidate in candidates:
+                key = self.key(candidate, job_description)
+                keys.append(key)
+                future = self._futures.get(key)
+                if future is not None and not (future.done() and future.result() is None):
+                    continue
+                cached = self.client.cache.get(key) if self.client.cache else None
+                if cached is not None:
+                    future = Future()
+                    future.set_result(cached)
+                else:
+                    future = self._executor.submit(self._generate, candidate, job_description)
+                self._futures[key] = future
+        return keys
+
+    def _generate(self, candidate_data: Dict, job_description: str) -> Optional[Dict]:
+        try:
+            return self.client.generate_interview_questions(candidate_data, job_description)
+        except Exception as e:
+            log_event({'event': 'guide_error', 'error': f"{type(e).__name__}: {e}"})
+            return None
+
+    def put(self, key: str, guide: Dict):
+        """Record a guide generated in the foreground"""
+        future = Future()
+        future.set_result(guide)
+        with self._lock:
+            self._futures[key] = future
+
+    def status(self, key: str) -> Optional[str]:
+        """'ready', 'pending', 'failed', or None if the guide was never requested"""
+        future = self._futures.get(key)
+        if future is None:
+            return None
+        if not future.done():
+            return 'pending'
+        return 'ready' if future.result() is not None else 'failed'
+
+    def get(self, key: str) -> Optional[Dict]:
+        """The guide if it is ready, without waiting"""
+        future = self._futures.get(key)
+        if future is not None and future.done():
+            return future.result()
+        return None
+
+_prefetcher = None
+_prefetcher_lock = threading.Lock()
+
+def get_guide_prefetcher() -> GuidePrefetcher:
+    """Process-wide prefetcher, shared by every session"""
+    global _prefetcher
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            _prefetcher = GuidePrefetcher()
+        return _prefetcher
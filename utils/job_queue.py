@@ -0,0 +1,297 @@
+import os
+import sys
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import threading
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from utils.result_cache import make_cache_key
+from utils.llm_metrics import log_event
+
+ROOT = Path(__file__).parent.parent
+
+JOB_CONFIG = {
+    'path': os.environ.get('TALENTLENS_JOBS_PATH', str(ROOT / '.cache' / 'jobs.sqlite3')),
+    'workers': int(os.environ.get('TALENTLENS_WORKERS', '2')),
+    'poll_interval': 0.5,
+    'heartbeat_seconds': 5.0,
+    # A running job whose worker has not reported for this long is handed to another worker
+    'lease_seconds': 60.0,
+    # Auto-started workers exit after this long without a job
+    'idle_exit_seconds': 900.0,
+    'keep_seconds': 7 * 24 * 3600
+}
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+SCHEMA = [
+    'CREATE TABLE IF NOT EXISTS jobs ('
+    'id TEXT PRIMARY KEY, status TEXT NOT NULL, job_description TEXT NOT NULL, options TEXT NOT NULL, '
+    'total INTEGER NOT NULL, done INTEGER NOT NULL DEFAULT 0, summary TEXT, partial TEXT, metrics TEXT, '
+    'error TEXT, worker TEXT, created_at REAL NOT NULL, started_at REAL, heartbeat_at REAL, finished_at REAL, '
+    'cancel_requested INTEGER NOT NULL DEFAULT 0, fingerprint TEXT, subscribers INTEGER NOT NULL DEFAULT 1)',
+    'CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at)',
+    'CREATE TABLE IF NOT EXISTS job_inputs (job_id TEXT NOT NULL, filename TEXT NOT NULL, text TEXT NOT NULL, '
+    'PRIMARY KEY (job_id, filename))',
+    'CREATE TABLE IF NOT EXISTS job_results (seq INTEGER PRIMARY KEY AUTOINCREMENT, job_id TEXT NOT NULL, '
+    'filename TEXT NOT NULL, result TEXT NOT NULL)',
+    'CREATE UNIQUE INDEX IF NOT EXISTS idx_job_results ON job_results(job_id, filename)',
+    'CREATE TABLE IF NOT EXISTS workers (id TEXT PRIMARY KEY, pid INTEGER, host TEXT, job_id TEXT, '
+    'started_at REAL NOT NULL, seen_at REAL NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS spawns (id INTEGER PRIMARY KEY CHECK (id = 1), spawned_at REAL NOT NULL)'
+]
+
+# Columns added after the first release of the queue; applied when missing
+MIGRATIONS = [
+    'ALTER TABLE jobs ADD COLUMN fingerprint TEXT',
+    'ALTER TABLE jobs ADD COLUMN subscribers INTEGER NOT NULL DEFAULT 1'
+]
+
+class JobCancelled(Exception):
+    pass
+
+class JobQueue:
+    """SQLite-backed queue of screening jobs shared by every Streamlit session and worker process on the host.
+
+    A job holds the job description, the resume texts and the screening options; workers claim queued jobs
+    (or running ones whose worker stopped heartbeating), append result rows as they complete and finish the
+    job with a summary. Pages poll status and read result rows incrementally by sequence number.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or JOB_CONFIG['path']
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            for statement in SCHEMA:
+                self._conn.execute(statement)
+            for statement in MIGRATIONS:
+                try:
+                    self._conn.execute(statement)
+                except sqlite3.OperationalError:
+                    pass
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_fingerprint ON jobs(fingerprint)')
+        return self._conn
+
+    def _execute(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._lock:
+            return self._connect().execute(sql, params).fetchall()
+
+    def submit(self, job_description: str, resume_files: Dict[str, str], options: Dict = None) -> str:
+        """Queue a screening job. An identical job (same JD, resumes and options) that is still queued or running,
+        e.g. submitted by another recruiter on the same requisition, is joined instead of run twice."""
+        options_json = json.dumps(options or {}, sort_keys=True)
+        fingerprint = make_cache_key(job_description, options_json, *sorted(resume_files.items()))
+        job_id = uuid.uuid4().hex[:16]
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = conn.execute("SELECT id FROM jobs WHERE fingerprint = ? AND status IN ('queued', 'running') "
+                                   "AND cancel_requested = 0 ORDER BY created_at LIMIT 1", (fingerprint,)).fetchone()
+                if row:
+                    conn.execute('UPDATE jobs SET subscribers = subscribers + 1 WHERE id = ?', (row[0],))
+                    conn.execute('COMMIT')
+                    return row[0]
+                conn.execute('INSERT INTO jobs (id, status, job_description, options, total, created_at, fingerprint) '
+                             'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                             (job_id, 'queued', job_description, options_json, len(resume_files), now, fingerprint))
+                conn.executemany('INSERT INTO job_inputs (job_id, filename, text) VALUES (?, ?, ?)',
+                                 [(job_id, name, text) for name, text in resume_files.items()])
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        self.purge()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        rows = self._execute('SELECT id, status, total, done, summary, partial, metrics, error, created_at, started_at, '
+                             'finished_at, cancel_requested, subscribers FROM jobs WHERE id = ?', (job_id,))
+        if not rows:
+            return None
+        (job_id, status, total, done, summary, partial, metrics, error, created_at, started_at, finished_at,
+         cancel_requested, subscribers) = rows[0]
+        return {
+            'id': job_id, 'status': status, 'total': total, 'done': done,
+            'summary': json.loads(summary) if summary else None,
+            'partial': json.loads(partial) if partial else {},
+            'metrics': json.loads(metrics) if metrics else None,
+            'error': error, 'created_at': created_at, 'started_at': started_at, 'finished_at': finished_at,
+            'cancel_requested': bool(cancel_requested), 'subscribers': subscribers,
+            'position': self._position(job_id, created_at) if status == 'queued' else 0
+        }
+
+    def job_description(self, job_id: str) -> Optional[str]:
+        rows = self._execute('SELECT job_description FROM jobs WHERE id = ?', (job_id,))
+        return rows[0][0] if rows else None
+
+    def _position(self, job_id: str, created_at: float) -> int:
+        return self._execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND created_at < ?", (created_at,))[0][0]
+
+    def results(self, job_id: str, after_seq: int = 0) -> Tuple[List[Dict], int]:
+        """Result rows added after after_seq, and the sequence number to pass next time"""
+        rows = self._execute('SELECT seq, result FROM job_results WHERE job_id = ? AND seq > ? ORDER BY seq',
+                             (job_id, after_seq))
+        return [json.loads(result) for _, result in rows], (rows[-1][0] if rows else after_seq)
+
+    def cancel(self, job_id: str) -> bool:
+        """Leave the job; it is stopped once no session follows it. False if other sessions keep it running."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.execute("UPDATE jobs SET subscribers = subscribers - 1 WHERE id = ? AND subscribers > 1 "
+                             "AND status IN ('queued', 'running')", (job_id,))
+                if conn.execute('SELECT changes()').fetchone()[0]:
+                    conn.execute('COMMIT')
+                    return False
+                conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status IN ('queued', 'running')",
+                             (job_id,))
+                # A job nobody has picked up yet can be closed right away
+                conn.execute("UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE id = ? AND status = 'queued'",
+                             (time.time(), job_id))
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        return True
+
+    # Worker side
+
+    def claim(self, worker_id: str) -> Optional[Dict]:
+        """Oldest queued job, or a running one whose worker went silent, atomically marked as ours"""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                # Cancelled while its worker was dying: nobody is left to close it
+                conn.execute("UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE status = 'running' AND "
+                             "cancel_requested = 1 AND heartbeat_at < ?", (now, now - JOB_CONFIG['lease_seconds']))
+                row = conn.execute(
+                    "SELECT id, job_description, options FROM jobs WHERE cancel_requested = 0 AND "
+                    "(status = 'queued' OR (status = 'running' AND heartbeat_at < ?)) ORDER BY created_at LIMIT 1",
+                    (now - JOB_CONFIG['lease_seconds'],)
+                ).fetchone()
+                if row:
+                    conn.execute("UPDATE jobs SET status = 'running', worker = ?, started_at = COALESCE(started_at, ?), "
+                                 "heartbeat_at = ? WHERE id = ?", (worker_id, now, now, row[0]))
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        if not row:
+            return None
+        return {'id': row[0], 'job_description': row[1], 'options': json.loads(row[2])}
+
+    def inputs(self, job_id: str) -> Dict[str, str]:
+        """Resumes of the job that have no result yet (all of them unless the job is being resumed)"""
+        rows = self._execute('SELECT filename, text FROM job_inputs WHERE job_id = ? AND filename NOT IN '
+                             '(SELECT filename FROM job_results WHERE job_id = ?) ORDER BY rowid', (job_id, job_id))
+        return dict(rows)
+
+    def add_result(self, job_id: str, result: Dict):
+        self._execute('INSERT OR REPLACE INTO job_results (job_id, filename, result) VALUES (?, ?, ?)',
+                      (job_id, result['resume_filename'], json.dumps(result)))
+
+    def heartbeat(self, job_id: str, worker_id: str, partial: Dict = None) -> bool:
+        """Record progress; False once the job was cancelled or taken over by another worker"""
+        now = time.time()
+        rows = self._execute('SELECT cancel_requested, worker FROM jobs WHERE id = ?', (job_id,))
+        if not rows or rows[0][0] or rows[0][1] != worker_id:
+            return False
+        self._execute('UPDATE jobs SET heartbeat_at = ?, partial = ?, '
+                      'done = (SELECT COUNT(*) FROM job_results WHERE job_id = ?) WHERE id = ?',
+                      (now, json.dumps(partial or {}), job_id, job_id))
+        return True
+
+    def finish(self, job_id: str, status: str, summary: Dict = None, metrics: Dict = None, error: str = None):
+        self._execute('UPDATE jobs SET status = ?, summary = ?, metrics = ?, error = ?, partial = NULL, finished_at = ?, '
+                      'done = (SELECT COUNT(*) FROM job_results WHERE job_id = ?) WHERE id = ?',
+                      (status, json.dumps(summary) if summary else None, json.dumps(metrics) if metrics else None,
+                       error, time.time(), job_id, job_id))
+
+    def purge(self):
+        """Drop finished jobs (and their inputs and results) older than keep_seconds"""
+        cutoff = time.time() - JOB_CONFIG['keep_seconds']
+        old = [row[0] for row in self._execute("SELECT id FROM jobs WHERE status NOT IN ('queued', 'running') "
+                                                "AND finished_at < ?", (cutoff,))]
+        for job_id in old:
+            for table in ('job_inputs', 'job_results'):
+                self._execute(f'DELETE FROM {table} WHERE job_id = ?', (job_id,))
+            self._execute('DELETE FROM jobs WHERE id = ?', (job_id,))
+
+    # Worker registry
+
+    def register_worker(self, worker_id: str, job_id: str = None):
+        now = time.time()
+        self._execute('INSERT INTO workers (id, pid, host, job_id, started_at, seen_at) VALUES (?, ?, ?, ?, ?, ?) '
+                      'ON CONFLICT(id) DO UPDATE SET job_id = excluded.job_id, seen_at = excluded.seen_at',
+                      (worker_id, os.getpid(), socket.gethostname(), job_id, now, now))
+
+    def unregister_worker(self, worker_id: str):
+        self._execute('DELETE FROM workers WHERE id = ?', (worker_id,))
+
+    def live_workers(self) -> int:
+        cutoff = time.time() - 3 * JOB_CONFIG['heartbeat_seconds']
+        self._execute('DELETE FROM workers WHERE seen_at < ?', (cutoff - JOB_CONFIG['lease_seconds'],))
+        return self._execute('SELECT COUNT(*) FROM workers WHERE seen_at >= ?', (cutoff,))[0][0]
+
+    def claim_spawn(self, cooldown: float = 30.0) -> bool:
+        """True for exactly one caller per cooldown window, so concurrent sessions start one worker pool"""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = conn.execute('SELECT spawned_at FROM spawns WHERE id = 1').fetchone()
+                claimed = row is None or now - row[0] > cooldown
+                if claimed:
+                    conn.execute('INSERT OR REPLACE INTO spawns (id, spawned_at) VALUES (1, ?)', (now,))
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        return claimed
+
+def ensure_workers(queue: JobQueue = None, workers: int = None) -> bool:
+    """Start a detached worker pool (screening_worker.py) if no worker is alive; returns True if one was started"""
+    queue = queue or get_job_queue()
+    if queue.live_workers() > 0 or not queue.claim_spawn():
+        return False
+    log_path = Path(queue.path).with_name('workers.log')
+    try:
+        with open(log_path, 'ab') as log:
+            subprocess.Popen(
+                [sys.executable, str(ROOT / 'screening_worker.py'), '--workers', str(workers or JOB_CONFIG['workers']),
+                 '--idle-exit', str(JOB_CONFIG['idle_exit_seconds']), '--jobs-path', queue.path],
+                cwd=str(ROOT), stdin=subprocess.DEVNULL, stdout=log, stderr=log, start_new_session=True
+            )
+        return True
+    except Exception as e:
+        log_event({'event': 'worker_spawn_error', 'error': f"{type(e).__name__}: {e}"})
+        return False
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+def get_job_queue() -> JobQueue:
+    """Process-wide job queue connection"""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue()
+        return _job_queue
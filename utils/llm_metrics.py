@@ -0,0 +1,159 @@
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+import numpy as np
+
+METRICS_CONFIG = {
+    'latency_buckets': (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0),
+    'max_samples': 5000,
+    'log_calls': os.environ.get('TALENTLENS_LOG_LLM_CALLS', '0') == '1'
+}
+
+logger = logging.getLogger('talentlens.llm')
+if METRICS_CONFIG['log_calls'] and not logger.handlers:
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus style) plus a window of recent samples for percentiles"""
+
+    def __init__(self, buckets=None, max_samples: int = None):
+        self.buckets = tuple(buckets or METRICS_CONFIG['latency_buckets'])
+        self.counts = np.zeros(len(self.buckets) + 1, dtype=np.int64)
+        self.total = 0.0
+        self.samples = deque(maxlen=max_samples or METRICS_CONFIG['max_samples'])
+
+    def observe(self, value: float):
+        self.counts[np.searchsorted(self.buckets, value)] += 1
+        self.total += value
+        self.samples.append(value)
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    def percentiles(self) -> Dict[str, Optional[float]]:
+        if not self.samples:
+            return {'p50': None, 'p95': None, 'p99': None}
+        p50, p95, p99 = np.percentile(np.fromiter(self.samples, dtype=np.float64), [50, 95, 99])
+        return {'p50': round(float(p50), 4), 'p95': round(float(p95), 4), 'p99': round(float(p99), 4)}
+
+    def snapshot(self) -> Dict:
+        return dict(self.percentiles(), count=self.count, sum=round(self.total, 4),
+                    mean=round(self.total / self.count, 4) if self.count else None)
+
+    def prometheus(self, name: str) -> list:
+        lines = [f"# TYPE {name} histogram"]
+        cumulative = np.cumsum(self.counts)
+        for bound, count in zip(self.buckets, cumulative):
+            lines.append(f'{name}_bucket{{le="{bound}"}} {count}')
+        lines.append(f'{name}_bucket{{le="+Inf"}} {cumulative[-1]}')
+        lines.append(f"{name}_sum {self.total:.6f}")
+        lines.append(f"{name}_count {cumulative[-1]}")
+        return lines
+
+class LLMMetrics:
+    """Aggregated per-call statistics of the LLM path: latency histograms, statuses, retries, token usage and
+    parse outcomes. One process-wide instance (get_llm_metrics) plus optional per-run instances."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started_at = time.time()
+            self.latency = Histogram()
+            self.total_time = Histogram()
+            self.token_time = Histogram()
+            self.calls = {}
+            self.retries = 0
+            self.throttled = 0
+            self.prompt_tokens = 0
+            self.completion_tokens = 0
+            self.parse = {'parsed': 0, 'repaired': 0, 'failed': 0}
+
+    def record_call(self, call: Dict):
+        with self._lock:
+            key = (call.get('purpose', 'chat'), str(call.get('status')))
+            self.calls[key] = self.calls.get(key, 0) + 1
+            self.retries += call.get('retries', 0)
+            self.throttled += call.get('throttled', 0)
+            self.token_time.observe(call.get('token_time', 0.0))
+            self.total_time.observe(call.get('total_time', 0.0))
+            if call.get('latency') is not None:
+                self.latency.observe(call['latency'])
+            self.prompt_tokens += call.get('prompt_tokens') or 0
+            self.completion_tokens += call.get('completion_tokens') or 0
+
+    def record_parse(self, outcome: str):
+        with self._lock:
+            self.parse[outcome] = self.parse.get(outcome, 0) + 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            calls = sum(self.calls.values())
+            succeeded = sum(n for (_, status), n in self.calls.items() if status == '200')
+            return {
+                'since': self.started_at,
+                'calls': calls,
+                'succeeded': succeeded,
+                'failed': calls - succeeded,
+                'by_status': {f"{purpose}:{status}": n for (purpose, status), n in sorted(self.calls.items())},
+                'retries': self.retries,
+                'throttled': self.throttled,
+                'latency_seconds': self.latency.snapshot(),
+                'total_seconds': self.total_time.snapshot(),
+                'token_fetch_seconds': self.token_time.snapshot(),
+                'prompt_tokens': self.prompt_tokens,
+                'completion_tokens': self.completion_tokens,
+                'parse': dict(self.parse)
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def prometheus(self) -> str:
+        """Prometheus text exposition format"""
+        with self._lock:
+            lines = ["# TYPE talentlens_llm_calls_total counter"]
+            for (purpose, status), n in sorted(self.calls.items()):
+                lines.append(f'talentlens_llm_calls_total{{purpose="{purpose}",status="{status}"}} {n}')
+            lines += ["# TYPE talentlens_llm_retries_total counter", f"talentlens_llm_retries_total {self.retries}",
+                      "# TYPE talentlens_llm_throttled_total counter", f"talentlens_llm_throttled_total {self.throttled}",
+                      "# TYPE talentlens_llm_tokens_total counter",
+                      f'talentlens_llm_tokens_total{{type="prompt"}} {self.prompt_tokens}',
+                      f'talentlens_llm_tokens_total{{type="completion"}} {self.completion_tokens}',
+                      "# TYPE talentlens_llm_parse_total counter"]
+            for outcome, n in sorted(self.parse.items()):
+                lines.append(f'talentlens_llm_parse_total{{outcome="{outcome}"}} {n}')
+            lines += self.latency.prometheus('talentlens_llm_request_seconds')
+            lines += self.total_time.prometheus('talentlens_llm_call_seconds')
+            lines += self.token_time.prometheus('talentlens_llm_token_fetch_seconds')
+            return '\n'.join(lines) + '\n'
+
+def log_event(event: Dict):
+    """One JSON line per event on the talentlens.llm logger (enabled with TALENTLENS_LOG_LLM_CALLS=1).
+    Events with an 'error' are warnings, so they still reach stderr when it is not enabled."""
+    level = logging.WARNING if 'error' in event else logging.INFO
+    if logger.isEnabledFor(level):
+        logger.log(level, json.dumps(dict(event, ts=round(time.time(), 3)), default=str))
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+def get_llm_metrics() -> LLMMetrics:
+    """Process-wide metrics, fed by every ApolloAPIClient"""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = LLMMetrics()
+        return _metrics
@@ -0,0 +1,102 @@
+import re
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+PRESCREEN_CONFIG = {
+    'threshold': 5.0,
+    'k1': 1.5,
+    'b': 0.75,
+    'max_query_terms': 150
+}
+
+STOPWORDS = set("""
+a about above across after again all also am an and any are as at be been being both but by can could did do does
+doing during each etc for from further had has have having he her here hers him his how i if in into is it its
+itself just may me more most must my no nor not of off on once only or other our ours out over own per plus same
+shall she should so some such than that the their theirs them then there these they this those through to too
+under until up upon very via was we were what when where which while who whom why will with within without would
+you your yours years year experience experienced work working role team teams strong ability knowledge skills
+skill including include includes responsible responsibilities required requirements preferred candidate ideal
+new using use used across well based good excellent plus least minimum must nice join help make
+""".split())
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_PATTERN.findall((text or '').lower())
+            if t not in STOPWORDS and len(t) > 1 and not t.isdigit()]
+
+class PreScreener:
+    """BM25 relevance of resumes to one job description, using the JD's own keywords as the query"""
+
+    def __init__(self, job_description: str, k1: float = None, b: float = None, max_query_terms: int = None):
+        self.k1 = k1 if k1 is not None else PRESCREEN_CONFIG['k1']
+        self.b = b if b is not None else PRESCREEN_CONFIG['b']
+        self.job_description = job_description
+        terms, counts = np.unique(np.array(tokenize(job_description), dtype=str), return_counts=True)
+        # Keep the most repeated JD terms; these carry the skills the posting keeps coming back to
+        order = np.argsort(-counts, kind='stable')[:max_query_terms or PRESCREEN_CONFIG['max_query_terms']]
+        self.terms = [str(t) for t in terms[order]]
+        self.term_index = {term: i for i, term in enumerate(self.terms)}
+        self.query_weights = 1.0 + np.log(counts[order].astype(np.float64))
+
+    def _term_matrix(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Document x query-term frequency matrix and document lengths"""
+        tf = np.zeros((len(texts), len(self.terms)), dtype=np.float64)
+        lengths = np.zeros(len(texts), dtype=np.float64)
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            lengths[row] = len(tokens)
+            cols = [self.term_index[t] for t in tokens if t in self.term_index]
+            if cols:
+                np.add.at(tf[row], cols, 1.0)
+        return tf, lengths
+
+    def score(self, resume_files: Dict[str, str]) -> Dict[str, float]:
+        """Relevance per filename on a 0-100 scale, where 100 matches the job description scored against itself"""
+        if not self.terms:
+            # Nothing to match against, so nothing can be ruled out
+            return {name: 100.0 for name in resume_files}
+        if not resume_files:
+            return {}
+        names = list(resume_files)
+        # The JD rides along as the last row: it shares the IDF/length statistics and gives the reference score
+        tf, lengths = self._term_matrix([resume_files[n] for n in names] + [self.job_description])
+        n_docs = len(tf)
+        doc_freq = (tf > 0).sum(axis=0)
+        idf = np.log(1.0 + (n_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+        avg_length = max(lengths.mean(), 1.0)
+        norm = self.k1 * (1.0 - self.b + self.b * lengths / avg_length)
+        saturated = tf * (self.k1 + 1.0) / (tf + norm[:, None])
+        scores = saturated @ (self.query_weights * idf)
+        reference = max(scores[-1], 1e-9)
+        return {name: round(min(100.0, float(s) * 100.0 / reference), 1) for name, s in zip(names, scores[:-1])}
+
+@lru_cache(maxsize=32)
+def get_prescreener(job_description: str) -> PreScreener:
+    """Parsed job description (query terms and weights), shared by every session screening against it"""
+    return PreScreener(job_description)
+
+def prescreen_resumes(resume_files: Dict[str, str], job_description: str, threshold: float = None):
+    """Split resumes into an LLM queue ordered by pre-score and a list of pre-screen rejects.
+
+    Returns (queue, rejected, scores): queue maps filename -> text, best match first; rejected holds
+    result rows marked with error 'Pre-screen reject' so pages treat them like other non-analyzed rows.
+    """
+    threshold = PRESCREEN_CONFIG['threshold'] if threshold is None else threshold
+    scores = get_prescreener(job_description).score(resume_files)
+    queue = {}
+    rejected = []
+    for filename in sorted(resume_files, key=lambda f: -scores[f]):
+        if scores[filename] >= threshold:
+            queue[filename] = resume_files[filename]
+        else:
+            rejected.append({
+                'resume_filename': filename,
+                'candidate_name': filename.replace('Resume_', '').rsplit('.', 1)[0].replace('_', ' '),
+                'prescreen_score': scores[filename],
+                'error': 'Pre-screen reject'
+            })
+    return queue, rejected, scores
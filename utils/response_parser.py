@@ -0,0 +1,307 @@
+import re
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+BEHAVIOR_KEYS = ['communicate_with_candor', 'decide_and_act_with_speed', 'innovate_and_drive_change',
+                 'deliver_to_win', 'collaborate_with_a_purpose']
+
+# Field specs by dotted path: str, list, a (min, max) numeric range, or a set of allowed values.
+# Fields in *_CRITICAL must be valid for the response to be usable at all.
+ANALYSIS_FIELDS = {
+    'candidate_name': str,
+    'email': str,
+    'phone': str,
+    'years_experience': (0, 60),
+    'technical_fit_score': (0, 100),
+    'technical_fit_justification': str,
+    **{f'behavioral_scores.{key}.score': (1, 5) for key in BEHAVIOR_KEYS},
+    **{f'behavioral_scores.{key}.justification': str for key in BEHAVIOR_KEYS},
+    'overall_recommendation': {'SHORTLIST', 'MAYBE', 'REJECT'},
+    'recommendation_justification': str,
+    'key_strengths': list,
+    'key_concerns': list,
+    'missing_requirements': list
+}
+ANALYSIS_CRITICAL = {'technical_fit_score', 'overall_recommendation'}
+
+# Two-stage analysis: a JD-independent resume profile, then a match of that profile against one JD.
+# A profile merged with its match has every ANALYSIS_FIELDS field.
+PROFILE_FIELDS = {
+    'candidate_name': str,
+    'email': str,
+    'phone': str,
+    'years_experience': (0, 60),
+    'skills': list,
+    'experience_summary': str,
+    **{f'behavioral_scores.{key}.score': (1, 5) for key in BEHAVIOR_KEYS},
+    **{f'behavioral_scores.{key}.justification': str for key in BEHAVIOR_KEYS},
+    'key_strengths': list
+}
+PROFILE_CRITICAL = {'skills', 'experience_summary'}
+
+MATCH_FIELDS = {
+    'technical_fit_score': (0, 100),
+    'technical_fit_justification': str,
+    'overall_recommendation': {'SHORTLIST', 'MAYBE', 'REJECT'},
+    'recommendation_justification': str,
+    'key_concerns': list,
+    'missing_requirements': list
+}
+MATCH_CRITICAL = ANALYSIS_CRITICAL
+
+INTERVIEW_FIELDS = {
+    'technical_questions': list,
+    'behavioral_questions': list,
+    'case_study.scenario': str,
+    'case_study.what_to_assess': list,
+    'case_study.evaluation_criteria': list
+}
+INTERVIEW_CRITICAL = {'technical_questions', 'behavioral_questions'}
+
+def _scan(text: str) -> Tuple[List[str], int]:
+    """Open-bracket closers and the end of the last complete element"""
+    closers = []
+    in_string = False
+    escaped = False
+    last_safe = 0
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in '{[':
+            closers.append('}' if ch == '{' else ']')
+        elif ch in '}]':
+            if closers:
+                closers.pop()
+            last_safe = i + 1
+        elif ch == ',':
+            last_safe = i
+    return closers, last_safe
+
+def _close_truncated(text: str) -> str:
+    """Best-effort completion of JSON cut off mid-way (e.g. at max_tokens).
+
+    Whatever follows the last complete element is dropped, even if it would parse once closed: a cut value
+    (a score of 7 cut from 78, half a justification) must come back missing so the follow-up fetches it again.
+    """
+    closers, last_safe = _scan(text)
+    if not closers:
+        return text
+    trimmed = text[:last_safe].rstrip().rstrip(',')
+    closers = _scan(trimmed)[0]
+    return trimmed + ''.join(reversed(closers))
+
+def extract_json(text: Optional[str]) -> Optional[Any]:
+    """Locate and decode the JSON value in an LLM reply: code fences, surrounding prose,
+    trailing commas and truncated output are tolerated"""
+    if not text:
+        return None
+    text = text.strip()
+    fenced = re.search(r"```(?:json)?\s*(.*?)(?:```|$)", text, flags=re.DOTALL)
+    if fenced and fenced.group(1).strip():
+        text = fenced.group(1).strip()
+    starts = [i for i in (text.find('{'), text.find('[')) if i >= 0]
+    if not starts:
+        return None
+    text = text[min(starts):]
+
+    decoder = json.JSONDecoder()
+    try:
+        return decoder.raw_decode(text)[0]
+    except ValueError:
+        pass
+    repaired = re.sub(r",\s*([}\]])", r"\1", text)
+    try:
+        return decoder.raw_decode(repaired)[0]
+    except ValueError:
+        pass
+    try:
+        return json.loads(re.sub(r",\s*([}\]])", r"\1", _close_truncated(repaired)))
+    except ValueError:
+        return None
+
+def get_path(data: Dict, path: str) -> Any:
+    for key in path.split('.'):
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+def set_path(data: Dict, path: str, value: Any):
+    keys = path.split('.')
+    for key in keys[:-1]:
+        if not isinstance(data.get(key), dict):
+            data[key] = {}
+        data = data[key]
+    data[keys[-1]] = value
+
+def delete_path(data: Dict, path: str):
+    keys = path.split('.')
+    for key in keys[:-1]:
+        data = data.get(key) if isinstance(data, dict) else None
+    if isinstance(data, dict):
+        data.pop(keys[-1], None)
+
+def _coerce(value: Any, spec: Any) -> Tuple[bool, Any]:
+    if value is None:
+        return False, None
+    if spec is str:
+        if isinstance(value, (str, int, float)):
+            return True, str(value)
+        return False, None
+    if spec is list:
+        if isinstance(value, list):
+            return True, value
+        if isinstance(value, str) and value:
+            return True, [value]
+        return False, None
+    if isinstance(spec, tuple):
+        try:
+            # Tolerate "4", "4/5" and "85/100"
+            number = value if isinstance(value, (int, float)) else float(str(value).split('/')[0].strip())
+        except ValueError:
+            return False, None
+        if isinstance(number, bool) or not spec[0] <= number <= spec[1]:
+            return False, None
+        return True, int(number) if float(number).is_integer() else number
+    if isinstance(spec, set):
+        choice = str(value).strip().upper()
+        return (True, choice) if choice in spec else (False, None)
+    return True, value
+
+def validate(data: Any, fields: Dict[str, Any]) -> Tuple[Optional[Dict], List[str]]:
+    """Coerce data in place against the field specs; returns (data, invalid field paths)"""
+    if not isinstance(data, dict):
+        return None, list(fields)
+    invalid = []
+    for path, spec in fields.items():
+        ok, value = _coerce(get_path(data, path), spec)
+        if ok:
+            set_path(data, path, value)
+        else:
+            invalid.append(path)
+    return data, invalid
+
+def parse_response(text: Optional[str], fields: Dict[str, Any]) -> Tuple[Optional[Dict], List[str]]:
+    return validate(extract_json(text), fields)
+
+def build_followup_prompt(original_prompt: str, invalid_fields: List[str]) -> str:
+    """Ask again for just the fields that were missing or invalid, instead of the whole response"""
+    return f"""{original_prompt}
+
+Only these fields are needed now: {', '.join(invalid_fields)}
+(dotted names are nested keys). Return ONLY valid JSON containing just these fields, with the same nesting."""
+
+def merge_followup(data: Dict, followup_text: Optional[str], invalid_fields: List[str],
+                   fields: Dict[str, Any]) -> Tuple[Dict, List[str]]:
+    followup = extract_json(followup_text)
+    still_invalid = []
+    for path in invalid_fields:
+        ok, value = _coerce(get_path(followup, path) if isinstance(followup, dict) else None, fields[path])
+        if ok:
+            set_path(data, path, value)
+        else:
+            still_invalid.append(path)
+    return data, still_invalid
+
+def finalize(data: Optional[Dict], invalid_fields: List[str], critical: set) -> Optional[Dict]:
+    """None if a critical field is unusable; otherwise the data, flagging any fields left incomplete"""
+    if data is None or critical & set(invalid_fields):
+        return None
+    for path in invalid_fields:
+        delete_path(data, path)
+    if invalid_fields:
+        data['incomplete_fields'] = invalid_fields
+    return data
+
+class StreamingJSONDecoder:
+    """Incrementally decodes a streamed JSON object, surfacing each top-level field as soon as its
+    value is complete (and items of top-level arrays one by one). Each character is scanned once."""
+
+    def __init__(self):
+        self.buffer = ''
+        self.fields = {}
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._segment_start = None
+        self._element_start = None
+        self._key = None
+        self.done = False
+
+    def feed(self, text: str) -> bool:
+        """Consume more text; True if new fields or array items became available"""
+        self.buffer += text
+        changed = False
+        buffer = self.buffer
+        for i in range(self._pos, len(buffer)):
+            ch = buffer[i]
+            if self.done:
+                break
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == '\\':
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            if ch == '"':
+                if self._depth > 0:
+                    self._in_string = True
+            elif ch in '{[':
+                self._depth += 1
+                if self._depth == 1:
+                    self._segment_start = i + 1
+                elif self._depth == 2 and ch == '[':
+                    self._element_start = i + 1
+            elif ch in '}]':
+                if self._depth == 2 and ch == ']' and self._element_start is not None:
+                    changed |= self._emit_element(buffer[self._element_start:i])
+                    self._element_start = None
+                self._depth -= 1
+                if self._depth == 0:
+                    changed |= self._emit_segment(buffer[self._segment_start:i])
+                    self.done = True
+            elif ch == ':' and self._depth == 1:
+                try:
+                    self._key = json.loads(buffer[self._segment_start:i])
+                except ValueError:
+                    self._key = None
+            elif ch == ',':
+                if self._depth == 1:
+                    changed |= self._emit_segment(buffer[self._segment_start:i])
+                    self._segment_start = i + 1
+                elif self._depth == 2 and self._element_start is not None:
+                    changed |= self._emit_element(buffer[self._element_start:i])
+                    self._element_start = i + 1
+        self._pos = len(buffer)
+        return changed
+
+    def _emit_segment(self, segment: str) -> bool:
+        if not segment.strip():
+            return False
+        try:
+            self.fields.update(json.loads('{' + segment + '}'))
+            return True
+        except ValueError:
+            return False
+
+    def _emit_element(self, element: str) -> bool:
+        if not element.strip() or self._key is None:
+            return False
+        try:
+            value = json.loads(element)
+        except ValueError:
+            return False
+        items = self.fields.setdefault(self._key, [])
+        if isinstance(items, list):
+            items.append(value)
+        return True
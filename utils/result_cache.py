@@ -0,0 +1,211 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from concurrent.futures import Future
+from typing import Dict, Optional
+
+CACHE_CONFIG = {
+    'path': os.environ.get('TALENTLENS_CACHE_PATH', str(Path(__file__).parent.parent / '.cache' / 'results.sqlite3')),
+    'ttl_seconds': 14 * 24 * 3600,
+    'max_entries': 50000,
+    'enabled': os.environ.get('TALENTLENS_CACHE', '1') != '0'
+}
+
+def make_cache_key(*parts) -> str:
+    """Stable SHA-256 over the given parts (length-prefixed so fields can't bleed together)"""
+    digest = hashlib.sha256()
+    for part in parts:
+        data = str(part).encode('utf-8')
+        digest.update(len(data).to_bytes(8, 'big'))
+        digest.update(data)
+    return digest.hexdigest()
+
+class ResultCache:
+    """SQLite-backed JSON cache with TTL and LRU size eviction"""
+
+    def __init__(self, path: str = None, ttl_seconds: int = None, max_entries: int = None, enabled: bool = None):
+        self.path = path or CACHE_CONFIG['path']
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else CACHE_CONFIG['ttl_seconds']
+        self.max_entries = max_entries if max_entries is not None else CACHE_CONFIG['max_entries']
+        self.enabled = enabled if enabled is not None else CACHE_CONFIG['enabled']
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+            )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_results_accessed ON results(accessed_at)')
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str) -> Optional[Dict]:
+        if not self.enabled:
+            return None
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute('SELECT value, created_at FROM results WHERE key = ?', (key,)).fetchone()
+                if row and (not self.ttl_seconds or now - row[1] <= self.ttl_seconds):
+                    conn.execute('UPDATE results SET accessed_at = ? WHERE key = ?', (now, key))
+                    conn.commit()
+                    self.hits += 1
+                    return json.loads(row[0])
+                self.misses += 1
+                return None
+        except Exception as e:
+            from utils.llm_metrics import log_event
+            log_event({'event': 'cache_error', 'op': 'get', 'error': f"{type(e).__name__}: {e}"})
+            return None
+
+    def set(self, key: str, value: Dict):
+        if not self.enabled or value is None:
+            return
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    'INSERT OR REPLACE INTO results (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)',
+                    (key, json.dumps(value), now, now)
+                )
+                conn.commit()
+                self._writes += 1
+                if self._writes % 100 == 1:
+                    self._evict(conn, now)
+        except Exception as e:
+            from utils.llm_metrics import log_event
+            log_event({'event': 'cache_error', 'op': 'set', 'error': f"{type(e).__name__}: {e}"})
+
+    def append(self, key: str, field: str, item):
+        """Add item to the list value[field] stored under key (if not already in it). The read and the write
+        share one transaction, so concurrent writers (threads or worker processes) keep each other's items."""
+        if not self.enabled:
+            return
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    row = conn.execute('SELECT value, created_at FROM results WHERE key = ?', (key,)).fetchone()
+                    value = json.loads(row[0]) if row and (not self.ttl_seconds or now - row[1] <= self.ttl_seconds) else {}
+                    items = value.setdefault(field, [])
+                    if item not in items:
+                        items.append(item)
+                        conn.execute(
+                            'INSERT OR REPLACE INTO results (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)',
+                            (key, json.dumps(value), now, now)
+                        )
+                    conn.execute('COMMIT')
+                except Exception:
+                    conn.execute('ROLLBACK')
+                    raise
+        except Exception as e:
+            from utils.llm_metrics import log_event
+            log_event({'event': 'cache_error', 'op': 'append', 'error': f"{type(e).__name__}: {e}"})
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        if self.ttl_seconds:
+            conn.execute('DELETE FROM results WHERE created_at < ?', (now - self.ttl_seconds,))
+        if self.max_entries:
+            conn.execute(
+                'DELETE FROM results WHERE key IN ('
+                'SELECT key FROM results ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,)
+            )
+        conn.commit()
+
+    def evict(self):
+        with self._lock:
+            self._evict(self._connect(), time.time())
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute('DELETE FROM results')
+            conn.commit()
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0
+        }
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_result_cache() -> ResultCache:
+    """Process-wide cache instance shared by every client"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResultCache()
+        return _default_cache
+
+class SingleFlight:
+    """Coalesces identical requests running at the same time in this process (any session, thread or event loop):
+    the first caller for a key does the work, later callers wait for its result instead of repeating it."""
+
+    def __init__(self):
+        self.coalesced = 0
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def join(self, key: str) -> Optional[Future]:
+        """None if the caller now leads the request for key and must call done(key, result) when it ends,
+        otherwise the leader's Future (resolving to None if the leader failed)"""
+        with self._lock:
+            future = self._flights.get(key)
+            if future is None:
+                self._flights[key] = Future()
+            else:
+                self.coalesced += 1
+            return future
+
+    def done(self, key: str, result: Optional[Dict]):
+        with self._lock:
+            future = self._flights.pop(key, None)
+        if future is not None:
+            # Serialized like a cache entry, so every waiter decodes its own copy
+            future.set_result(json.dumps(result) if result is not None else None)
+
+    @staticmethod
+    def decode(value: Optional[str]) -> Optional[Dict]:
+        return json.loads(value) if value is not None else None
+
+    def wait(self, future: Future) -> Optional[Dict]:
+        return self.decode(future.result())
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+_single_flight = None
+
+def get_single_flight() -> SingleFlight:
+    """Process-wide single-flight registry, keyed like the result cache"""
+    global _single_flight
+    with _default_cache_lock:
+        if _single_flight is None:
+            _single_flight = SingleFlight()
+        return _single_flight
@@ -0,0 +1,154 @@
+import uuid
+import hashlib
+from typing import TYPE_CHECKING, Dict, Iterable, List
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+from utils.response_parser import BEHAVIOR_KEYS
+from utils.behavior_matrix import display_scores
+
+RECOMMENDATIONS = ['SHORTLIST', 'MAYBE', 'REJECT']
+BEHAVIOR_COLUMNS = ['Communicate', 'Speed', 'Innovate', 'Deliver', 'Collaborate']
+
+def candidate_id(result: Dict) -> str:
+    """Stable id of a screened resume, independent of the candidate name (which can repeat)"""
+    return hashlib.sha256(result['resume_filename'].encode('utf-8')).hexdigest()[:12]
+
+class ResultsStore:
+    """Columnar store of screening results shared by every page, versioned so derived views can be cached"""
+
+    def __init__(self, capacity: int = 64):
+        self.ids = []
+        self.index = {}
+        self.names = []
+        self.files = []
+        self.errors = []
+        self.tech = np.zeros(capacity, dtype=np.int8)
+        self.behavior = np.zeros((capacity, len(BEHAVIOR_KEYS)), dtype=np.float64)
+        self.recommendation = np.full(capacity, -1, dtype=np.int8)
+        self.prescreen = np.full(capacity, np.nan, dtype=np.float32)
+        self.details = {}
+        self.uid = uuid.uuid4().hex[:12]
+        self.version = 0
+        self._frame = None
+        self._frame_version = -1
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _grow(self):
+        capacity = len(self.tech) * 2
+        self.tech = np.concatenate([self.tech, np.zeros_like(self.tech)])
+        self.behavior = np.concatenate([self.behavior, np.zeros_like(self.behavior)])
+        self.recommendation = np.concatenate([self.recommendation, np.full(capacity // 2, -1, dtype=np.int8)])
+        self.prescreen = np.concatenate([self.prescreen, np.full(capacity // 2, np.nan, dtype=np.float32)])
+
+    def add(self, result: Dict) -> str:
+        """Insert or replace one result row; returns its candidate id"""
+        cid = candidate_id(result)
+        row = self.index.get(cid)
+        if row is None:
+            if len(self.ids) == len(self.tech):
+                self._grow()
+            row = len(self.ids)
+            self.ids.append(cid)
+            self.names.append('')
+            self.files.append('')
+            self.errors.append('')
+            self.index[cid] = row
+
+        details = dict(result)
+        self.files[row] = details.pop('resume_filename')
+        self.names[row] = details.pop('candidate_name', None) or 'Unknown'
+        self.errors[row] = details.pop('error', '')
+        tech = details.pop('technical_fit_score', None)
+        self.tech[row] = int(round(tech)) if isinstance(tech, (int, float)) else 0
+        rec = details.pop('overall_recommendation', None)
+        self.recommendation[row] = RECOMMENDATIONS.index(rec) if rec in RECOMMENDATIONS else -1
+        prescore = details.pop('prescreen_score', None)
+        self.prescreen[row] = prescore if prescore is not None else np.nan
+        behaviors = details.pop('behavioral_scores', None) or {}
+        justifications = {}
+        for col, key in enumerate(BEHAVIOR_KEYS):
+            entry = behaviors.get(key) or {}
+            score = entry.get('score')
+            self.behavior[row, col] = score if isinstance(score, (int, float)) else 0
+            if entry.get('justification') is not None:
+                justifications[key] = entry['justification']
+        details['behavioral_justifications'] = justifications
+        self.details[cid] = details
+        self.version += 1
+        return cid
+
+    def update(self, results: Iterable[Dict]):
+        for result in results:
+            self.add(result)
+
+    def record(self, cid: str) -> Dict:
+        """The result as a plain dict, in the shape returned by the analysis calls"""
+        row = self.index[cid]
+        details = dict(self.details[cid])
+        justifications = details.pop('behavioral_justifications', {})
+        record = {'resume_filename': self.files[row], 'candidate_name': self.names[row]}
+        if self.errors[row]:
+            record['error'] = self.errors[row]
+        if self.recommendation[row] >= 0:
+            record['technical_fit_score'] = int(self.tech[row])
+            record['overall_recommendation'] = RECOMMENDATIONS[self.recommendation[row]]
+            behaviors = {}
+            for col, key in enumerate(BEHAVIOR_KEYS):
+                entry = {}
+                score = float(self.behavior[row, col])
+                if score:
+                    entry['score'] = int(score) if score.is_integer() else score
+                if key in justifications:
+                    entry['justification'] = justifications[key]
+                if entry:
+                    behaviors[key] = entry
+            record['behavioral_scores'] = behaviors
+        if not np.isnan(self.prescreen[row]):
+            record['prescreen_score'] = float(self.prescreen[row])
+        record.update(details)
+        return record
+
+    def analyzed_mask(self) -> np.ndarray:
+        return np.array([not e for e in self.errors], dtype=bool)
+
+    def ids_where(self, recommendation: str = None, error: str = None) -> List[str]:
+        """Ids of analyzed rows (optionally with one recommendation), or of rows with the given error"""
+        n = len(self.ids)
+        if error is not None:
+            return [cid for cid, e in zip(self.ids, self.errors) if e == error]
+        mask = self.analyzed_mask()
+        if recommendation is not None:
+            mask &= self.recommendation[:n] == RECOMMENDATIONS.index(recommendation)
+        return [self.ids[row] for row in np.flatnonzero(mask)]
+
+    def name(self, cid: str) -> str:
+        return self.names[self.index[cid]]
+
+    def frame(self) -> 'pd.DataFrame':
+        """Summary table of analyzed candidates indexed by candidate id, rebuilt only when the store changed"""
+        if self._frame_version == self.version:
+            return self._frame
+        import pandas as pd
+        n = len(self.ids)
+        rows = np.flatnonzero(self.analyzed_mask())
+        behavior = self.behavior[:n][rows]
+        data = {
+            'Candidate': [self.names[r] for r in rows],
+            'Experience': [f"{self.details[self.ids[r]].get('years_experience', 0)} yrs" for r in rows],
+            'Tech Fit': self.tech[:n][rows],
+        }
+        for col, label in enumerate(BEHAVIOR_COLUMNS):
+            data[label] = display_scores(behavior[:, col])
+        data['Behavior Avg'] = behavior.mean(axis=1).round().astype(np.int8) if len(rows) else np.zeros(0, dtype=np.int8)
+        codes = self.recommendation[:n][rows]
+        data['Recommendation'] = pd.Categorical.from_codes(codes, categories=RECOMMENDATIONS)
+        data['File'] = [self.files[r] for r in rows]
+        self._frame = pd.DataFrame(data, index=pd.Index([self.ids[r] for r in rows], name='id'))
+        self._frame_version = self.version
+        return self._frame
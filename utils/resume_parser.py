@@ -1,38 +1,61 @@
 import io
+import os
+import hashlib
+import importlib
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional
 
-try:
-    import fitz
-    HAVE_PYMUPDF = True
-except:
-    HAVE_PYMUPDF = False
+from utils.result_cache import get_result_cache, make_cache_key
 
-try:
-    import pdfplumber
-    HAVE_PDFPLUMBER = True
-except:
-    HAVE_PDFPLUMBER = False
+EXTRACTION_CONFIG = {
+    'max_workers': max(1, min(8, (os.cpu_count() or 2) - 1)),
+    'min_pool_files': 4,
+    'memo_size': 4096
+}
+
+def _extract_pymupdf(module, pdf_bytes: bytes) -> str:
+    doc = module.open(stream=pdf_bytes, filetype="pdf")
+    text = "".join(page.get_text() for page in doc)
+    doc.close()
+    return text.strip()
+
+def _extract_pdfplumber(module, pdf_bytes: bytes) -> str:
+    with module.open(io.BytesIO(pdf_bytes)) as pdf:
+        pages = [page.extract_text() for page in pdf.pages]
+    return "\n".join(p for p in pages if p).strip()
+
+# PDF libraries in order of preference: importable names and extractor. Each is imported the first
+# time a PDF needs it, so pdfplumber only loads when PyMuPDF is missing or cannot read a file.
+PDF_BACKENDS = {
+    'pymupdf': (('pymupdf', 'fitz'), _extract_pymupdf),
+    'pdfplumber': (('pdfplumber',), _extract_pdfplumber)
+}
+_pdf_modules = {}
+
+def pdf_backend(name: str):
+    """The backend's module, imported on first use; None if it is not installed"""
+    if name not in _pdf_modules:
+        module = None
+        for module_name in PDF_BACKENDS[name][0]:
+            try:
+                module = importlib.import_module(module_name)
+                break
+            except:
+                pass
+        _pdf_modules[name] = module
+    return _pdf_modules[name]
 
 def extract_text_from_pdf(pdf_bytes: bytes) -> str:
-    if HAVE_PYMUPDF:
+    for name, (_, extract) in PDF_BACKENDS.items():
+        module = pdf_backend(name)
+        if module is None:
+            continue
         try:
-            doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-            text = ""
-            for page in doc:
-                text += page.get_text()
-            doc.close()
-            return text.strip()
-        except:
-            pass
-    
-    if HAVE_PDFPLUMBER:
-        try:
-            with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-                text = ""
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-            return text.strip()
+            return extract(module, pdf_bytes)
         except:
             pass
     return ""
@@ -51,6 +74,78 @@ def extract_text_from_file(file_bytes: bytes, filename: str) -> str:
                 return ""
     return ""
 
+def file_digest(file_bytes: bytes) -> str:
+    return hashlib.sha256(file_bytes).hexdigest()
+
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+
+def _memo_key(digest: str, filename: str) -> str:
+    # Same bytes extract the same way regardless of name, as long as the file type matches
+    return make_cache_key('extract', digest, os.path.splitext(filename.lower())[1])
+
+def _memo_get(key: str) -> Optional[str]:
+    with _memo_lock:
+        if key in _memo:
+            _memo.move_to_end(key)
+            return _memo[key]
+    cached = get_result_cache().get(key)
+    if cached is not None:
+        _memo_put(key, cached['text'], persist=False)
+        return cached['text']
+    return None
+
+def _memo_put(key: str, text: str, persist: bool = True):
+    with _memo_lock:
+        _memo[key] = text
+        _memo.move_to_end(key)
+        while len(_memo) > EXTRACTION_CONFIG['memo_size']:
+            _memo.popitem(last=False)
+    if persist:
+        get_result_cache().set(key, {'text': text})
+
+def extract_texts(files: Dict[str, bytes], max_workers: int = None) -> Dict[str, str]:
+    """Extract text from many files at once, keyed by filename.
+
+    Non-empty results are memoized by SHA-256 of the file bytes (in memory and in the result cache), so a
+    re-upload or rerun never parses the same file twice. Uncached PDFs are fanned out across a process pool, falling back
+    to serial extraction if the pool breaks or cannot start.
+    """
+    texts = {}
+    pending = {}
+    for filename, file_bytes in files.items():
+        key = _memo_key(file_digest(file_bytes), filename)
+        cached = _memo_get(key)
+        if cached is not None:
+            texts[filename] = cached
+        else:
+            pending[filename] = key
+
+    pdfs = [f for f in pending if f.lower().endswith('.pdf')]
+    max_workers = max_workers or EXTRACTION_CONFIG['max_workers']
+    if len(pdfs) >= EXTRACTION_CONFIG['min_pool_files'] and max_workers > 1:
+        # spawn, not fork: the Streamlit server is multi-threaded
+        context = multiprocessing.get_context('spawn')
+        try:
+            with ProcessPoolExecutor(max_workers=min(max_workers, len(pdfs)), mp_context=context) as executor:
+                extracted = executor.map(extract_text_from_file, [files[f] for f in pdfs], pdfs,
+                                         chunksize=max(1, len(pdfs) // (max_workers * 4)))
+                for filename, text in zip(pdfs, extracted):
+                    texts[filename] = text
+        except (BrokenProcessPool, OSError) as e:
+            # A worker died or the pool could not start (e.g. __main__ is not importable under spawn);
+            # whatever it did not finish is extracted serially below
+            from utils.llm_metrics import log_event
+            log_event({'event': 'extraction_error', 'files': len(pdfs), 'error': f"{type(e).__name__}: {e}"})
+
+    for filename, key in pending.items():
+        if filename not in texts:
+            texts[filename] = extract_text_from_file(files[filename], filename)
+        # Empty text may be a transient failure (a crashed worker, a backend error): try again next time
+        if texts[filename]:
+            _memo_put(key, texts[filename])
+    return {filename: texts[filename] for filename in files}
+
 def clean_resume_text(text: str) -> str:
     if not text:
         return ""
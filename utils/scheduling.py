@@ -0,0 +1,85 @@
+from typing import Dict, Optional
+
+from utils.prescreen import get_prescreener
+from utils.llm_metrics import LLMMetrics
+
+SCHEDULE_CONFIG = {
+    'max_shortlist': None,
+    'token_budget': None,
+    'cost_budget': None,
+    # USD per 1k tokens, used to turn the cost budget into token counts
+    'prompt_price_per_1k': 0.002,
+    'completion_price_per_1k': 0.008
+}
+
+NOT_EVALUATED = 'Not evaluated'
+
+def prioritize(resume_files: Dict[str, str], job_description: str, scores: Dict[str, float] = None) -> Dict[str, str]:
+    """Resumes ordered best local match first (BM25 pre-score), so an early stop skips the weakest ones"""
+    if scores is None or any(name not in scores for name in resume_files):
+        scores = get_prescreener(job_description).score(resume_files)
+    return dict(sorted(resume_files.items(), key=lambda item: -scores[item[0]]))
+
+def not_evaluated_result(filename: str, reason: str) -> Dict:
+    return {
+        'resume_filename': filename,
+        'candidate_name': filename.replace('Resume_', '').rsplit('.', 1)[0].replace('_', ' '),
+        'error': NOT_EVALUATED,
+        'not_evaluated_reason': reason
+    }
+
+class ScreeningBudget:
+    """When to stop dispatching analyses: after max_shortlist SHORTLIST results, or once the tokens
+    (or their cost) reported by the gateway reach token_budget / cost_budget.
+
+    Dispatch also pauses while the resumes in flight are projected (at the rates seen so far) to reach a
+    limit, which keeps the overshoot from requests still running small. One budget can span several
+    analyze_resumes_parallel calls (CLI chunks).
+    """
+
+    def __init__(self, max_shortlist: int = None, token_budget: int = None, cost_budget: float = None):
+        self.max_shortlist = max_shortlist or SCHEDULE_CONFIG['max_shortlist']
+        self.token_budget = token_budget or SCHEDULE_CONFIG['token_budget']
+        self.cost_budget = cost_budget or SCHEDULE_CONFIG['cost_budget']
+        self.shortlisted = 0
+        self.observed = 0
+        self.metrics = None
+        self._base = (0, 0)
+
+    def start(self, client):
+        """Count tokens through the client's per-run metrics (attached if it has none); no-op once started"""
+        if self.metrics is not None:
+            return
+        if client.run_metrics is None:
+            client.run_metrics = LLMMetrics()
+        self.metrics = client.run_metrics
+        self._base = (self.metrics.prompt_tokens, self.metrics.completion_tokens)
+
+    def observe(self, result: Dict):
+        if 'error' in result:
+            return
+        self.observed += 1
+        if result.get('overall_recommendation') == 'SHORTLIST':
+            self.shortlisted += 1
+
+    def spent(self):
+        """(prompt_tokens, completion_tokens) used since start"""
+        if self.metrics is None:
+            return 0, 0
+        return self.metrics.prompt_tokens - self._base[0], self.metrics.completion_tokens - self._base[1]
+
+    def cost(self) -> float:
+        prompt, completion = self.spent()
+        return (prompt * SCHEDULE_CONFIG['prompt_price_per_1k'] + completion * SCHEDULE_CONFIG['completion_price_per_1k']) / 1000
+
+    def exhausted(self, in_flight: int = 0) -> Optional[str]:
+        """Why no more resumes should be dispatched, or None. in_flight resumes still running are counted
+        at the average shortlist rate and spend per analyzed resume so far."""
+        share = in_flight / self.observed if self.observed else 0.0
+        if self.max_shortlist and self.shortlisted * (1 + share) >= self.max_shortlist:
+            return f"Shortlist target of {self.max_shortlist} reached"
+        if self.token_budget and sum(self.spent()) * (1 + share) >= self.token_budget:
+            return f"Token budget of {self.token_budget:,} used up"
+        if self.cost_budget and self.cost() * (1 + share) >= self.cost_budget:
+            return f"Cost budget of ${self.cost_budget:.2f} used up"
+        return None
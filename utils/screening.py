@@ -0,0 +1,193 @@
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from utils.apollo_api import ApolloAPIClient
+from utils.prescreen import prescreen_resumes, PRESCREEN_CONFIG
+from utils.dedup import dedupe_resumes, resolve_batch_duplicates, remember_results, DEDUP_CONFIG
+from utils.scheduling import ScreeningBudget, prioritize
+
+# Screening options as set in the Resume Screener sidebar
+SCREENING_OPTIONS = {
+    'use_cache': True,
+    'packed': False,
+    'two_stage': False,
+    'stream': True,
+    'prescreen': True,
+    'prescreen_threshold': PRESCREEN_CONFIG['threshold'],
+    'dedup': True,
+    'dedup_threshold': DEDUP_CONFIG['threshold'],
+    'max_shortlist': 0,
+    'token_budget': 0
+}
+
+def screen_resumes(client: ApolloAPIClient, job_description: str, resume_files: Dict[str, str], options: Dict = None,
+                   on_row: Callable = None, on_progress: Callable = None, on_partial: Callable = None,
+                   batch_size: int = None) -> Dict:
+    """Stage 2 of the Resume Screener: pre-screen, near-duplicate reuse, prioritised analysis and early stop.
+
+    on_row(result) receives every final row (analyses as they complete, then reused copies and pre-screen
+    rejects); on_progress(done, total, summary) is called before the first analysis and after each one;
+    on_partial(filename, fields) streams replies when options['stream'] is set. Returns the summary.
+    """
+    options = dict(SCREENING_OPTIONS, **(options or {}))
+    queue, prescreened, prescores = resume_files, [], {}
+    if options['prescreen']:
+        queue, prescreened, prescores = prescreen_resumes(resume_files, job_description, options['prescreen_threshold'])
+
+    duplicate_index, reused, batch_duplicates = None, [], {}
+    if options['dedup']:
+        duplicate_index = client.duplicate_index(job_description, options['dedup_threshold'])
+        queue, reused, batch_duplicates = dedupe_resumes(queue, duplicate_index)
+
+    budget = None
+    if options['max_shortlist'] or options['token_budget']:
+        budget = ScreeningBudget(max_shortlist=options['max_shortlist'], token_budget=options['token_budget'])
+        # Reused analyses already count towards the shortlist target
+        for r in reused:
+            budget.observe(r)
+        queue = prioritize(queue, job_description, prescores)
+
+    summary = {
+        'queued': len(queue),
+        'prescreened': len(prescreened),
+        'duplicates': len(reused) + len(batch_duplicates),
+        'budget': budget is not None,
+        'stopped': None,
+        'cache_hits': 0,
+        'shared': 0
+    }
+    hits_before = client.cache.hits if client.cache else 0
+    shared_before = client.shared
+
+    def emit(result):
+        if result['resume_filename'] in prescores:
+            result['prescreen_score'] = prescores[result['resume_filename']]
+        if on_row:
+            on_row(result)
+
+    def on_result(result, done, total):
+        emit(result)
+        if on_progress:
+            on_progress(done, total, summary)
+
+    if on_progress:
+        on_progress(0, len(queue), summary)
+    # Concurrent analysis on one event loop, best pre-scores dispatched first when a budget is set
+    results = client.analyze_resumes_parallel(
+        queue,
+        job_description,
+        batch_size=batch_size,
+        on_result=on_result,
+        packed=options['packed'],
+        on_partial=on_partial if options['stream'] else None,
+        budget=budget,
+        two_stage=options['two_stage']
+    ) if queue else []
+    if duplicate_index is not None:
+        remember_results(results, queue, duplicate_index)
+        for r in resolve_batch_duplicates(results, batch_duplicates) + reused:
+            emit(r)
+    for r in prescreened:
+        emit(r)
+
+    summary['cache_hits'] = (client.cache.hits - hits_before) if client.cache else 0
+    summary['shared'] = client.shared - shared_before
+    summary['stopped'] = budget.exhausted() if budget is not None else None
+    return summary
+
+def results_summary(results: List[Dict], summary: Dict) -> Dict:
+    """A screen_resumes summary with its per-resume counts taken from every result row of the screening,
+    e.g. of a background job resumed after its worker died, whose last run only saw the remaining resumes"""
+    prescreened = sum(1 for r in results if r.get('error') == 'Pre-screen reject')
+    duplicates = sum(1 for r in results if 'duplicate_of' in r)
+    return dict(summary, queued=len(results) - prescreened - duplicates, prescreened=prescreened, duplicates=duplicates)
+
+# Best-fit job: the best recommendation wins, then the higher technical fit
+RECOMMENDATION_RANK = {'SHORTLIST': 2, 'MAYBE': 1, 'REJECT': 0}
+
+def screen_matrix(client: ApolloAPIClient, job_descriptions: Dict[str, str], resume_files: Dict[str, str],
+                  options: Dict = None, on_row: Callable = None, on_progress: Callable = None,
+                  batch_size: int = None) -> Dict:
+    """Every resume against every job description in one run. Each resume is profiled once (the two-stage
+    analysis) and matched to each job whose local pre-score it passes; all pairs share one pool of requests.
+
+    on_row(result) receives every row (with 'job'), on_progress(done, total) follows the AI pairs.
+    Returns {'results': {job: rows}, 'matrix': score_matrix(...), 'summary': ...}.
+    """
+    options = dict(SCREENING_OPTIONS, **(options or {}))
+    results = {job: [] for job in job_descriptions}
+    pairs = []
+    prescores = {}
+    prescreened = 0
+    for job, job_description in job_descriptions.items():
+        if not options['prescreen']:
+            pairs += [(filename, job) for filename in resume_files]
+            continue
+        queue, rejected, prescores[job] = prescreen_resumes(resume_files, job_description,
+                                                            options['prescreen_threshold'])
+        pairs += [(filename, job) for filename in queue]
+        prescreened += len(rejected)
+        for r in rejected:
+            r['job'] = job
+            results[job].append(r)
+            if on_row:
+                on_row(r)
+
+    def on_result(result, done, total):
+        if result['job'] in prescores:
+            result['prescreen_score'] = prescores[result['job']][result['resume_filename']]
+        results[result['job']].append(result)
+        if on_row:
+            on_row(result)
+        if on_progress:
+            on_progress(done, total)
+
+    if on_progress:
+        on_progress(0, len(pairs))
+    hits_before = client.cache.hits if client.cache else 0
+    shared_before = client.shared
+    if pairs:
+        client.match_resumes_parallel(resume_files, job_descriptions, batch_size=batch_size, pairs=pairs,
+                                      on_result=on_result)
+    summary = {
+        'resumes': len(resume_files),
+        'jobs': len(job_descriptions),
+        'pairs': len(pairs),
+        'prescreened': prescreened,
+        'cache_hits': (client.cache.hits - hits_before) if client.cache else 0,
+        'shared': client.shared - shared_before
+    }
+    return {'results': results, 'matrix': score_matrix(results, list(job_descriptions)), 'summary': summary}
+
+def score_matrix(results: Dict[str, List[Dict]], jobs: List[str]) -> Dict:
+    """Candidates x jobs technical fit (NaN where a pair was not analyzed) and each candidate's best-fit job"""
+    filenames = sorted({r['resume_filename'] for rows in results.values() for r in rows})
+    index = {filename: i for i, filename in enumerate(filenames)}
+    names = [''] * len(filenames)
+    scores = np.full((len(filenames), len(jobs)), np.nan)
+    ranks = np.full((len(filenames), len(jobs)), -1, dtype=np.int8)
+    recommendations = np.full((len(filenames), len(jobs)), None, dtype=object)
+    for col, job in enumerate(jobs):
+        for r in results.get(job, []):
+            row = index[r['resume_filename']]
+            if 'error' in r:
+                names[row] = names[row] or r.get('candidate_name', '')
+                continue
+            names[row] = r.get('candidate_name') or names[row]
+            scores[row, col] = r['technical_fit_score']
+            ranks[row, col] = RECOMMENDATION_RANK[r['overall_recommendation']]
+            recommendations[row, col] = r['overall_recommendation']
+    # Rank dominates; fit (0-100) breaks ties. Pairs without an analysis sort below every real one.
+    key = np.where(np.isnan(scores), -1.0, ranks * 1000.0 + np.nan_to_num(scores))
+    best = key.argmax(axis=1) if len(jobs) else np.zeros(len(filenames), dtype=int)
+    has_best = key[np.arange(len(filenames)), best] >= 0 if len(jobs) else np.zeros(len(filenames), dtype=bool)
+    return {
+        'filenames': filenames,
+        'names': names,
+        'jobs': jobs,
+        'scores': scores,
+        'recommendations': recommendations,
+        'best_job': [jobs[b] if ok else None for b, ok in zip(best, has_best)],
+        'best_score': [float(scores[i, b]) if ok else None for i, (b, ok) in enumerate(zip(best, has_best))]
+    }